@@ -1,4 +1,4 @@
-from flask import Flask, request, render_template
+from flask import Flask, request, render_template, g, Response, url_for
 import logging
 from datetime import datetime, timedelta
 import os
@@ -7,57 +7,70 @@ import requests
 import json
 import pandas as pd
 
-from utils.api import get_coordinates, get_airport_code
+from utils.api import get_coordinates, get_airport_code, fetch_json, GOOGLE_MAPS_API_BASE, PRICELINE_API_BASE
 from utils.database import Database
 from utils.weather import fetch_weather
 from utils.distance import haversine_distance
+from utils.poi_index import POIIndex
+from utils.catalog import Place, CityCatalog, ScheduleEntry, DaySchedule, Plan, LazySchedule
+from utils.optimizer import PlanOptimizer, place_utility, MEAL_COST_PER_DAY, ATTRACTION_COST_PER_VISIT, ATTRACTIONS_PER_DAY
+from utils.plan_session import PlanSession, SessionStore
+from utils.gazetteer import gazetteer, AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX
+from utils.travel_time import travel_time_service, place_key
+from utils.city_pack import city_packs
+from utils.rendering import precompile_templates, plans_etag, render_page, page_response, PLAN_PAGE_DAYS
+from utils.review_index import ReviewIndex
+from utils.instrumentation import configure_logging, debug_sampled, LazyJSON, span, start_request, finish_request
+from utils.metrics import REGISTRY, CONTENT_TYPE, PLAN_GENERATION_SECONDS, record_cache
+from utils.resilience import begin_deadline, end_deadline, out_of_time
+from utils.quota import quota_accountant, estimated_request_cost, QuotaExceeded
 from models.recommendation import RecommendationModel
 from models.price_predictor import PricePredictor
 from nlp.parser import parse_nlp_input
 from chatbot.bot import Chatbot
-from vision.image_scorer import score_image
-
-# Set up logging with more granularity
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # Output to console
-    ]
-)
+from vision.image_scorer import score_image, cached_score
+
+# Set up logging (level comes from LOG_LEVEL, defaulting to INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+precompile_templates(app.jinja_env)
 db = Database()
 recommendation_model = RecommendationModel()
 price_predictor = PricePredictor()
 chatbot = Chatbot()
-
-def fetch_hotels(destination, budget, pick_up_date, drop_off_date):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+plan_sessions = SessionStore()
+review_index = ReviewIndex()
+try:
+    review_index.load_from_database(db)
+except Exception as e:
+    logger.warning(f"Could not preload review index from database: {e}")
+
+def search_hotels(destination):
+    """Raw lodging search results for `destination`; the city pack builder reads price levels from them."""
+    url = f"{GOOGLE_MAPS_API_BASE}/place/textsearch/json"
     api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-    logger.debug(f"Loaded GOOGLE_PLACES_API_KEY: {api_key}")
-    logger.info(f"Fetching hotels for {destination} with budget {budget}")
-    
     if not api_key:
         logger.error("GOOGLE_PLACES_API_KEY not set")
         raise ValueError("API key missing for hotel search")
 
     params = {"query": f"hotels in {destination}", "type": "lodging", "key": api_key}
-    try:
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Hotel API response for {destination}: {data}")
+    data = fetch_json(url, params=params, timeout=15, provider="google_places", site="fetch_hotels")
+    debug_sampled(logger, "Hotel API response for %s: %s", destination, LazyJSON(data))
 
-        if data.get("status") != "OK":
-            logger.error(f"API error response: {data.get('error_message')}")
-            raise ValueError(f"Error fetching hotels: {data.get('error_message')}")
+    if data.get("status") != "OK":
+        logger.error(f"API error response: {data.get('error_message')}")
+        raise ValueError(f"Error fetching hotels: {data.get('error_message')}")
+    return data
 
-        return process_hotel_data(data, destination, budget, pick_up_date)
+def fetch_hotels(destination, budget, pick_up_date, drop_off_date):
+    logger.info(f"Fetching hotels for {destination} with budget {budget}")
+    try:
+        return process_hotel_data(search_hotels(destination), destination, budget, pick_up_date)
     except requests.HTTPError as http_err:
         logger.error(f"HTTP error occurred: {http_err}")
         raise
@@ -68,12 +81,50 @@ def fetch_hotels(destination, budget, pick_up_date, drop_off_date):
         logger.error(f"An error occurred in fetch_hotels: {e}", exc_info=True)
         raise
 
+def estimate_hotel_price(name, price_level, date):
+    """Forecast nightly price of a hotel at `price_level` on `date`; None if the forecast is unusable."""
+    try:
+        with span("price_prediction"):
+            estimated_price = price_predictor.predict_price(price_level * 50, date)
+        logger.debug("Estimated price for %s: %s, type: %s", name, estimated_price, type(estimated_price))
+    except Exception as e:
+        logger.error(f"Error predicting price for {name}: {e}")
+        estimated_price = price_level * 50  # Fallback to base price
+        logger.warning(f"Using base price {estimated_price} for {name} due to prediction error")
+
+    # Handle different types of estimated_price (just in case)
+    if isinstance(estimated_price, pd.Series):
+        logger.warning(f"Estimated price for {name} is a pandas Series: {estimated_price}")
+        if estimated_price.empty:
+            logger.error(f"Estimated price Series for {name} is empty, skipping hotel")
+            return None
+        elif len(estimated_price) > 1:
+            logger.warning(f"Estimated price Series for {name} has multiple values: {estimated_price}")
+            estimated_price = estimated_price.iloc[0]
+            logger.debug("Using first value from Series: %s", estimated_price)
+        else:
+            estimated_price = estimated_price.item()
+            logger.debug("Converted estimated price to scalar: %s", estimated_price)
+
+        # Ensure the value is numeric
+        try:
+            estimated_price = float(estimated_price)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Estimated price for {name} is not a valid number: {estimated_price}, error: {e}")
+            return None
+    elif isinstance(estimated_price, (int, float)):
+        logger.debug("Estimated price for %s is already a scalar: %s", name, estimated_price)
+    else:
+        logger.error(f"Unexpected type for estimated price for {name}: {type(estimated_price)}")
+        return None
+    return estimated_price
+
 def process_hotel_data(data, destination, budget, pick_up_date):
     logger.info(f"Processing hotel data for {destination} with budget {budget}")
     hotels = []
     try:
         central_lat, central_lon = get_coordinates(destination)
-        logger.debug(f"Coordinates for {destination}: lat={central_lat}, lon={central_lon}")
+        logger.debug("Coordinates for %s: lat=%s, lon=%s", destination, central_lat, central_lon)
         if isinstance(central_lat, pd.Series) or isinstance(central_lon, pd.Series):
             logger.error(f"Coordinates for {destination} returned as Series: lat={central_lat}, lon={central_lon}")
             raise ValueError("Coordinates must be scalar values")
@@ -91,53 +142,22 @@ def process_hotel_data(data, destination, budget, pick_up_date):
         name = place.get("name", "Unknown")
         rating = float(place.get("rating", 0))
         price_level = int(place.get("price_level", 2))
-        logger.debug(f"Processing hotel {name}: price_level={price_level}, rating={rating}")
+        logger.debug("Processing hotel %s: price_level=%s, rating=%s", name, price_level, rating)
 
-        # Get the estimated price
-        try:
-            estimated_price = price_predictor.predict_price(price_level * 50, pick_up_date)
-            logger.debug(f"Estimated price for {name}: {estimated_price}, type: {type(estimated_price)}")
-        except Exception as e:
-            logger.error(f"Error predicting price for {name}: {e}")
-            estimated_price = price_level * 50  # Fallback to base price
-            logger.warning(f"Using base price {estimated_price} for {name} due to prediction error")
-
-        # Handle different types of estimated_price (just in case)
-        if isinstance(estimated_price, pd.Series):
-            logger.warning(f"Estimated price for {name} is a pandas Series: {estimated_price}")
-            if estimated_price.empty:
-                logger.error(f"Estimated price Series for {name} is empty, skipping hotel")
-                continue
-            elif len(estimated_price) > 1:
-                logger.warning(f"Estimated price Series for {name} has multiple values: {estimated_price}")
-                estimated_price = estimated_price.iloc[0]
-                logger.debug(f"Using first value from Series: {estimated_price}")
-            else:
-                estimated_price = estimated_price.item()
-                logger.debug(f"Converted estimated price to scalar: {estimated_price}")
-
-            # Ensure the value is numeric
-            try:
-                estimated_price = float(estimated_price)
-            except (ValueError, TypeError) as e:
-                logger.error(f"Estimated price for {name} is not a valid number: {estimated_price}, error: {e}")
-                continue
-        elif isinstance(estimated_price, (int, float)):
-            logger.debug(f"Estimated price for {name} is already a scalar: {estimated_price}")
-        else:
-            logger.error(f"Unexpected type for estimated price for {name}: {type(estimated_price)}")
+        estimated_price = estimate_hotel_price(name, price_level, pick_up_date)
+        if estimated_price is None:
             continue
 
         if estimated_price <= budget:
-            logger.debug(f"Hotel {name} price {estimated_price} is within budget {budget}")
+            logger.debug("Hotel %s price %s is within budget %s", name, estimated_price, budget)
             geometry = place.get("geometry", {}).get("location", {})
             place_lat = geometry.get("lat", central_lat)
             place_lon = geometry.get("lng", central_lon)
-            logger.debug(f"Hotel {name} coordinates: lat={place_lat}, lon={place_lon}")
+            logger.debug("Hotel %s coordinates: lat=%s, lon=%s", name, place_lat, place_lon)
 
             try:
                 distance = haversine_distance(central_lat, central_lon, place_lat, place_lon)
-                logger.debug(f"Calculated distance for {name}: {distance} km")
+                logger.debug("Calculated distance for %s: %s km", name, distance)
             except Exception as e:
                 logger.error(f"Error calculating distance for {name}: {e}")
                 continue
@@ -146,7 +166,7 @@ def process_hotel_data(data, destination, budget, pick_up_date):
             review_texts = [review.get("text", "") for review in reviews[:2]]
             try:
                 json_reviews = json.dumps(review_texts)
-                logger.debug(f"Reviews for {name}: {json_reviews} (size: {len(json_reviews)} characters)")
+                logger.debug("Reviews for %s: %s (size: %s characters)", name, json_reviews, len(json_reviews))
             except ValueError as e:
                 logger.error(f"Invalid JSON for reviews in hotel {name}: {e}")
                 review_texts = ["Invalid review data"]
@@ -154,23 +174,16 @@ def process_hotel_data(data, destination, budget, pick_up_date):
 
             try:
                 db.insert_hotel(name, estimated_price, rating, distance, destination, place_lat, place_lon, review_texts)
-                logger.debug(f"Successfully inserted hotel {name} into database")
+                logger.debug("Successfully inserted hotel %s into database", name)
             except Exception as e:
                 logger.error(f"Failed to insert hotel {name} into database: {e}", exc_info=True)
                 logger.warning(f"Continuing with in-memory data for {name} despite DB failure")
 
-            hotels.append({
-                "name": name,
-                "price": estimated_price,
-                "rating": rating,
-                "distance": distance,
-                "city": destination,
-                "lat": place_lat,
-                "long": place_lon,
-                "reviews": review_texts
-            })
+            hotels.append(Place("hotel", name, rating, distance, place_lat, place_lon, review_texts,
+                                price=estimated_price, city=destination))
+            review_index.add(destination, f"hotel:{name}", review_texts)
         else:
-            logger.debug(f"Hotel {name} price {estimated_price} exceeds budget {budget}, skipping")
+            logger.debug("Hotel %s price %s exceeds budget %s, skipping", name, estimated_price, budget)
 
     logger.info(f"{len(hotels)} hotels found within budget for {destination}")
     if not hotels:
@@ -178,9 +191,8 @@ def process_hotel_data(data, destination, budget, pick_up_date):
     return hotels
 
 def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, hotel_lon=0, pick_up_time="10:00", drop_off_time="10:00"):
-    url = "https://priceline-com2.p.rapidapi.com/cars/search"
+    url = f"{PRICELINE_API_BASE}/cars/search"
     api_key = os.getenv("RAPIDAPI_KEY_PRICELINE")
-    logger.debug(f"Loaded RAPIDAPI_KEY_PRICELINE: {api_key}")
     logger.info(f"Fetching cars for {destination} with budget {budget}")
     
     if not api_key:
@@ -191,7 +203,7 @@ def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, ho
 
     try:
         central_lat, central_lon = get_coordinates(destination)
-        logger.debug(f"Coordinates for {destination}: lat={central_lat}, lon={central_lon}")
+        logger.debug("Coordinates for %s: lat=%s, lon=%s", destination, central_lat, central_lon)
         if isinstance(central_lat, pd.Series) or isinstance(central_lon, pd.Series):
             logger.error(f"Coordinates for {destination} returned as Series: lat={central_lat}, lon={central_lon}")
             return []
@@ -200,9 +212,9 @@ def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, ho
         logger.error(f"Failed to fetch coordinates for {destination}: {e}")
         return []
 
-    airport_code = get_airport_code(destination)
+    airport_code = get_airport_code(destination, central_lat, central_lon)
     location = airport_code if airport_code else f"{central_lat},{central_lon}"
-    logger.debug(f"Using location for car search: {location}")
+    logger.debug("Using location for car search: %s", location)
 
     params = {
         "pickUpLocation": location,
@@ -214,10 +226,8 @@ def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, ho
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        response.raise_for_status()
-        json_data = response.json()
-        logger.debug(f"Car API response for {destination}: {json_data}")
+        json_data = fetch_json(url, params=params, headers=headers, timeout=15, provider="rapidapi_priceline", site="fetch_cars")
+        debug_sampled(logger, "Car API response for %s: %s", destination, LazyJSON(json_data))
 
         if not isinstance(json_data, dict):
             logger.error(f"Priceline API Error: Response is not a dictionary - {json_data}")
@@ -231,7 +241,7 @@ def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, ho
         cars = []
         for vehicle in vehicles[:10]:
             price = vehicle.get("price", 0)
-            logger.debug(f"Car price: {price}, type: {type(price)}")
+            logger.debug("Car price: %s, type: %s", price, type(price))
 
             if isinstance(price, pd.Series):
                 logger.warning(f"Car price is a pandas Series: {price}")
@@ -245,42 +255,36 @@ def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, ho
                     price = price.item()
             price = float(price)
 
-            logger.debug(f"Car price after conversion: ${price}, budget: ${budget * 1.2}")
+            logger.debug("Car price after conversion: $%s, budget: $%s", price, budget * 1.2)
             if price > budget * 1.2:
-                logger.debug(f"Car ${price} exceeds budget {budget * 1.2}, skipping")
+                logger.debug("Car $%s exceeds budget %s, skipping", price, budget * 1.2)
                 continue
 
             vehicle_lat = vehicle.get("pickUpLocation", {}).get("latitude", hotel_lat if hotel_lat else central_lat)
             vehicle_lon = vehicle.get("pickUpLocation", {}).get("longitude", hotel_lon if hotel_lon else central_lon)
-            logger.debug(f"Car coordinates: lat={vehicle_lat}, lon={vehicle_lon}")
+            logger.debug("Car coordinates: lat=%s, lon=%s", vehicle_lat, vehicle_lon)
 
             try:
                 distance = haversine_distance(hotel_lat if hotel_lat else central_lat, hotel_lon if hotel_lon else central_lon, vehicle_lat, vehicle_lon)
-                logger.debug(f"Calculated distance for car: {distance} km")
+                logger.debug("Calculated distance for car: %s km", distance)
             except Exception as e:
                 logger.error(f"Error calculating distance for car: {e}")
                 continue
 
-            car = {
-                "name": vehicle.get("vehicleName", "Unknown Car"),
-                "price": price,
-                "rating": float(vehicle.get("rating", 0)),
-                "distance": distance,
-                "company": vehicle.get("company", "Unknown"),
-                "reviews": vehicle.get("reviews", []) if vehicle.get("reviews") else [],
-                "lat": vehicle_lat,
-                "long": vehicle_lon
-            }
+            car = Place("car", vehicle.get("vehicleName", "Unknown Car"), float(vehicle.get("rating", 0)), distance,
+                        vehicle_lat, vehicle_lon, vehicle.get("reviews") or [], price=price,
+                        company=vehicle.get("company", "Unknown"), city=destination)
             cars.append(car)
+            review_index.add(destination, f"car:{car.name}", car.reviews)
 
             try:
-                db.insert_car(car["name"], car["price"], car["rating"], car["distance"], car["company"], destination, car["reviews"])
-                logger.debug(f"Successfully inserted car {car['name']} into database")
+                db.insert_car(car.name, car.price, car.rating, car.distance, car.company, destination, list(car.reviews))
+                logger.debug("Successfully inserted car %s into database", car.name)
             except Exception as e:
-                logger.error(f"Failed to insert car {car['name']} into database: {e}", exc_info=True)
-                logger.warning(f"Continuing with in-memory data for car {car['name']} despite DB failure")
+                logger.error(f"Failed to insert car {car.name} into database: {e}", exc_info=True)
+                logger.warning(f"Continuing with in-memory data for car {car.name} despite DB failure")
 
-        logger.debug(f"Returning {len(cars)} cars for {destination}")
+        logger.debug("Returning %s cars for %s", len(cars), destination)
         if not cars:
             logger.warning(f"No cars found within budget {budget * 1.2} for {destination}")
         return cars
@@ -295,10 +299,9 @@ def fetch_cars(destination, budget, pick_up_date, drop_off_date, hotel_lat=0, ho
         logger.error(f"An error occurred in fetch_cars: {e}", exc_info=True)
         return []
 
-def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hotel_lon=0):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hotel_lon=0, max_details=10, score_images=True):
+    url = f"{GOOGLE_MAPS_API_BASE}/place/textsearch/json"
     api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-    logger.debug(f"Loaded GOOGLE_PLACES_API_KEY: {api_key}")
     logger.info(f"Fetching attractions for {destination}")
     
     if not api_key:
@@ -307,7 +310,7 @@ def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
 
     try:
         central_lat, central_lon = get_coordinates(destination)
-        logger.debug(f"Coordinates for {destination}: lat={central_lat}, lon={central_lon}")
+        logger.debug("Coordinates for %s: lat=%s, lon=%s", destination, central_lat, central_lon)
         if isinstance(central_lat, pd.Series) or isinstance(central_lon, pd.Series):
             logger.error(f"Coordinates for {destination} returned as Series: lat={central_lat}, lon={central_lon}")
             raise ValueError("Coordinates must be scalar values")
@@ -318,17 +321,18 @@ def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
 
     params = {"query": f"attractions in {destination}", "type": "tourist_attraction", "key": api_key}
     try:
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Attraction API response for {destination}: {data}")
+        data = fetch_json(url, params=params, timeout=15, provider="google_places", site="fetch_attractions")
+        debug_sampled(logger, "Attraction API response for %s: %s", destination, LazyJSON(data))
 
         if not isinstance(data, dict) or data.get("status") != "OK":
             logger.error(f"Google Places API Error (Attractions) for {destination}: {data.get('error_message', 'Unknown error')}")
             raise ValueError("Attraction search failed")
 
         attractions = []
-        for place in data.get("results", [])[:10]:
+        for place in data.get("results", [])[:max_details]:
+            if out_of_time():
+                logger.warning(f"Request deadline reached; returning {len(attractions)} attractions for {destination}")
+                break
             place_id = place.get("place_id")
             name = place.get("name", "Unknown")
             rating = float(place.get("rating", 0))
@@ -336,21 +340,27 @@ def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
             location = geometry.get("location", {})
             place_lat = location.get("lat", hotel_lat if hotel_lat else central_lat)
             place_lon = location.get("lng", hotel_lon if hotel_lon else central_lon)
-            logger.debug(f"Attraction {name} coordinates: lat={place_lat}, lon={place_lon}")
+            logger.debug("Attraction %s coordinates: lat=%s, lon=%s", name, place_lat, place_lon)
 
             try:
                 distance = haversine_distance(hotel_lat if hotel_lat else central_lat, hotel_lon if hotel_lon else central_lon, place_lat, place_lon)
-                logger.debug(f"Calculated distance for {name}: {distance} km")
+                logger.debug("Calculated distance for %s: %s km", name, distance)
             except Exception as e:
                 logger.error(f"Error calculating distance for {name}: {e}")
                 continue
 
-            details_url = "https://maps.googleapis.com/maps/api/place/details/json"
+            details_url = f"{GOOGLE_MAPS_API_BASE}/place/details/json"
             details_params = {"place_id": place_id, "fields": "name,rating,reviews,types,photos", "key": api_key}
-            details_response = requests.get(details_url, params=details_params, timeout=15)
-            details_response.raise_for_status()
-            details_data = details_response.json()
-            logger.debug(f"Attraction details response for {name}: {details_data}")
+            try:
+                with span("details"):
+                    details_data = fetch_json(details_url, params=details_params, timeout=15, provider="google_places", site="place_details")
+            except QuotaExceeded as e:
+                logger.warning(f"{e}; returning {len(attractions)} attractions for {destination}")
+                break
+            except requests.RequestException as e:
+                logger.warning(f"Skipping details for {name}: {e}")
+                continue
+            debug_sampled(logger, "Attraction details response for %s: %s", name, LazyJSON(details_data))
 
             if details_data.get("status") != "OK":
                 logger.error(f"Google Place Details Error (Attractions) for {name}: {details_data.get('error_message', 'Unknown error')}")
@@ -360,15 +370,21 @@ def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
             review_texts = [review.get("text", "") for review in reviews[:2]]
             types = details_data.get("result", {}).get("types", [])
             is_indoor = any(t in ["museum", "gallery", "indoor"] for t in types)
-            logger.debug(f"Attraction {name} is_indoor: {is_indoor}")
+            logger.debug("Attraction %s is_indoor: %s", name, is_indoor)
 
             image_score = 0
-            if "photos" in details_data.get("result", {}) and details_data["result"]["photos"]:
-                photo_ref = details_data["result"]["photos"][0]["photo_reference"]
-                photo_url = f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=400&photoreference={photo_ref}&key={api_key}"
+            photos = details_data.get("result", {}).get("photos")
+            photo_ref = photos[0]["photo_reference"] if photos else None
+            remembered_score = cached_score(photo_ref) if photo_ref else None
+            if remembered_score is not None:
+                # Remembered scores cost nothing, so they are used even while image scoring is shed
+                image_score = remembered_score
+            elif score_images and photo_ref:
+                photo_url = f"{GOOGLE_MAPS_API_BASE}/place/photo?maxwidth=400&photoreference={photo_ref}&key={api_key}"
                 try:
-                    image_score = score_image(photo_url)
-                    logger.debug(f"Image score for {name}: {image_score}, type: {type(image_score)}")
+                    with span("image_scoring"):
+                        image_score = score_image(photo_url, photo_reference=photo_ref)
+                    logger.debug("Image score for %s: %s, type: %s", name, image_score, type(image_score))
                     if isinstance(image_score, pd.Series):
                         logger.warning(f"Image score for {name} is a pandas Series: {image_score}")
                         if image_score.empty:
@@ -384,26 +400,19 @@ def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
                     logger.error(f"Error scoring image for {name}: {e}")
                     image_score = 0
 
-            attraction = {
-                "name": name,
-                "rating": rating,
-                "distance": distance,
-                "reviews": review_texts,
-                "is_indoor": is_indoor,
-                "image_score": image_score,
-                "lat": place_lat,
-                "long": place_lon
-            }
+            attraction = Place("attraction", name, rating, distance, place_lat, place_lon, review_texts,
+                               is_indoor=is_indoor, image_score=image_score, city=destination, types=types)
             attractions.append(attraction)
+            review_index.add(destination, f"attraction:{name}", review_texts)
 
             try:
                 db.insert_attraction(name, rating, distance, destination, place_lat, place_lon, review_texts, is_indoor, image_score)
-                logger.debug(f"Successfully inserted attraction {name} into database")
+                logger.debug("Successfully inserted attraction %s into database", name)
             except Exception as e:
                 logger.error(f"Failed to insert attraction {name} into database: {e}", exc_info=True)
                 logger.warning(f"Continuing with in-memory data for attraction {name} despite DB failure")
 
-        logger.debug(f"Returning {len(attractions)} attractions for {destination}")
+        logger.debug("Returning %s attractions for %s", len(attractions), destination)
         if not attractions:
             logger.warning(f"No attractions found for {destination}")
         return attractions
@@ -418,10 +427,9 @@ def fetch_attractions(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
         logger.error(f"An error occurred in fetch_attractions: {e}", exc_info=True)
         raise
 
-def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hotel_lon=0):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hotel_lon=0, max_details=10):
+    url = f"{GOOGLE_MAPS_API_BASE}/place/textsearch/json"
     api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-    logger.debug(f"Loaded GOOGLE_PLACES_API_KEY: {api_key}")
     logger.info(f"Fetching restaurants for {destination}")
     
     if not api_key:
@@ -430,7 +438,7 @@ def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
 
     try:
         central_lat, central_lon = get_coordinates(destination)
-        logger.debug(f"Coordinates for {destination}: lat={central_lat}, lon={central_lon}")
+        logger.debug("Coordinates for %s: lat=%s, lon=%s", destination, central_lat, central_lon)
         if isinstance(central_lat, pd.Series) or isinstance(central_lon, pd.Series):
             logger.error(f"Coordinates for {destination} returned as Series: lat={central_lat}, lon={central_lon}")
             raise ValueError("Coordinates must be scalar values")
@@ -441,17 +449,18 @@ def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
 
     params = {"query": f"restaurants in {destination}", "type": "restaurant", "key": api_key}
     try:
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Restaurant API response for {destination}: {data}")
+        data = fetch_json(url, params=params, timeout=15, provider="google_places", site="fetch_restaurants")
+        debug_sampled(logger, "Restaurant API response for %s: %s", destination, LazyJSON(data))
 
         if not isinstance(data, dict) or data.get("status") != "OK":
             logger.error(f"Google Places API Error (Restaurants) for {destination}: {data.get('error_message', 'Unknown error')}")
             raise ValueError("Restaurant search failed")
 
         restaurants = []
-        for place in data.get("results", [])[:10]:
+        for place in data.get("results", [])[:max_details]:
+            if out_of_time():
+                logger.warning(f"Request deadline reached; returning {len(restaurants)} restaurants for {destination}")
+                break
             place_id = place.get("place_id")
             name = place.get("name", "Unknown")
             rating = float(place.get("rating", 0))
@@ -459,21 +468,27 @@ def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
             location = geometry.get("location", {})
             place_lat = location.get("lat", hotel_lat if hotel_lat else central_lat)
             place_lon = location.get("lng", hotel_lon if hotel_lon else central_lon)
-            logger.debug(f"Restaurant {name} coordinates: lat={place_lat}, lon={place_lon}")
+            logger.debug("Restaurant %s coordinates: lat=%s, lon=%s", name, place_lat, place_lon)
 
             try:
                 distance = haversine_distance(hotel_lat if hotel_lat else central_lat, hotel_lon if hotel_lon else central_lon, place_lat, place_lon)
-                logger.debug(f"Calculated distance for {name}: {distance} km")
+                logger.debug("Calculated distance for %s: %s km", name, distance)
             except Exception as e:
                 logger.error(f"Error calculating distance for {name}: {e}")
                 continue
 
-            details_url = "https://maps.googleapis.com/maps/api/place/details/json"
+            details_url = f"{GOOGLE_MAPS_API_BASE}/place/details/json"
             details_params = {"place_id": place_id, "fields": "name,rating,reviews", "key": api_key}
-            details_response = requests.get(details_url, params=details_params, timeout=15)
-            details_response.raise_for_status()
-            details_data = details_response.json()
-            logger.debug(f"Restaurant details response for {name}: {details_data}")
+            try:
+                with span("details"):
+                    details_data = fetch_json(details_url, params=details_params, timeout=15, provider="google_places", site="place_details")
+            except QuotaExceeded as e:
+                logger.warning(f"{e}; returning {len(restaurants)} restaurants for {destination}")
+                break
+            except requests.RequestException as e:
+                logger.warning(f"Skipping details for {name}: {e}")
+                continue
+            debug_sampled(logger, "Restaurant details response for %s: %s", name, LazyJSON(details_data))
 
             if details_data.get("status") != "OK":
                 logger.error(f"Google Place Details Error (Restaurants) for {name}: {details_data.get('error_message', 'Unknown error')}")
@@ -482,24 +497,19 @@ def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
             reviews = details_data.get("result", {}).get("reviews", [])
             review_texts = [review.get("text", "") for review in reviews[:2]]
 
-            restaurant = {
-                "name": name,
-                "rating": rating,
-                "distance": distance,
-                "reviews": review_texts,
-                "lat": place_lat,
-                "long": place_lon
-            }
+            restaurant = Place("restaurant", name, rating, distance, place_lat, place_lon, review_texts, city=destination,
+                               types=place.get("types", ()))
             restaurants.append(restaurant)
+            review_index.add(destination, f"restaurant:{name}", review_texts)
 
             try:
                 db.insert_restaurant(name, rating, distance, destination, place_lat, place_lon, review_texts)
-                logger.debug(f"Successfully inserted restaurant {name} into database")
+                logger.debug("Successfully inserted restaurant %s into database", name)
             except Exception as e:
                 logger.error(f"Failed to insert restaurant {name} into database: {e}", exc_info=True)
                 logger.warning(f"Continuing with in-memory data for restaurant {name} despite DB failure")
 
-        logger.debug(f"Returning {len(restaurants)} restaurants for {destination}")
+        logger.debug("Returning %s restaurants for %s", len(restaurants), destination)
         if not restaurants:
             logger.warning(f"No restaurants found for {destination}")
         return restaurants
@@ -514,30 +524,35 @@ def fetch_restaurants(destination, pick_up_date, drop_off_date, hotel_lat=0, hot
         logger.error(f"An error occurred in fetch_restaurants: {e}", exc_info=True)
         raise
 
-def generate_plans(hotels, cars, attractions, restaurants, destination, pick_up_date, drop_off_date, budget, preferred_days=None):
+def generate_plans(hotels, cars, attractions, restaurants, destination, pick_up_date, drop_off_date, budget, preferred_days=None, review_keywords=None, alternatives=False):
     """
     Generate 2-3 daily plans for the given date range, ensuring total cost is within budget or up to 20% more.
     
     Args:
-        hotels (list): List of hotel dictionaries.
-        cars (list): List of car dictionaries.
-        attractions (list): List of attraction dictionaries.
-        restaurants (list): List of restaurant dictionaries.
+        hotels (list): Hotel Place records.
+        cars (list): Car Place records.
+        attractions (list): Attraction Place records.
+        restaurants (list): Restaurant Place records.
         destination (str): The destination city.
         pick_up_date (datetime): Start date of the trip.
         drop_off_date (datetime): End date of the trip.
         budget (float): User's budget.
         preferred_days (int, optional): Number of days the user wants the plan for (e.g., 1 for a 1-day plan).
+        review_keywords (str, optional): Keywords or "quoted phrases" (e.g. 'pool "free parking"'); places
+            whose reviews match them are ranked higher.
+        alternatives (bool, optional): Instead of one plan per length, return the Pareto-optimal cost/quality
+            alternatives across every hotel, car and trip length up to `preferred_days` (or the trip length).
     
     Returns:
-        list: List of plans, each containing a day-by-day schedule.
+        list: Plan objects, each with a day-by-day schedule referencing places in a shared CityCatalog. Schedules
+            are LazySchedules: a day is built the first time it is rendered or edited.
     """
     logger.info(f"Generating plans for {destination} from {pick_up_date} to {drop_off_date} with budget {budget}")
 
     # Get coordinates for the destination to fetch weather
     try:
         dest_lat, dest_lon = get_coordinates(destination)
-        logger.debug(f"Coordinates for {destination}: lat={dest_lat}, lon={dest_lon}")
+        logger.debug("Coordinates for %s: lat=%s, lon=%s", destination, dest_lat, dest_lon)
         if isinstance(dest_lat, pd.Series) or isinstance(dest_lon, pd.Series):
             logger.error(f"Coordinates for {destination} returned as Series: lat={dest_lat}, lon={dest_lon}")
             raise ValueError("Coordinates must be scalar values")
@@ -548,7 +563,7 @@ def generate_plans(hotels, cars, attractions, restaurants, destination, pick_up_
 
     # Calculate the total number of days in the trip
     total_days = (drop_off_date - pick_up_date).days + 1
-    logger.debug(f"Total days in trip: {total_days}")
+    logger.debug("Total days in trip: %s", total_days)
 
     # If the user specified a preferred number of days, use that; otherwise, generate plans for 1, 2, and 3 days
     if preferred_days:
@@ -566,259 +581,223 @@ def generate_plans(hotels, cars, attractions, restaurants, destination, pick_up_
 
     # Calculate the maximum allowable budget (budget + 20%)
     max_budget = budget * 1.2
-    logger.debug(f"Maximum allowable budget (budget + 20%): ${max_budget}")
-
-    # Select a hotel (use the first one within budget)
-    selected_hotel = None
-    for hotel in hotels:
-        if hotel["price"] <= budget:
-            selected_hotel = hotel
-            break
-    if not selected_hotel:
-        logger.warning("No hotels found within budget. Using the cheapest hotel.")
-        selected_hotel = min(hotels, key=lambda x: x["price"], default=None)
-        if not selected_hotel:
-            logger.error("No hotels available to generate plans.")
-            return []
+    logger.debug("Maximum allowable budget (budget + 20%%): $%s", max_budget)
 
-    hotel_cost_per_night = selected_hotel["price"]
-    hotel_lat = selected_hotel["lat"]
-    hotel_lon = selected_hotel["long"]
-    logger.debug(f"Selected hotel: {selected_hotel['name']}, cost per night: ${hotel_cost_per_night}")
-
-    # Select a car (use the first one within budget)
-    selected_car = None
-    for car in cars:
-        # Estimate car cost for the entire trip (assuming daily rate)
-        car_daily_rate = car["price"]
-        car_total_cost = car_daily_rate * total_days
-        if car_total_cost <= budget * 0.3:  # Allocate 30% of budget to car
-            selected_car = car
-            break
-    if not selected_car:
-        logger.warning("No cars found within budget. Using the cheapest car.")
-        selected_car = min(cars, key=lambda x: x["price"], default=None)
-        if not selected_car:
-            logger.warning("No cars available. Plans will not include car travel.")
-            selected_car = None
-        else:
-            car_daily_rate = selected_car["price"]
-            logger.debug(f"Selected car: {selected_car['name']}, daily rate: ${car_daily_rate}")
-
-    # Sort attractions and restaurants by rating and distance
-    attractions = sorted(attractions, key=lambda x: (-x["rating"], x["distance"]))
-    restaurants = sorted(restaurants, key=lambda x: (-x["rating"], x["distance"]))
+    if not hotels:
+        logger.error("No hotels available to generate plans.")
+        return []
 
-    # Generate plans for each plan length
-    plans = []
-    for plan_days in plan_lengths:
-        logger.debug(f"Generating plan for {plan_days} days")
-
-        # Calculate costs for this plan
-        hotel_cost = hotel_cost_per_night * plan_days
-        car_cost = selected_car["price"] * plan_days if selected_car else 0
-        remaining_budget = budget - hotel_cost - car_cost
-        if remaining_budget < 0:
-            logger.warning(f"Hotel and car costs (${hotel_cost + car_cost}) exceed budget (${budget}) for {plan_days}-day plan. Checking if within max budget.")
-            if (hotel_cost + car_cost) > max_budget:
-                logger.warning(f"Hotel and car costs (${hotel_cost + car_cost}) exceed max budget (${max_budget}) for {plan_days}-day plan. Skipping.")
+    # Review keyword matches, the recommendation model and photo scores all feed a single utility
+    keyword_matches = review_index.match_counts(destination, review_keywords) if review_keywords else {}
+    preferences = {}
+    try:
+        scores = recommendation_model.predict_preferences([(hotel.price, hotel.distance) for hotel in hotels])
+        preferences = {id(hotel): float(score) for hotel, score in zip(hotels, scores)}
+    except Exception as e:
+        logger.warning(f"Recommendation scores unavailable, ranking hotels without them: {e}")
+    utilities = {}
+
+    # One many-to-many travel-time request for the city (cached, and shared with chat edits)
+    # instead of a speed estimate per place; the row from the city centre feeds the utility
+    center = {"name": f"{destination} center", "lat": dest_lat, "long": dest_lon, "distance": 0.0}
+    travel = travel_time_service.matrix(destination, [center] + hotels + cars + attractions + restaurants)
+    from_center = travel.base_minutes[travel.index[place_key(center)]]
+
+    def utility(place):
+        key = id(place)
+        if key not in utilities:
+            travel_minutes = float(from_center[travel.index[place_key(place)]])
+            utilities[key] = place_utility(place, keyword_matches, preferences.get(key), travel_minutes)
+        return utilities[key]
+
+    # The old greedy choice (first hotel under budget, first car under 30% of it) seeds the optimizer
+    greedy_hotel = next((hotel for hotel in hotels if hotel.price <= budget), None) or min(hotels, key=lambda x: x.price)
+    greedy_car = next((car for car in cars if car.price * total_days <= budget * 0.3), None) or min(cars, key=lambda x: x.price, default=None)
+    if not cars:
+        logger.warning("No cars available. Plans will not include car travel.")
+
+    # One catalog per request; plans and schedule entries refer to places by catalog index
+    catalog = CityCatalog.from_places(destination, hotels, cars, attractions, restaurants)
+    optimizer = PlanOptimizer(budget, utility)
+    catalog.set_ranking("attraction", sorted(attractions, key=lambda x: -utility(x)))
+    catalog.set_ranking("restaurant", sorted(restaurants, key=lambda x: -utility(x)))
+
+    # Weather is looked up once per date and shared by every plan length; rainy days then
+    # substitute indoor attractions from the POI index without further provider calls
+    weather_by_date = {}
+
+    def weather_for(date):
+        date_str = date.strftime("%Y-%m-%d")
+        record_cache("plan_weather", date_str in weather_by_date)
+        if date_str not in weather_by_date:
+            try:
+                weather_data = fetch_weather(dest_lat, dest_lon, date, date)
+            except Exception as e:
+                # Days are built lazily, possibly in a later request; a weather failure must not
+                # abort the plan's day generator, so the day goes ahead without weather (uncached)
+                logger.warning(f"Weather unavailable for {destination} on {date_str}: {e}")
+                return "Weather unavailable"
+            weather_by_date[date_str] = weather_data.get(date_str, "Weather unavailable")
+        return weather_by_date[date_str]
+
+    # Choose hotel, car, attractions and restaurants together, either the best plan per length or
+    # the whole cost/quality frontier from one vectorized pass
+    if alternatives:
+        selections = optimizer.alternatives(list(range(1, max(plan_lengths) + 1)), hotels, cars, attractions, restaurants)
+        logger.info(f"Found {len(selections)} Pareto-optimal alternatives for {destination}")
+    else:
+        selections = []
+        for plan_days in plan_lengths:
+            selection = optimizer.optimize(plan_days, hotels, cars, attractions, restaurants, greedy=(greedy_hotel, greedy_car))
+            if selection is None:
+                logger.warning(f"No hotel and car combination fits the max budget (${max_budget}) for {plan_days}-day plan. Skipping.")
                 continue
-            remaining_budget = max_budget - hotel_cost - car_cost
-
-        # Allocate remaining budget for meals and activities
-        meal_cost_per_day = 50  # Estimate $50 per day for meals
-        total_meal_cost = meal_cost_per_day * plan_days
-        if total_meal_cost > remaining_budget:
-            logger.warning(f"Meal costs (${total_meal_cost}) exceed remaining budget (${remaining_budget}) for {plan_days}-day plan. Adjusting.")
-            total_meal_cost = remaining_budget * 0.5  # Allocate 50% of remaining budget to meals
-            remaining_budget -= total_meal_cost
-        else:
-            remaining_budget -= total_meal_cost
-
-        # Estimate attraction costs (e.g., $20 per attraction)
-        attraction_cost_per_visit = 20
-        max_attractions = int(remaining_budget // attraction_cost_per_visit)
-        logger.debug(f"Remaining budget after hotel, car, and meals: ${remaining_budget}, can afford {max_attractions} attractions")
-
-        # Generate the daily schedule
-        plan = {
-            "days": plan_days,
-            "total_cost": 0,
-            "schedule": [],
-            "hotel": selected_hotel,
-            "car": selected_car
-        }
+            selections.append(selection)
+
+    def schedule_days(selection, plan, poi_index):
+        """Yield the plan's DaySchedules one at a time; the generator's locals are the plan's cursor."""
+        plan_days = selection.days
+        selected_hotel, selected_car = selection.hotel, selection.car
+        hotel_index, car_index = plan.hotel_index, plan.car_index
+        hotel_cost_per_night = selected_hotel.price
+        meal_cost_per_day = MEAL_COST_PER_DAY
+        total_meal_cost = selection.meal_cost
+        attraction_cost_per_visit = ATTRACTION_COST_PER_VISIT
+        max_attractions = len(selection.attractions)
+        plan_restaurants = selection.restaurants
         current_date = pick_up_date
-        used_attractions = []
-        used_restaurants = []
+        used_attractions = set()
+        used_restaurants = set()
 
         for day in range(plan_days):
             daily_schedule = []
             daily_cost = hotel_cost_per_night  # Hotel cost for this day
             if selected_car:
-                daily_cost += selected_car["price"]  # Car cost for this day
-
-            # Get the date string for fetching weather
-            date_str = current_date.strftime("%Y-%m-%d")
+                daily_cost += selected_car.price  # Car cost for this day
 
             # 10:00 AM - Pick up car (if available)
             if selected_car:
-                schedule_entry = {
-                    "time": "10:00 AM",
-                    "activity": "Pick up car",
-                    "details": {
-                        "name": selected_car["name"],
-                        "company": selected_car["company"],
-                        "distance": selected_car["distance"],
-                        "rating": selected_car["rating"],
-                        "location": f"Coordinates: ({selected_car['lat']}, {selected_car['long']})",
-                        "cost": selected_car["price"]
-                    }
-                }
-                daily_schedule.append(schedule_entry)
+                daily_schedule.append(ScheduleEntry(catalog, car_index, "10:00 AM", "Pick up car", selected_car.price))
+
+            weather = weather_for(current_date) if selection.attractions or plan_restaurants else "Weather unavailable"
+            is_rainy = "Rain" in weather
 
             # 10:30 AM - Visit first attraction
             attraction1 = None
-            for attr in attractions:
-                if attr not in used_attractions and len(used_attractions) < max_attractions:
-                    attraction1 = attr
-                    used_attractions.append(attr)
-                    break
+            if len(used_attractions) < max_attractions:
+                attraction1 = poi_index.pick(used_attractions, prefer_indoor=is_rainy)
+                if attraction1:
+                    used_attractions.add(attraction1)
             if attraction1:
-                # Fetch weather for the current day (start_date and end_date are the same)
-                weather_data = fetch_weather(dest_lat, dest_lon, current_date, current_date)
-                weather = weather_data.get(date_str, "Weather unavailable")
-                schedule_entry = {
-                    "time": "10:30 AM",
-                    "activity": "Visit attraction",
-                    "details": {
-                        "name": attraction1["name"],
-                        "distance": attraction1["distance"],
-                        "rating": attraction1["rating"],
-                        "reviews": attraction1["reviews"],
-                        "location": f"Coordinates: ({attraction1['lat']}, {attraction1['long']})",
-                        "weather": weather,
-                        "cost": attraction_cost_per_visit
-                    }
-                }
-                daily_schedule.append(schedule_entry)
+                daily_schedule.append(ScheduleEntry(catalog, catalog.index_of(attraction1), "10:30 AM", "Visit attraction",
+                                                    attraction_cost_per_visit, weather))
                 daily_cost += attraction_cost_per_visit
 
             # 1:00 PM - Lunch at a restaurant
-            restaurant = None
-            for rest in restaurants:
-                if rest not in used_restaurants:
-                    restaurant = rest
-                    used_restaurants.append(rest)
+            restaurant_index = None
+            for rest in plan_restaurants:
+                index = catalog.index_of(rest)
+                if index not in used_restaurants:
+                    restaurant_index = index
+                    used_restaurants.add(index)
                     break
-            if restaurant:
-                # Fetch weather for the current day (start_date and end_date are the same)
-                weather_data = fetch_weather(dest_lat, dest_lon, current_date, current_date)
-                weather = weather_data.get(date_str, "Weather unavailable")
+            if restaurant_index is not None:
                 meal_cost = min(meal_cost_per_day, total_meal_cost / plan_days)  # Distribute meal cost evenly
-                schedule_entry = {
-                    "time": "1:00 PM",
-                    "activity": "Lunch",
-                    "details": {
-                        "name": restaurant["name"],
-                        "distance": restaurant["distance"],
-                        "rating": restaurant["rating"],
-                        "reviews": restaurant["reviews"],
-                        "location": f"Coordinates: ({restaurant['lat']}, {restaurant['long']})",
-                        "weather": weather,
-                        "cost": meal_cost
-                    }
-                }
-                daily_schedule.append(schedule_entry)
+                daily_schedule.append(ScheduleEntry(catalog, restaurant_index, "1:00 PM", "Lunch", meal_cost, weather))
                 daily_cost += meal_cost
 
             # 3:00 PM - Visit second attraction
             attraction2 = None
-            for attr in attractions:
-                if attr not in used_attractions and len(used_attractions) < max_attractions:
-                    attraction2 = attr
-                    used_attractions.append(attr)
-                    break
+            if len(used_attractions) < max_attractions:
+                attraction2 = poi_index.pick(used_attractions, prefer_indoor=is_rainy)
+                if attraction2:
+                    used_attractions.add(attraction2)
             if attraction2:
-                # Fetch weather for the current day (start_date and end_date are the same)
-                weather_data = fetch_weather(dest_lat, dest_lon, current_date, current_date)
-                weather = weather_data.get(date_str, "Weather unavailable")
-                schedule_entry = {
-                    "time": "3:00 PM",
-                    "activity": "Visit attraction",
-                    "details": {
-                        "name": attraction2["name"],
-                        "distance": attraction2["distance"],
-                        "rating": attraction2["rating"],
-                        "reviews": attraction2["reviews"],
-                        "location": f"Coordinates: ({attraction2['lat']}, {attraction2['long']})",
-                        "weather": weather,
-                        "cost": attraction_cost_per_visit
-                    }
-                }
-                daily_schedule.append(schedule_entry)
+                daily_schedule.append(ScheduleEntry(catalog, catalog.index_of(attraction2), "3:00 PM", "Visit attraction",
+                                                    attraction_cost_per_visit, weather))
                 daily_cost += attraction_cost_per_visit
 
-            # 7:00 PM - Return to hotel for dinner and sleep
-            schedule_entry = {
-                "time": "7:00 PM",
-                "activity": "Return to hotel",
-                "details": {
-                    "name": selected_hotel["name"],
-                    "distance": 0,  # Already at hotel
-                    "rating": selected_hotel["rating"],
-                    "reviews": selected_hotel["reviews"],
-                    "location": f"Coordinates: ({hotel_lat}, {hotel_lon})",
-                    "cost": 0  # Dinner cost included in hotel cost
-                }
-            }
-            daily_schedule.append(schedule_entry)
-
-            # Add the daily schedule to the plan
-            plan["schedule"].append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "day": day + 1,
-                "activities": daily_schedule,
-                "daily_cost": daily_cost
-            })
-            plan["total_cost"] += daily_cost
+            # 7:00 PM - Return to hotel for dinner and sleep (dinner cost included in hotel cost)
+            daily_schedule.append(ScheduleEntry(catalog, hotel_index, "7:00 PM", "Return to hotel", 0, distance_override=0))
+
+            yield DaySchedule(current_date.strftime("%Y-%m-%d"), day + 1, daily_schedule, daily_cost)
             current_date += timedelta(days=1)
 
+    # Generate a plan for each selection; days are only built when they are first shown or edited
+    plans = []
+    for selection in selections:
+        plan_days = selection.days
+        logger.debug("Generating plan for %s days", plan_days)
+        selected_hotel, selected_car = selection.hotel, selection.car
+        hotel_index = catalog.index_of(selected_hotel)
+        car_index = catalog.index_of(selected_car) if selected_car else None
+        poi_index = POIIndex(destination, selection.attractions, key=lambda x: -utility(x))
+        logger.debug("Selected hotel %s ($%s/night), car %s, %s attractions, utility %.2f", selected_hotel.name,
+                     selected_hotel.price, selected_car.name if selected_car else None, len(selection.attractions), selection.utility)
+
+        plan = Plan(plan_days, catalog, hotel_index, car_index)
+        plan.schedule = LazySchedule(schedule_days(selection, plan, poi_index), plan_days)
+        # Chat edits must not hand out a place a later day will be built with
+        plan.reserved = frozenset(catalog.index_of(p) for p in [*selection.attractions, *selection.restaurants])
+        # The total is known without building any day: hotel and car every day, each chosen attraction
+        # once (at most two a day), and one lunch a day while the chosen restaurants last
+        meal_cost = min(MEAL_COST_PER_DAY, selection.meal_cost / plan_days)
+        plan.total_cost = (plan_days * (selected_hotel.price + (selected_car.price if selected_car else 0))
+                           + min(len(selection.attractions), ATTRACTIONS_PER_DAY * plan_days) * ATTRACTION_COST_PER_VISIT
+                           + min(plan_days, len(selection.restaurants)) * meal_cost)
+
         # Check if the plan is within the maximum allowable budget (budget + 20%)
-        if plan["total_cost"] <= max_budget:
+        if plan.total_cost <= max_budget:
             plans.append(plan)
         else:
-            logger.warning(f"Plan for {plan_days} days exceeds maximum allowable budget (${plan['total_cost']} > ${max_budget}). Skipping.")
+            logger.warning(f"Plan for {plan_days} days exceeds maximum allowable budget (${plan.total_cost} > ${max_budget}). Skipping.")
 
     logger.info(f"Generated {len(plans)} plans for {destination}")
     return plans
 
+@app.before_request
+def start_request_timings():
+    g.timings = start_request(f"{request.method} {request.path}")
+    # Every stage of the request draws provider timeouts from this shared budget (REQUEST_SLO_SECONDS)
+    g.deadline = begin_deadline()
+
+@app.teardown_request
+def clear_request_deadline(exc):
+    end_deadline()
+
+@app.after_request
+def log_request_timings(response):
+    summary = finish_request(response.status_code)
+    if summary:
+        logger.info("Request timings: %s", summary)
+    return response
+
 @app.route("/", methods=["GET", "POST"])
 def home():
     if request.method == "POST":
         try:
             logger.info("Received POST request to /")
-            logger.debug(f"Raw form data: {request.form.to_dict()}")
+            debug_sampled(logger, "Raw form data: %s", LazyJSON(request.form.to_dict()))
 
             text_input = request.form.get("text_input", "").strip()
             destinations = request.form.get("destinations", "").strip()
-            logger.debug(f"Text input: {text_input}, Destinations: {destinations}")
+            logger.debug("Text input: %s, Destinations: %s", text_input, destinations)
 
             destination = None
             if text_input:
-                logger.debug(f"Parsing text_input: {text_input}")
+                logger.debug("Parsing text_input: %s", text_input)
                 parsed_destination, budget_from_text, preferences = parse_nlp_input(text_input)
-                logger.debug(f"Parsed NLP input: destination={parsed_destination}, budget={budget_from_text}, preferences={preferences}")
+                logger.debug("Parsed NLP input: destination=%s, budget=%s, preferences=%s", parsed_destination, budget_from_text, preferences)
                 if parsed_destination:
                     destination = parsed_destination
                 else:
                     logger.warning("Failed to parse destination from text_input")
             elif destinations:
                 destination_list = [d.strip() for d in destinations.split(",") if d.strip()]
-                logger.debug(f"Parsed destinations list: {destination_list}")
+                logger.debug("Parsed destinations list: %s", destination_list)
                 if destination_list:
                     destination = destination_list[0]
-                    logger.debug(f"Selected first destination: {destination}")
+                    logger.debug("Selected first destination: %s", destination)
                 else:
                     logger.warning("Destinations field is empty after parsing")
 
@@ -830,11 +809,13 @@ def home():
             pick_up_date_str = request.form.get("pickUpDate")
             pick_up_time = request.form.get("pickUpTime", "10:00")
             preferred_days = request.form.get("preferredDays")
-            logger.debug(f"Form data: destination={destination}, budget={budget}, pickUpDate={pick_up_date_str}, pickUpTime={pick_up_time}, preferredDays={preferred_days}")
+            review_keywords = request.form.get("reviewKeywords", "").strip()
+            show_alternatives = request.form.get("planMode") == "alternatives"
+            logger.debug("Form data: destination=%s, budget=%s, pickUpDate=%s, pickUpTime=%s, preferredDays=%s", destination, budget, pick_up_date_str, pick_up_time, preferred_days)
 
             try:
                 budget = float(budget)
-                logger.debug(f"Converted budget to float: {budget}")
+                logger.debug("Converted budget to float: %s", budget)
             except (ValueError, TypeError) as e:
                 logger.error(f"Invalid budget value: {budget}, error: {e}")
                 return "Error: Budget must be a valid number", 400
@@ -849,7 +830,7 @@ def home():
 
             try:
                 pick_up_date = datetime.strptime(pick_up_date_str, "%Y-%m-%d")
-                logger.debug(f"Parsed start date: pickUpDate={pick_up_date}")
+                logger.debug("Parsed start date: pickUpDate=%s", pick_up_date)
             except ValueError as e:
                 logger.error(f"Invalid date format: pickUpDate={pick_up_date_str}, error: {e}")
                 return "Error: Start date must be in YYYY-MM-DD format", 400
@@ -872,45 +853,146 @@ def home():
 
             # Calculate drop-off date based on preferred_days
             drop_off_date = pick_up_date + timedelta(days=preferred_days - 1)
-            logger.debug(f"Calculated drop-off date: {drop_off_date}")
+            logger.debug("Calculated drop-off date: %s", drop_off_date)
 
             # Use pick_up_time for drop-off time as well
             drop_off_time = pick_up_time
 
-            hotels = fetch_hotels(destination, budget, pick_up_date, drop_off_date)
-            logger.info(f"Fetched {len(hotels)} hotels for {destination}")
-            cars = fetch_cars(destination, budget, pick_up_date, drop_off_date, pick_up_time=pick_up_time, drop_off_time=drop_off_time)
+            pack = city_packs.get(destination)
+            if pack is not None:
+                # Popular cities come from a prebuilt city pack: no place searches, details, photo
+                # scoring or price model runs (cars and weather are still fetched for the dates)
+                with span("city_pack"):
+                    hotels = pack.hotels(budget, pick_up_date, estimate_hotel_price, city=destination)
+                    attractions = pack.places("attraction", city=destination)
+                    restaurants = pack.places("restaurant", city=destination)
+                    for place in hotels + attractions + restaurants:
+                        review_index.add(destination, f"{place.kind}:{place.name}", place.reviews)
+                logger.info(f"Loaded {len(hotels)} hotels, {len(attractions)} attractions and {len(restaurants)} restaurants "
+                            f"for {destination} from its city pack")
+            else:
+                # Admission control: shed enrichment as quota runs low, and refuse cleanly when saturated
+                fidelity = quota_accountant.fidelity("google_places")
+                quota_accountant.admit(estimated_request_cost(fidelity))
+
+                with span("fetch_hotels"):
+                    hotels = fetch_hotels(destination, budget, pick_up_date, drop_off_date)
+                logger.info(f"Fetched {len(hotels)} hotels for {destination}")
+                try:
+                    with span("fetch_attractions"):
+                        attractions = fetch_attractions(destination, pick_up_date, drop_off_date, max_details=fidelity.details_per_search, score_images=fidelity.score_images)
+                except Exception as e:
+                    logger.warning(f"Continuing without attractions for {destination}: {e}")
+                    attractions = []
+                logger.info(f"Fetched {len(attractions)} attractions for {destination}")
+                try:
+                    with span("fetch_restaurants"):
+                        restaurants = fetch_restaurants(destination, pick_up_date, drop_off_date, max_details=fidelity.details_per_search)
+                except Exception as e:
+                    logger.warning(f"Continuing without restaurants for {destination}: {e}")
+                    restaurants = []
+                logger.info(f"Fetched {len(restaurants)} restaurants for {destination}")
+            with span("fetch_cars"):
+                cars = fetch_cars(destination, budget, pick_up_date, drop_off_date, pick_up_time=pick_up_time, drop_off_time=drop_off_time)
             logger.info(f"Fetched {len(cars)} cars for {destination}")
-            attractions = fetch_attractions(destination, pick_up_date, drop_off_date)
-            logger.info(f"Fetched {len(attractions)} attractions for {destination}")
-            restaurants = fetch_restaurants(destination, pick_up_date, drop_off_date)
-            logger.info(f"Fetched {len(restaurants)} restaurants for {destination}")
 
             # Generate plans
-            plans = generate_plans(hotels, cars, attractions, restaurants, destination, pick_up_date, drop_off_date, budget, preferred_days)
+            with span("plan_generation"), PLAN_GENERATION_SECONDS.time():
+                plans = generate_plans(hotels, cars, attractions, restaurants, destination, pick_up_date, drop_off_date, budget, preferred_days, review_keywords, show_alternatives)
             if not plans:
                 logger.error("No plans could be generated within the budget.")
                 return "Error: No plans could be generated within your budget (or up to 20% more).", 400
 
-            return render_template("results.html", plans=plans, destination=destination, budget=budget)
+            # Keep the plans and their catalog server-side so chat edits don't refetch anything
+            session = PlanSession(destination, budget, plans)
+            plan_sessions.put(session)
+
+            with span("render"):
+                response = render_session(session)
+            # The same page can be revalidated later with a conditional GET
+            response.headers["Content-Location"] = url_for("plans_page", session_id=session.id)
+            return response
+        except QuotaExceeded as e:
+            logger.warning(f"Rejecting request: {e}")
+            return "Error: We're handling too many trip requests right now. Please try again shortly.", 429, {"Retry-After": str(max(1, int(e.retry_after + 0.5)))}
         except Exception as e:
             logger.error(f"Error processing POST request: {e}", exc_info=True)
             return f"Error: {str(e)}", 400
     logger.debug("Rendering index.html for GET request")
     return render_template("index.html")
 
+def render_session(session):
+    """
+    Render the first PLAN_PAGE_DAYS days of a session's plans, reusing the last rendering while their
+    content (and so the ETag) is unchanged. Later days are built and rendered by plan_days_page.
+    """
+    with session.lock:
+        etag = plans_etag("results.html", session.id, session.destination, session.budget, session.plans, 0, PLAN_PAGE_DAYS)
+        session.rendered = render_page(app.jinja_env, "results.html", etag, {
+            "plans": session.plans, "destination": session.destination, "budget": session.budget, "session_id": session.id,
+            "page_days": PLAN_PAGE_DAYS,
+        }, cached=session.rendered)
+    return page_response(session.rendered, request)
+
+@app.route("/plans/<session_id>", methods=["GET"])
+def plans_page(session_id):
+    session = plan_sessions.get(session_id)
+    if session is None:
+        return "Error: This plan has expired. Please plan your trip again.", 404
+    with span("render"):
+        return render_session(session)
+
+@app.route("/plans/<session_id>/days", methods=["GET"])
+def plan_days_page(session_id):
+    """HTML for the next PLAN_PAGE_DAYS days of one plan (?plan=<index>&start=<day offset>), built on demand."""
+    session = plan_sessions.get(session_id)
+    if session is None:
+        return "Error: This plan has expired. Please plan your trip again.", 404
+    plan_number = request.args.get("plan", 0, type=int)
+    start = request.args.get("start", 0, type=int)
+    if not 0 <= plan_number < len(session.plans) or start < 0:
+        return "Error: No such plan or day", 400
+    with span("render"), session.lock:
+        plan = session.plans[plan_number]
+        etag = plans_etag("_days.html", session.id, session.destination, session.budget, [plan], start, PLAN_PAGE_DAYS)
+        page = render_page(app.jinja_env, "_days.html", etag, {"days": plan.schedule[start:start + PLAN_PAGE_DAYS]})
+    return page_response(page, request)
+
 @app.route("/chat", methods=["POST"])
 def chat():
     try:
         message = request.json.get("message")
-        logger.debug(f"Received chat message: {message}")
-        response = chatbot.handle_message(message)
-        logger.debug(f"Chatbot response: {response}")
-        return {"response": response}
+        session = plan_sessions.get(request.json.get("session_id"))
+        # Which of the session's plans to edit (0-based, as listed on the results page)
+        plan_number = request.json.get("plan")
+        if plan_number is not None and (session is None or type(plan_number) is not int
+                                        or not 0 <= plan_number < len(session.plans)):
+            return {"error": "No such plan"}, 400
+        logger.debug("Received chat message: %s (session: %s, plan: %s)", message, session is not None, plan_number)
+        response, days = chatbot.respond(message, session, plan_number)
+        logger.debug("Chatbot response: %s", response)
+        reply = {"response": response}
+        if session is not None:
+            reply["days"] = days
+            reply["plan"] = session.active
+            reply["total_cost"] = round(session.plan.total_cost, 2)
+        return reply
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}", exc_info=True)
         return {"error": str(e)}, 400
 
+@app.route("/autocomplete", methods=["GET"])
+def autocomplete():
+    """Destination suggestions (cities, then airports) for the prefix in ?q=, from the offline gazetteer."""
+    limit = max(1, min(request.args.get("limit", AUTOCOMPLETE_LIMIT, type=int), AUTOCOMPLETE_MAX))
+    suggestions = [location.to_dict() for location in gazetteer.complete(request.args.get("q", ""), limit)]
+    # The gazetteer only changes with a deploy, so browsers and proxies may reuse answers
+    return {"suggestions": suggestions}, 200, {"Cache-Control": "public, max-age=86400"}
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
 if __name__ == "__main__":
     logger.info("Starting Flask application")
     app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -1,11 +1,48 @@
 # chatbot/bot.py
 import logging
 
+from chatbot.intents import INTENT_MATCHER, RESTAURANT_POI_TYPES
+from utils.plan_session import PlanEditError, day_summary
+
 logger = logging.getLogger(__name__)
 
 class Chatbot:
-    def handle_message(self, message):
-        # Placeholder for Rasa or Dialogflow integration
-        if "add museum" in message.lower():
-            return "Adding a museum to your itinerary. Please specify the day."
-        return "I can help with your itinerary! What would you like to do?"
\ No newline at end of file
+    def handle_message(self, message, session=None):
+        return self.respond(message, session)[0]
+
+    def respond(self, message, session=None, plan=None):
+        """
+        Return (reply, changed day summaries); edits are applied to `session` when there is one, to
+        its plan number `plan` (0-based) if given, else to the plan edited last.
+        """
+        intent = INTENT_MATCHER.parse(message or "")
+        if intent is None:
+            return "I can help with your itinerary! What would you like to do?", []
+        if session is None:
+            if intent.name == "add" and intent.poi_type == "museum":
+                return "Adding a museum to your itinerary. Please specify the day.", []
+            return "Plan a trip first, then I can edit it for you.", []
+        if intent.name == "move" and intent.to_day is None:
+            return "Which day should I move it to?", []
+
+        try:
+            with session.lock:
+                if plan is not None:
+                    session.select(plan)
+                if intent.name == "add":
+                    kind = "restaurant" if intent.poi_type in RESTAURANT_POI_TYPES else "attraction"
+                    place, days = session.add(intent.day, intent.poi_type, kind)
+                    reply = f"Added {place.name} to day {days[0].day}."
+                elif intent.name == "remove":
+                    place, days = session.remove(intent.day, intent.poi_type)
+                    reply = f"Removed {place.name} from day {days[0].day}."
+                elif intent.name == "swap":
+                    (old, new), days = session.swap(intent.day, intent.poi_type, intent.new_type)
+                    reply = f"Swapped {old.name} for {new.name} on day {days[0].day}."
+                else:
+                    place, days = session.move(intent.day, intent.to_day, intent.poi_type)
+                    reply = f"Moved {place.name} from day {days[0].day} to day {days[1].day}."
+                reply += f" New total: ${session.plan.total_cost:.2f}."
+                return reply, [day_summary(day) for day in days]
+        except PlanEditError as e:
+            return str(e), []
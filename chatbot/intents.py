@@ -0,0 +1,182 @@
+# chatbot/intents.py
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Canonical intent -> trigger words. Words that are common in chatter ("see", "visit", "change")
+# are left out; an edit also needs a place type or a day, so "cancel that" is not an edit either.
+INTENT_WORDS = {
+    "add": ("add", "include", "put in", "squeeze in", "fit in"),
+    "remove": ("remove", "drop", "delete", "skip", "cancel", "take out", "get rid of"),
+    "swap": ("swap", "replace", "switch", "exchange", "substitute"),
+    "move": ("move", "reschedule", "shift", "push"),
+}
+
+# Canonical POI type -> words users say for it (attraction kinds, cuisines and meal words)
+POI_WORDS = {
+    "museum": ("museum", "museums", "exhibit", "exhibition"),
+    "gallery": ("gallery", "galleries", "art gallery"),
+    "park": ("park", "parks", "garden", "gardens"),
+    "beach": ("beach", "beaches"),
+    "zoo": ("zoo", "zoos"),
+    "aquarium": ("aquarium", "aquariums"),
+    "amusement_park": ("amusement park", "theme park", "rides"),
+    "church": ("church", "cathedral", "churches"),
+    "shopping_mall": ("mall", "shopping", "shopping mall"),
+    "night_club": ("club", "nightclub", "night club"),
+    "stadium": ("stadium", "stadiums"),
+    "tourist_attraction": ("landmark", "sight", "sights", "monument"),
+    "indoor": ("indoor", "indoors", "inside"),
+    "outdoor": ("outdoor", "outdoors", "outside"),
+    "lunch": ("lunch", "restaurant", "restaurants", "meal", "food"),
+    "italian": ("italian", "pizza", "pasta"),
+    "mexican": ("mexican", "tacos"),
+    "japanese": ("japanese", "sushi", "ramen"),
+    "chinese": ("chinese", "dim sum"),
+    "indian": ("indian", "curry"),
+    "seafood": ("seafood",),
+    "cafe": ("cafe", "coffee", "brunch"),
+    "bakery": ("bakery", "pastries"),
+    "steakhouse": ("steak", "steakhouse", "bbq", "barbecue"),
+    "vegetarian": ("vegetarian", "vegan"),
+}
+
+# POI types that name a meal or cuisine; edits for them change a day's lunch, not its attractions
+RESTAURANT_POI_TYPES = frozenset(("lunch", "italian", "mexican", "japanese", "chinese", "indian", "seafood", "cafe",
+                                  "bakery", "steakhouse", "vegetarian"))
+
+NUMBER_WORDS = {word: i for i, word in enumerate(
+    ("zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+     "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen",
+     "nineteen", "twenty"))}
+ORDINAL_WORDS = {word: i for i, word in enumerate(
+    ("zeroth", "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth",
+     "tenth", "eleventh", "twelfth", "thirteenth", "fourteenth", "fifteenth", "sixteenth",
+     "seventeenth", "eighteenth", "nineteenth", "twentieth"))}
+CONNECTOR_WORDS = ("for", "with", "to", "instead of", "into")
+
+
+class Intent:
+    __slots__ = ("name", "day", "to_day", "poi_type", "new_type")
+
+    def __init__(self, name, day=None, to_day=None, poi_type=None, new_type=None):
+        self.name = name
+        self.day = day
+        self.to_day = to_day
+        self.poi_type = poi_type
+        self.new_type = new_type
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, day={self.day}, to_day={self.to_day}, poi_type={self.poi_type!r}, new_type={self.new_type!r})"
+
+
+def _trie_pattern(words):
+    """
+    Compile `words` into a regex factored by shared prefixes ("mus(?:eum(?:s)?)" rather than a flat
+    alternation), so the engine never re-reads a character to try another keyword. Longer words
+    win because each optional suffix is greedy; spaces match any run of whitespace.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+class IntentMatcher:
+    """
+    Extracts intent, day numbers and POI types from a chat message in one regex pass.
+
+    Every trigger word, POI word, day reference and connector is compiled once into a single
+    prefix-factored pattern; scanning a message is one `finditer` over its lowercased text, and
+    each match is classified with a dict lookup instead of testing intents one by one.
+    """
+
+    def __init__(self, intent_words=INTENT_WORDS, poi_words=POI_WORDS):
+        self.keywords = {}
+        for intent, words in intent_words.items():
+            for word in words:
+                self.keywords[self._normalize(word)] = ("intent", intent)
+        for poi_type, words in poi_words.items():
+            for word in words:
+                self.keywords[self._normalize(word)] = ("poi", poi_type)
+        for word in CONNECTOR_WORDS:
+            self.keywords[self._normalize(word)] = ("connector", None)
+
+        number = r"\d+|" + _trie_pattern(NUMBER_WORDS)
+        # The lookahead skips positions that cannot start a word before any alternative is tried
+        self.pattern = re.compile(
+            r"\b(?=[a-z0-9])(?:"
+            rf"(?:to|until|onto)\s+day\s*(?P<to_day>{number})"
+            rf"|day\s*(?P<day>{number})"
+            rf"|(?P<ordinal>{_trie_pattern(ORDINAL_WORDS)})\s+day"
+            rf"|(?P<word>{_trie_pattern(self.keywords)})"
+            r")\b"
+        )
+
+    @staticmethod
+    def _normalize(text):
+        return " ".join(text.lower().split())
+
+    @staticmethod
+    def _number(text):
+        return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+    def parse(self, message):
+        """Return the Intent in `message`, or None when no edit intent is present."""
+        intent = None
+        days = []
+        to_day = None
+        poi_types = []
+        after_connector = None
+        for match in self.pattern.finditer(message.lower()):
+            if match.group("to_day"):
+                to_day = self._number(match.group("to_day"))
+            elif match.group("day"):
+                days.append(self._number(match.group("day")))
+            elif match.group("ordinal"):
+                days.append(ORDINAL_WORDS[match.group("ordinal")])
+            else:
+                kind, value = self.keywords[self._normalize(match.group("word"))]
+                if kind == "intent" and intent is None:
+                    intent = value
+                elif kind == "poi":
+                    poi_types.append((value, after_connector))
+                elif kind == "connector":
+                    after_connector = match.group("word")
+
+        if intent is None or not (poi_types or days or to_day is not None):
+            return None
+        result = Intent(intent, day=days[0] if days else None, to_day=to_day)
+        if intent == "move" and to_day is None and len(days) > 1:
+            result.to_day = days[1]
+        elif intent != "move" and result.day is None:
+            # "add a museum to day 2"
+            result.day, result.to_day = to_day, None
+        if intent == "swap":
+            old = [poi for poi, connector in poi_types if connector is None]
+            new = [poi for poi, connector in poi_types if connector is not None]
+            # "replace the museum with a park" / "swap in a park instead of the museum"
+            if any(connector and connector.startswith("instead") for _, connector in poi_types):
+                old, new = new, old
+            result.poi_type = old[0] if old else None
+            result.new_type = new[0] if new else (old[1] if len(old) > 1 else None)
+        else:
+            result.poi_type = poi_types[0][0] if poi_types else None
+        return result
+
+
+INTENT_MATCHER = IntentMatcher()
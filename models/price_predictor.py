@@ -33,7 +33,7 @@ class PricePredictor:
         
         # Convert date to pd.Timestamp
         date = pd.Timestamp(date)
-        logger.debug(f"Predicting price for date: {date}, base_price: {base_price}")
+        logger.debug("Predicting price for date: %s, base_price: %s", date, base_price)
 
         # Ensure self.forecast is a Series
         if not isinstance(self.forecast, pd.Series):
@@ -43,7 +43,7 @@ class PricePredictor:
         # Check if the date is within the forecast range
         if date in self.forecast.index:  # Simplified check
             predicted_price = self.forecast.loc[date]
-            logger.debug(f"Date {date} found in forecast index. Predicted price: {predicted_price}, type: {type(predicted_price)}")
+            logger.debug("Date %s found in forecast index. Predicted price: %s, type: %s", date, predicted_price, type(predicted_price))
             if isinstance(predicted_price, pd.Series):
                 logger.warning(f"Predicted price is a Series: {predicted_price}")
                 predicted_price = predicted_price.iloc[0] if not predicted_price.empty else base_price
@@ -60,14 +60,14 @@ class PricePredictor:
 
         # Extend the forecast if necessary
         if days_ahead > len(self.forecast):
-            logger.debug(f"Extending forecast to {days_ahead} days to cover {date}")
+            logger.debug("Extending forecast to %s days to cover %s", days_ahead, date)
             self.forecast = self.model_fit.forecast(steps=days_ahead)
-            logger.debug(f"Extended forecast:\n{self.forecast}")
+            logger.debug("Extended forecast:\n%s", self.forecast)
 
         # Check again if the date is in the extended forecast
         if date in self.forecast.index:
             predicted_price = self.forecast.loc[date]
-            logger.debug(f"Date {date} found in extended forecast. Predicted price: {predicted_price}, type: {type(predicted_price)}")
+            logger.debug("Date %s found in extended forecast. Predicted price: %s, type: %s", date, predicted_price, type(predicted_price))
             if isinstance(predicted_price, pd.Series):
                 logger.warning(f"Predicted price is a Series: {predicted_price}")
                 predicted_price = predicted_price.iloc[0] if not predicted_price.empty else base_price
@@ -82,12 +82,12 @@ class PricePredictor:
             daily_change = 0
         days_beyond_forecast = (date - self.forecast.index[-1]).days
         adjusted_price = last_forecasted_price + (daily_change * days_beyond_forecast)
-        logger.debug(f"Applied trend adjustment: last_forecasted_price={last_forecasted_price}, daily_change={daily_change}, days_beyond_forecast={days_beyond_forecast}, adjusted_price={adjusted_price}")
+        logger.debug("Applied trend adjustment: last_forecasted_price=%s, daily_change=%s, days_beyond_forecast=%s, adjusted_price=%s", last_forecasted_price, daily_change, days_beyond_forecast, adjusted_price)
 
         # Scale the base_price by the ratio of the adjusted price to the base_price
         if base_price > 0:
             scaled_price = base_price * (adjusted_price / 100)  # Assuming the training data starts around 100
         else:
             scaled_price = adjusted_price
-        logger.debug(f"Final scaled price for {date}: {scaled_price}")
+        logger.debug("Final scaled price for %s: %s", date, scaled_price)
         return float(scaled_price)
\ No newline at end of file
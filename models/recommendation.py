@@ -43,4 +43,11 @@ class RecommendationModel:
 
     def predict_preference(self, price, distance):
         model = self.load()
-        return model.predict([[price, distance]])[0]
\ No newline at end of file
+        return model.predict([[price, distance]])[0]
+
+    def predict_preferences(self, items):
+        """Predict preferences for many (price, distance) pairs in a single model call."""
+        if not items:
+            return []
+        model = self.load()
+        return list(model.predict([[price, distance] for price, distance in items]))
\ No newline at end of file
@@ -0,0 +1,116 @@
+# scripts/benchmark_chat_intents_getgetplaces.py
+"""
+Throughput benchmark for the chat intent matcher.
+
+Generates a synthetic corpus of edit requests and chatter, then compares the compiled single-pass
+IntentMatcher with a sequential baseline that searches for every keyword separately (what adding
+intents as one `in`/regex check after another would cost). Both must agree on every message.
+"""
+import sys
+import os
+# Add the directory containing the 'chatbot' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import random
+import re
+import time
+
+from chatbot.intents import INTENT_MATCHER, INTENT_WORDS, POI_WORDS
+
+TEMPLATES = (
+    "{verb} a {poi} on day {day}",
+    "can you {verb} the {poi} from day {day}",
+    "please {verb} {poi} to day {day}",
+    "I'd really like to {verb} some {poi} on the {ordinal} day if the weather is nice",
+    "{verb} the {poi} with a {poi2} on day {day}",
+    "hmm, not sure, what do you think about day {day}?",
+    "thanks, that looks great",
+)
+ORDINALS = ("first", "second", "third", "fourth", "fifth")
+FILLER = ("we are travelling with kids", "my partner loves architecture", "budget is tight this time",
+          "we land late on the first night", "no early mornings please")
+
+
+def synthetic_corpus(count, seed=0):
+    rng = random.Random(seed)
+    verbs = [word for words in INTENT_WORDS.values() for word in words]
+    pois = [word for words in POI_WORDS.values() for word in words]
+    corpus = []
+    for _ in range(count):
+        message = rng.choice(TEMPLATES).format(verb=rng.choice(verbs), poi=rng.choice(pois), poi2=rng.choice(pois),
+                                               day=rng.randint(1, 14), ordinal=rng.choice(ORDINALS))
+        if rng.random() < 0.5:
+            message = f"{rng.choice(FILLER)}. {message}. {rng.choice(FILLER)}"
+        corpus.append(message)
+    return corpus
+
+
+class SequentialMatcher:
+    """Baseline: one regex search per keyword, in order, for every message."""
+
+    def __init__(self):
+        self.checks = [(re.compile(r"\b" + re.escape(word).replace(r"\ ", r"\s+") + r"\b", re.IGNORECASE), intent)
+                       for intent, words in INTENT_WORDS.items() for word in words]
+        self.poi_checks = [(re.compile(r"\b" + re.escape(word).replace(r"\ ", r"\s+") + r"\b", re.IGNORECASE), poi)
+                           for poi, words in POI_WORDS.items() for word in words]
+        self.day = re.compile(r"\bday\s*(\d+)", re.IGNORECASE)
+
+    def parse(self, message):
+        found = [(m.start(), intent) for pattern, intent in self.checks for m in [pattern.search(message)] if m]
+        if not found:
+            return None
+        pois = sorted((m.start(), poi) for pattern, poi in self.poi_checks for m in [pattern.search(message)] if m)
+        day = self.day.search(message)
+        return min(found)[1], int(day.group(1)) if day else None, pois[0][1] if pois else None
+
+
+def run(parse, corpus, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in corpus:
+            parse(message)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat intent matching throughput")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--report", default="intent_benchmark.json")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.messages)
+    total_bytes = sum(len(m) for m in corpus) * args.repeat
+    sequential = SequentialMatcher()
+
+    started = time.perf_counter()
+    compiled_matcher = type(INTENT_MATCHER)()
+    compile_seconds = time.perf_counter() - started
+
+    # Both matchers must find the same intent for every message
+    mismatches = sum(1 for m in corpus
+                     if (INTENT_MATCHER.parse(m) or None) and INTENT_MATCHER.parse(m).name != sequential.parse(m)[0])
+    results = {}
+    for name, parse in (("compiled", compiled_matcher.parse), ("sequential", sequential.parse)):
+        seconds = run(parse, corpus, args.repeat)
+        results[name] = {
+            "seconds": seconds,
+            "messages_per_second": len(corpus) * args.repeat / seconds,
+            "mb_per_second": total_bytes / seconds / 1e6,
+            "us_per_message": seconds / (len(corpus) * args.repeat) * 1e6,
+        }
+        print(f"{name:10s} {results[name]['messages_per_second']:12,.0f} msg/s  {results[name]['us_per_message']:6.2f} us/msg  "
+              f"{results[name]['mb_per_second']:6.1f} MB/s")
+    print(f"Compiled {len(compiled_matcher.keywords)} keywords in {compile_seconds * 1000:.1f} ms; "
+          f"speedup {results['sequential']['seconds'] / results['compiled']['seconds']:.1f}x; intent mismatches: {mismatches}")
+
+    with open(args.report, "w") as f:
+        json.dump({"config": vars(args), "keywords": len(compiled_matcher.keywords), "compile_seconds": compile_seconds,
+                   "mismatches": mismatches, "results": results}, f, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# scripts/benchmark_getgetplaces.py
+"""
+Offline end-to-end and micro benchmarks.
+
+Runs the Flask app against StubProviderServer (no live Google/OpenWeather/Priceline keys needed)
+with a local SQLite database standing in for Postgres, and writes a JSON report that can be
+diffed between commits for regression tracking.
+"""
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+from stub_providers_getgetplaces import StubProviderServer, synthetic_response
+
+
+def summarize(samples):
+    """Latency summary (milliseconds) for a list of durations in seconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(func, iterations, warmup=1):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def bench_end_to_end(app_module, requests_total, concurrency, days):
+    client = app_module.app.test_client()
+    pick_up = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    form = {"destinations": "Miami", "budget": "3000", "pickUpDate": pick_up, "pickUpTime": "10:00", "preferredDays": str(days)}
+
+    def one(_):
+        started = time.perf_counter()
+        response = client.post("/", data=form)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests_total)))
+    wall = time.perf_counter() - started
+    report = summarize([elapsed for elapsed, _ in results])
+    report["throughput_rps"] = requests_total / wall if wall else 0.0
+    report["concurrency"] = concurrency
+    report["status_codes"] = {str(code): sum(1 for _, c in results if c == code) for code in {c for _, c in results}}
+    return report
+
+
+def bench_micro(app_module, stub, iterations, days):
+    pick_up = datetime.now() + timedelta(days=1)
+    drop_off = pick_up + timedelta(days=days - 1)
+    hotel_data = synthetic_response("textsearch", {"query": "hotels in Miami"})
+    hotels = app_module.process_hotel_data(hotel_data, "Miami", 3000, pick_up)
+    cars = app_module.fetch_cars("Miami", 3000, pick_up, drop_off)
+    attractions = app_module.fetch_attractions("Miami", pick_up, drop_off)
+    restaurants = app_module.fetch_restaurants("Miami", pick_up, drop_off)
+
+    report = {
+        "process_hotel_data": measure(lambda: app_module.process_hotel_data(hotel_data, "Miami", 3000, pick_up), iterations),
+        "generate_plans": measure(lambda: app_module.generate_plans(hotels, cars, attractions, restaurants, "Miami", pick_up, drop_off, 3000, days), iterations),
+        "parse_nlp_input": measure(lambda: app_module.parse_nlp_input("Plan a 5-day Miami trip with $1500 for food and museums"), iterations),
+        "score_image": measure(lambda: app_module.score_image(f"{stub.url}/maps/api/place/photo?maxwidth=400&photoreference=bench"), iterations),
+    }
+    return report
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmarks for GetGetPlaces")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Injected provider latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--fixtures", help="Directory of recorded provider responses to replay")
+    parser.add_argument("--database-url", default="sqlite:///benchmark_getgetplaces.db")
+    parser.add_argument("--requests", type=int, default=20, help="End-to-end POST / requests")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations per microbenchmark")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--report", default="benchmark_report.json")
+    args = parser.parse_args()
+
+    stub = StubProviderServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, fixtures_dir=args.fixtures).start()
+    # The app reads provider URLs, keys and DATABASE_URL at import time, so configure first
+    os.environ.update(stub.environ())
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import app as app_module
+
+    try:
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "config": vars(args),
+            "end_to_end": bench_end_to_end(app_module, args.requests, args.concurrency, args.days),
+            "micro": bench_micro(app_module, stub, args.iterations, args.days),
+            "stub_requests_served": stub.requests_served,
+        }
+    finally:
+        stub.stop()
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    e2e = report["end_to_end"]
+    print(f"POST / p50={e2e['p50_ms']:.1f}ms p95={e2e['p95_ms']:.1f}ms throughput={e2e['throughput_rps']:.2f} req/s")
+    for name, stats in report["micro"].items():
+        print(f"{name:20s} p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms")
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# scripts/benchmark_itinerary_getgetplaces.py
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.itinerary import build_itinerary
+from datetime import datetime, timedelta
+import argparse
+import random
+import time
+
+
+def synthetic_trip(num_days, num_cities, places_per_city=40, seed=42):
+    rng = random.Random(seed)
+    destinations = [f"City{i}" for i in range(num_cities)]
+
+    def places(prefix):
+        return [
+            {
+                "name": f"{prefix} {j}",
+                "rating": round(rng.uniform(3, 5), 1),
+                "distance": rng.uniform(0.2, 15),
+                "reviews": ["Lovely spot, would come back again with the whole family.", "Crowded at noon."],
+            }
+            for j in range(places_per_city)
+        ]
+
+    hotels_by_city = {city: [{"name": f"{city} Hotel", "price": rng.uniform(80, 250)}] for city in destinations}
+    attractions_by_city = {city: places(f"{city} Attraction") for city in destinations}
+    restaurants_by_city = {city: places(f"{city} Restaurant") for city in destinations}
+    cars = [{"name": "Compact", "company": "Acme", "price": 45.0}]
+    pick_up_date = datetime(2025, 4, 1)
+    drop_off_date = pick_up_date + timedelta(days=num_days - 1)
+    return (destinations, pick_up_date, drop_off_date, hotels_by_city, cars,
+            attractions_by_city, restaurants_by_city, {}, 5000)
+
+
+def run(day_counts, num_cities, repeat):
+    results = []
+    for num_days in day_counts:
+        args = synthetic_trip(num_days, num_cities)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            itinerary = build_itinerary(*args)
+            itinerary.to_markdown()
+            itinerary.to_html()
+            best = min(best, time.perf_counter() - start)
+        results.append((num_days, best))
+        print(f"{num_days:4d} days x {num_cities} cities: {best * 1000:8.2f} ms total, {best / num_days * 1e6:8.1f} us/day")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark itinerary building and rendering for long multi-city trips")
+    parser.add_argument("--days", type=int, nargs="+", default=[15, 30, 60, 120])
+    parser.add_argument("--cities", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    results = run(args.days, args.cities, args.repeat)
+    # Linear scaling means the per-day cost stays flat as the trip grows
+    per_day = [elapsed / days for days, elapsed in results]
+    print(f"Per-day cost ratio (longest/shortest trip): {per_day[-1] / per_day[0]:.2f}")
@@ -0,0 +1,165 @@
+# scripts/benchmark_memory_getgetplaces.py
+"""
+tracemalloc benchmark for place records and plan building.
+
+Compares the old representation (a dict per place, and a dict of copied place fields per schedule
+entry) with Place records and catalog-indexed ScheduleEntry objects. With --app it also measures
+generate_plans itself against StubProviderServer.
+"""
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from datetime import datetime, timedelta
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from utils.catalog import Place, CityCatalog, ScheduleEntry
+
+
+def synthetic_places(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for kind in ("hotel", "car", "attraction", "restaurant"):
+        for i in range(count):
+            rows.append({
+                "kind": kind,
+                "name": f"{kind.title()} {i}",
+                "rating": round(rng.uniform(3, 5), 1),
+                "distance": rng.uniform(0, 15),
+                "lat": 25.76 + rng.uniform(-0.1, 0.1),
+                "long": -80.19 + rng.uniform(-0.1, 0.1),
+                "reviews": [f"Review {j} of {kind} {i}: " + "lovely place " * 8 for j in range(2)],
+                "price": rng.uniform(30, 300),
+                "is_indoor": rng.random() < 0.4,
+            })
+    return rows
+
+
+def dict_records(rows):
+    return [dict(row) for row in rows]
+
+
+def place_records(rows):
+    return [Place(row["kind"], row["name"], row["rating"], row["distance"], row["lat"], row["long"], row["reviews"],
+                  price=row["price"], is_indoor=row["is_indoor"]) for row in rows]
+
+
+def dict_schedule(places, days, plans):
+    """The pre-catalog plan shape: every entry copies the place's fields into a new details dict."""
+    out = []
+    for _ in range(plans):
+        schedule = []
+        for day in range(days):
+            activities = []
+            for offset, (time, activity) in enumerate((("10:30 AM", "Visit attraction"), ("1:00 PM", "Lunch"), ("3:00 PM", "Visit attraction"))):
+                place = places[(day * 3 + offset) % len(places)]
+                activities.append({
+                    "time": time,
+                    "activity": activity,
+                    "details": {
+                        "name": place["name"],
+                        "distance": place["distance"],
+                        "rating": place["rating"],
+                        "reviews": place["reviews"],
+                        "location": f"Coordinates: ({place['lat']}, {place['long']})",
+                        "weather": "Clear",
+                        "cost": 20,
+                    },
+                })
+            schedule.append({"day": day + 1, "activities": activities})
+        out.append(schedule)
+    return out
+
+
+def catalog_schedule(catalog, days, plans):
+    """Entries hold the catalog and an index; place data is never copied."""
+    places = catalog.places
+    out = []
+    for _ in range(plans):
+        schedule = []
+        for day in range(days):
+            activities = []
+            for offset, (time, activity) in enumerate((("10:30 AM", "Visit attraction"), ("1:00 PM", "Lunch"), ("3:00 PM", "Visit attraction"))):
+                activities.append(ScheduleEntry(catalog, (day * 3 + offset) % len(places), time, activity, 20, "Clear"))
+            schedule.append(activities)
+        out.append(schedule)
+    return out
+
+
+def measure(func, *args):
+    """Bytes and blocks still held by func's result, plus the peak during the call."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.reset_peak()
+    result = func(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename")) - before_blocks
+    tracemalloc.stop()
+    del result
+    return {"retained_bytes": current - before, "peak_bytes": peak - before, "blocks": blocks}
+
+
+def measure_generate_plans(places, days):
+    from stub_providers_getgetplaces import StubProviderServer
+
+    stub = StubProviderServer(latency_ms=0).start()
+    os.environ.update(stub.environ())
+    os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark_getgetplaces.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    try:
+        import app as app_module
+
+        by_kind = {kind: [p for p in places if p.kind == kind] for kind in ("hotel", "car", "attraction", "restaurant")}
+        pick_up = datetime.now() + timedelta(days=1)
+        drop_off = pick_up + timedelta(days=days - 1)
+        return measure(app_module.generate_plans, by_kind["hotel"], by_kind["car"], by_kind["attraction"],
+                       by_kind["restaurant"], "Miami", pick_up, drop_off, 3000)
+    finally:
+        stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tracemalloc benchmark for place records and plans")
+    parser.add_argument("--places", type=int, default=100, help="Places per kind")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--plans", type=int, default=3)
+    parser.add_argument("--app", action="store_true", help="Also measure app.generate_plans (needs the app's dependencies)")
+    parser.add_argument("--report", default="memory_benchmark.json")
+    args = parser.parse_args()
+
+    rows = synthetic_places(args.places)
+    dicts = dict_records(rows)
+    places = place_records(rows)
+    report = {
+        "config": vars(args),
+        "records": {"dict": measure(dict_records, rows), "place": measure(place_records, rows)},
+        "schedule": {"dict": measure(dict_schedule, dicts, args.days, args.plans),
+                     "catalog": measure(catalog_schedule, CityCatalog("Miami", places), args.days, args.plans)},
+    }
+    if args.app:
+        report["generate_plans"] = measure_generate_plans(places, args.days)
+
+    for section in ("records", "schedule"):
+        (old_name, old), (new_name, new) = report[section].items()
+        print(f"{section:9s} {old_name:8s} {old['retained_bytes'] / 1024:9.1f} KiB {old['blocks']:7d} blocks | "
+              f"{new_name:8s} {new['retained_bytes'] / 1024:9.1f} KiB {new['blocks']:7d} blocks "
+              f"({1 - new['retained_bytes'] / old['retained_bytes']:.0%} less)")
+    if "generate_plans" in report:
+        stats = report["generate_plans"]
+        print(f"generate_plans peak {stats['peak_bytes'] / 1024:.1f} KiB, retained {stats['retained_bytes'] / 1024:.1f} KiB, {stats['blocks']} blocks")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# scripts/benchmark_render_getgetplaces.py
+"""
+Render-time and bytes-on-the-wire benchmark for results.html.
+
+Builds synthetic plans of increasing length and compares the old path (every day built up front,
+Flask's default template settings, every day rendered, an uncompressed body on every request) with
+utils.rendering: lazily built plans of which only the first PLAN_PAGE_DAYS days are rendered,
+precompiled whitespace-trimmed templates, gzip for large pages, a cached render reused while the
+ETag matches, and 304 Not Modified for a revalidating client.
+"""
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import time
+
+from flask import Flask, request
+
+from utils.catalog import Place, CityCatalog, ScheduleEntry, DaySchedule, Plan, LazySchedule
+from utils.rendering import precompile_templates, plans_etag, render_page, page_response, PLAN_PAGE_DAYS
+
+TEMPLATES = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'templates'))
+
+
+def synthetic_catalog(days, seed=0):
+    rng = random.Random(seed)
+    places = []
+    for kind, count in (("hotel", 20), ("car", 10), ("attraction", 2 * days + 10), ("restaurant", days + 10)):
+        for i in range(count):
+            places.append(Place(kind, f"{kind.title()} {i}", round(rng.uniform(3, 5), 1), rng.uniform(0, 15),
+                                25.76 + rng.uniform(-0.1, 0.1), -80.19 + rng.uniform(-0.1, 0.1),
+                                [f"Review {j}: " + "friendly staff and a lovely view " * 4 for j in range(5)],
+                                price=rng.uniform(30, 300), company="Hertz" if kind == "car" else None))
+    return CityCatalog("Miami", places)
+
+
+def synthetic_days(catalog, hotel, car, days):
+    attractions = [i for i, p in enumerate(catalog.places) if p.kind == "attraction"]
+    restaurants = [i for i, p in enumerate(catalog.places) if p.kind == "restaurant"]
+    start = datetime(2026, 6, 1)
+    for day in range(days):
+        activities = [
+            ScheduleEntry(catalog, car, "10:00 AM", "Pick up car", catalog[car].price),
+            ScheduleEntry(catalog, attractions[2 * day], "10:30 AM", "Visit attraction", 20, "Clear sky"),
+            ScheduleEntry(catalog, restaurants[day], "1:00 PM", "Lunch", 50, "Clear sky"),
+            ScheduleEntry(catalog, attractions[2 * day + 1], "3:00 PM", "Visit attraction", 20, "Clear sky"),
+            ScheduleEntry(catalog, hotel, "7:00 PM", "Return to hotel", 0, distance_override=0),
+        ]
+        cost = catalog[hotel].price + sum(e.cost for e in activities)
+        yield DaySchedule((start + timedelta(days=day)).strftime("%Y-%m-%d"), day + 1, activities, cost)
+
+
+def synthetic_plans(catalog, days, plans, lazy=False):
+    hotels = [i for i, p in enumerate(catalog.places) if p.kind == "hotel"]
+    cars = [i for i, p in enumerate(catalog.places) if p.kind == "car"]
+    out = []
+    for n in range(plans):
+        plan = Plan(days, catalog, hotels[n], cars[n])
+        schedule = synthetic_days(catalog, hotels[n], cars[n], days)
+        plan.schedule = LazySchedule(schedule, days) if lazy else list(schedule)
+        plan.total_cost = days * (catalog[hotels[n]].price + 2 * catalog[cars[n]].price + 90)
+        out.append(plan)
+    return out
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark results.html rendering and response size")
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 14, 30])
+    parser.add_argument("--plans", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--report", default="render_benchmark.json")
+    args = parser.parse_args()
+
+    baseline_app = Flask("baseline", template_folder=TEMPLATES)
+    app = Flask("rendering", template_folder=TEMPLATES)
+    started = time.perf_counter()
+    precompile_templates(app.jinja_env)
+    precompile_ms = (time.perf_counter() - started) * 1000
+
+    results = {}
+    for days in args.days:
+        catalog = synthetic_catalog(days)
+        context = {"destination": "Miami", "budget": 10000, "session_id": "benchmark", "page_days": None}
+
+        # Old path: build every day of every plan, then render all of them
+        baseline_ms, baseline_body = timed(
+            lambda: baseline_app.jinja_env.get_template("results.html").render(
+                plans=synthetic_plans(catalog, days, args.plans), **context).encode("utf-8"), args.repeat)
+
+        # New path: plans are cursors; the first page builds and renders PLAN_PAGE_DAYS days per plan
+        plans = synthetic_plans(catalog, days, args.plans, lazy=True)
+        context.update(plans=plans, page_days=PLAN_PAGE_DAYS)
+        first_page_ms, _ = timed(lambda: render_page(
+            app.jinja_env, "results.html", None, dict(context, plans=synthetic_plans(catalog, days, args.plans, lazy=True))), args.repeat)
+
+        with app.test_request_context("/plans/benchmark", headers={"Accept-Encoding": "gzip, deflate"}):
+            etag_ms, etag = timed(lambda: plans_etag("results.html", "benchmark", "Miami", 10000, plans, 0, PLAN_PAGE_DAYS), args.repeat)
+            render_ms, page = timed(lambda: render_page(app.jinja_env, "results.html", etag, context), args.repeat)
+            # First response compresses; later ones reuse the render and the compressed bytes
+            first_ms, response = timed(lambda: page_response(render_page(app.jinja_env, "results.html", etag, context), request), 1)
+            wire_bytes = response.content_length
+            cached_ms, _ = timed(lambda: page_response(render_page(app.jinja_env, "results.html", etag, context, cached=page), request), args.repeat)
+        with app.test_request_context("/plans/benchmark", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"{etag}-gz"'}):
+            not_modified_ms, response = timed(
+                lambda: page_response(render_page(app.jinja_env, "results.html",
+                                                  plans_etag("results.html", "benchmark", "Miami", 10000, plans, 0, PLAN_PAGE_DAYS),
+                                                  context, cached=page),
+                                      request), args.repeat)
+            assert response.status_code == 304
+
+        results[days] = {
+            "baseline": {"render_ms": baseline_ms, "bytes": len(baseline_body)},
+            "rendering": {"first_page_ms": first_page_ms, "etag_ms": etag_ms, "render_ms": render_ms, "first_response_ms": first_ms, "cached_response_ms": cached_ms,
+                          "not_modified_ms": not_modified_ms, "bytes": len(page.body), "wire_bytes": wire_bytes},
+        }
+        print(f"{days:3d} days x {args.plans} plans: baseline {baseline_ms:6.2f} ms {len(baseline_body) / 1024:7.1f} KiB | "
+              f"first page {first_page_ms:6.2f} ms {len(page.body) / 1024:7.1f} KiB, gzip {wire_bytes / 1024:6.1f} KiB "
+              f"({1 - wire_bytes / len(baseline_body):.0%} fewer bytes), cached {cached_ms:.3f} ms, 304 {not_modified_ms:.3f} ms")
+
+    with open(args.report, "w") as f:
+        json.dump({"config": vars(args), "precompile_ms": precompile_ms, "results": results}, f, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# scripts/benchmark_scorers_getgetplaces.py
+"""
+Compare image scorer backends on latency, memory and agreement with VGG16.
+
+Each backend runs in its own process so its peak RSS (model weights included) is measured in
+isolation. Photos come from a directory of images, the on-disk photo cache, or are synthesised.
+Rank agreement is the Spearman correlation of each backend's scores with the reference backend.
+"""
+import sys
+import os
+# Add the directory containing the 'vision' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import time
+
+import numpy as np
+
+
+def load_images(images_dir=None, photo_cache_dir=None, count=50, seed=0):
+    """Return a list of 224x224 uint8 RGB arrays."""
+    from vision.photo_cache import decode_photo
+
+    images = []
+    if images_dir:
+        for name in sorted(os.listdir(images_dir)):
+            path = os.path.join(images_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    images.append(decode_photo(f.read()))
+            except (OSError, ValueError):
+                continue
+    elif photo_cache_dir:
+        for dirpath, _, filenames in os.walk(photo_cache_dir):
+            for name in filenames:
+                if name.endswith(".npy"):
+                    images.append(np.load(os.path.join(dirpath, name), allow_pickle=False))
+    else:
+        # Smooth random gradients with varying noise, brightness and saturation
+        rng = np.random.default_rng(seed)
+        yy, xx = np.mgrid[0:224, 0:224] / 224.0
+        for _ in range(count):
+            base = np.stack([np.sin(xx * rng.uniform(1, 12) + rng.uniform(0, 6)) for _ in range(3)], axis=-1)
+            img = 0.5 + 0.5 * base * rng.uniform(0.1, 1.0) + rng.normal(0, rng.uniform(0, 0.2), base.shape)
+            img = img * rng.uniform(0.3, 1.2)
+            images.append((np.clip(img, 0, 1) * 255).astype(np.uint8))
+    return images[:count] if count else images
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_backend(name, images, batch_size, queue):
+    try:
+        from vision.scorers import get_scorer
+
+        before = peak_rss_mb()
+        started = time.perf_counter()
+        scorer = get_scorer(name)
+        load_seconds = time.perf_counter() - started
+        scorer.score_batch(images[:1])  # warm-up
+        latencies, scores = [], []
+        for i in range(0, len(images), batch_size):
+            batch = images[i:i + batch_size]
+            started = time.perf_counter()
+            scores.extend(scorer.score_batch(batch))
+            latencies.append((time.perf_counter() - started) / len(batch))
+        queue.put({
+            "backend": name,
+            "scorer": scorer.name,
+            "load_seconds": load_seconds,
+            "mean_ms_per_image": statistics.fmean(latencies) * 1000,
+            "p50_ms_per_image": statistics.median(latencies) * 1000,
+            "peak_rss_mb": peak_rss_mb(),
+            "model_rss_mb": peak_rss_mb() - before,
+            "scores": scores,
+        })
+    except Exception as e:
+        queue.put({"backend": name, "error": f"{type(e).__name__}: {e}"})
+
+
+def spearman(a, b):
+    """Spearman rank correlation (ties broken by order, which is fine for continuous scores)."""
+    ra = np.argsort(np.argsort(a))
+    rb = np.argsort(np.argsort(b))
+    if ra.std() == 0 or rb.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image scorer backends")
+    parser.add_argument("--backends", default="vgg16,vgg16_112,stats")
+    parser.add_argument("--reference", default="vgg16", help="Backend the others are rank-correlated against")
+    parser.add_argument("--images-dir", help="Directory of image files")
+    parser.add_argument("--photo-cache", help="Photo cache directory (decoded .npy photos)")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--report", default="scorer_benchmark.json")
+    args = parser.parse_args()
+
+    images = load_images(args.images_dir, args.photo_cache, args.count)
+    print(f"Scoring {len(images)} images")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in args.backends.split(","):
+        queue = ctx.Queue()
+        process = ctx.Process(target=run_backend, args=(name, images, args.batch_size, queue))
+        process.start()
+        results[name] = queue.get()
+        process.join()
+
+    reference = results.get(args.reference, {}).get("scores")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:12s} unavailable: {result['error']}")
+            continue
+        if reference is not None:
+            result["spearman_vs_reference"] = spearman(result["scores"], reference)
+        rho = result.get("spearman_vs_reference")
+        print(f"{name:12s} {result['mean_ms_per_image']:8.2f} ms/image  peak RSS {result['peak_rss_mb']:7.1f} MB  "
+              f"load {result['load_seconds']:.2f}s  rho vs {args.reference}: {'n/a' if rho is None else f'{rho:.3f}'}")
+
+    with open(args.report, "w") as f:
+        json.dump({"config": vars(args), "images": len(images), "results": results}, f, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# scripts/build_city_packs_getgetplaces.py
+"""
+Offline builder for city packs.
+
+Fetches hotels, attractions and restaurants for each city through the app's own fetchers (so
+coordinates, distances, indoor flags and image scores match a live request), forecasts every
+hotel's nightly price for each day of the forecast window, and writes one versioned binary pack
+per city into CITY_PACK_DIR. The web process maps these on demand and fetches other cities live.
+
+Run with --stub to build against StubProviderServer instead of the real providers.
+"""
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from datetime import datetime, timedelta
+import argparse
+import json
+import time
+
+from utils.city_pack import CITY_PACK_DIR, CityPack, pack_path, write_city_pack
+from utils.gazetteer import gazetteer, CITY
+
+
+def popular_cities(count):
+    """The `count` most populous cities in the gazetteer."""
+    return [location.name for location in sorted(
+        (gazetteer.location(i) for i in range(len(gazetteer)) if gazetteer.kinds[i] == CITY),
+        key=lambda location: -location.population)[:count]]
+
+
+def build_city(app_module, city, start, forecast_days, max_details, out_dir):
+    started = time.perf_counter()
+    data = app_module.search_hotels(city)
+    hotels = app_module.process_hotel_data(data, city, float("inf"), start)
+    price_levels = {place.get("name", "Unknown"): int(place.get("price_level", 2)) for place in data.get("results", [])}
+    forecasts = {hotel.name: [app_module.estimate_hotel_price(hotel.name, price_levels.get(hotel.name, 2), start + timedelta(days=day))
+                              for day in range(forecast_days)]
+                 for hotel in hotels}
+    attractions = app_module.fetch_attractions(city, start, start, max_details=max_details, score_images=True)
+    restaurants = app_module.fetch_restaurants(city, start, start, max_details=max_details)
+    center = app_module.get_coordinates(city)
+
+    path = pack_path(city, out_dir)
+    size = write_city_pack(path, city, center, hotels + attractions + restaurants, start.date(), forecasts, price_levels)
+    CityPack(path)  # Read it back so a bad pack fails the build, not a request
+    return {"path": path, "bytes": size, "hotels": len(hotels), "attractions": len(attractions),
+            "restaurants": len(restaurants), "seconds": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build memory-mappable city packs for popular destinations")
+    parser.add_argument("cities", nargs="*", help="Cities to pack (default: the --top most populous in the gazetteer)")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--out-dir", default=CITY_PACK_DIR)
+    parser.add_argument("--start-date", help="First day of the price forecast (YYYY-MM-DD, default today)")
+    parser.add_argument("--forecast-days", type=int, default=180)
+    parser.add_argument("--max-details", type=int, default=20, help="Attractions and restaurants to fetch details for per city")
+    parser.add_argument("--stub", action="store_true", help="Build against StubProviderServer (no provider keys needed)")
+    parser.add_argument("--database-url", help="DATABASE_URL for the fetchers' writes (default: the app's)")
+    parser.add_argument("--report", default="city_pack_build.json")
+    args = parser.parse_args()
+
+    stub = None
+    if args.stub:
+        from stub_providers_getgetplaces import StubProviderServer
+        stub = StubProviderServer(latency_ms=0).start()
+        os.environ.update(stub.environ())
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # The app reads provider URLs, keys and DATABASE_URL at import time, so configure first
+    import app as app_module
+
+    start = datetime.strptime(args.start_date, "%Y-%m-%d") if args.start_date else datetime.combine(datetime.now().date(), datetime.min.time())
+    os.makedirs(args.out_dir, exist_ok=True)
+    results, failures = {}, {}
+    try:
+        for city in args.cities or popular_cities(args.top):
+            try:
+                results[city] = build_city(app_module, city, start, args.forecast_days, args.max_details, args.out_dir)
+            except Exception as e:
+                failures[city] = str(e)
+                print(f"{city:25s} FAILED: {e}")
+                continue
+            result = results[city]
+            print(f"{city:25s} {result['hotels']:3d} hotels {result['attractions']:3d} attractions {result['restaurants']:3d} restaurants "
+                  f"{result['bytes'] / 1024:7.1f} KiB in {result['seconds']:.1f}s -> {result['path']}")
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    with open(args.report, "w") as f:
+        json.dump({"config": vars(args), "start_date": start.strftime("%Y-%m-%d"), "results": results, "failures": failures}, f, indent=2)
+    print(f"Packed {len(results)} cities ({len(failures)} failed); report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,112 @@
 # scripts/clean_data_getgetplaces.py
-import pandas as pd
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+from sqlalchemy import text
+import argparse
+import logging
 from utils.database import Database
 
+logger = logging.getLogger(__name__)
 db = Database()
 
-def clean_data():
-    # Clean hotels
-    hotels = pd.read_sql_query("SELECT * FROM hotels", db.engine)
-    hotels = hotels.dropna(subset=["name", "price", "rating"])
-    hotels["price"] = hotels["price"].apply(lambda x: max(10, min(x, 1000)))
-    hotels.to_sql("hotels", db.engine, if_exists="replace", index=False)
+MIN_HOTEL_PRICE = 10
+MAX_HOTEL_PRICE = 1000
+MIN_RATING = 0
+MAX_RATING = 5
+
+
+def get_watermark(conn, name):
+    return conn.execute(text("SELECT last_key FROM cleaning_watermarks WHERE name = :name"), {"name": name}).scalar()
+
+
+def set_watermark(conn, name, last_key):
+    params = {"name": name, "last_key": str(last_key), "updated_at": datetime.utcnow()}
+    updated = conn.execute(text("UPDATE cleaning_watermarks SET last_key = :last_key, updated_at = :updated_at WHERE name = :name"), params)
+    if updated.rowcount == 0:
+        conn.execute(text("INSERT INTO cleaning_watermarks (name, last_key, updated_at) VALUES (:name, :last_key, :updated_at)"), params)
+
+
+def clean_hotels(chunk_size=50_000):
+    """
+    Clean hotels inserted since the last run, in id-range chunks.
+
+    Each chunk drops incomplete rows and clamps prices with set-based statements and advances
+    the watermark in the same transaction, so the table, its indexes and constraints stay in
+    place and an interrupted run resumes where it stopped. The app only ever inserts hotels,
+    so the id watermark covers every row changed since the previous run.
+    """
+    with db.engine.connect() as conn:
+        watermark = int(get_watermark(conn, "hotels") or 0)
+        max_id = conn.execute(text("SELECT MAX(id) FROM hotels")).scalar() or 0
+
+    deleted = clamped = 0
+    low = watermark
+    while low < max_id:
+        high = min(low + chunk_size, max_id)
+        bounds = {"low": low, "high": high}
+        with db.engine.begin() as conn:
+            deleted += conn.execute(text("""
+                DELETE FROM hotels
+                WHERE id > :low AND id <= :high AND (name IS NULL OR price IS NULL OR rating IS NULL)
+            """), bounds).rowcount
+            clamped += conn.execute(text("""
+                UPDATE hotels
+                SET price = CASE WHEN price < :min_price THEN :min_price ELSE :max_price END
+                WHERE id > :low AND id <= :high AND (price < :min_price OR price > :max_price)
+            """), {**bounds, "min_price": MIN_HOTEL_PRICE, "max_price": MAX_HOTEL_PRICE}).rowcount
+            set_watermark(conn, "hotels", high)
+        low = high
+
+    logger.info(f"Hotels cleaned up to id {max_id}: {deleted} incomplete rows removed, {clamped} prices clamped")
+    return {"deleted": deleted, "clamped": clamped, "watermark": max_id}
+
+
+def _object_id(value):
+    """Watermarks are stored as strings; turn ObjectId hex strings back into ObjectIds."""
+    from bson import ObjectId
+    return ObjectId(value) if value and ObjectId.is_valid(value) else value
+
+
+def clean_attractions(chunk_size=50_000):
+    """Clean attractions added since the last run with in-place update_many/delete_many calls."""
+    mongo = getattr(db, "db", None)
+    if mongo is None:
+        logger.warning("No MongoDB handle configured on Database, skipping attractions")
+        return None
+
+    with db.engine.connect() as conn:
+        watermark = _object_id(get_watermark(conn, "attractions"))
+
+    deleted = clamped = 0
+    while True:
+        query = {"_id": {"$gt": watermark}} if watermark else {}
+        ids = [doc["_id"] for doc in mongo.attractions.find(query, {"_id": 1}).sort("_id", 1).limit(chunk_size)]
+        if not ids:
+            break
+        chunk = {"_id": {"$gte": ids[0], "$lte": ids[-1]}}
+        deleted += mongo.attractions.delete_many({**chunk, "$or": [{"name": None}, {"rating": None}]}).deleted_count
+        clamped += mongo.attractions.update_many({**chunk, "rating": {"$gt": MAX_RATING}}, {"$set": {"rating": MAX_RATING}}).modified_count
+        clamped += mongo.attractions.update_many({**chunk, "rating": {"$lt": MIN_RATING}}, {"$set": {"rating": MIN_RATING}}).modified_count
+        watermark = ids[-1]
+        with db.engine.begin() as conn:
+            set_watermark(conn, "attractions", watermark)
+
+    logger.info(f"Attractions cleaned: {deleted} incomplete documents removed, {clamped} ratings clamped")
+    return {"deleted": deleted, "clamped": clamped}
+
+
+def clean_data(chunk_size=50_000):
+    clean_hotels(chunk_size)
+    clean_attractions(chunk_size)
 
-    # Clean MongoDB attractions
-    attractions = pd.DataFrame(list(db.db.attractions.find()))
-    attractions = attractions.dropna(subset=["name", "rating"])
-    attractions["rating"] = attractions["rating"].apply(lambda x: max(0, min(x, 5)))
-    db.db.attractions.drop()
-    db.db.attractions.insert_many(attractions.to_dict("records"))
 
 if __name__ == "__main__":
-    clean_data()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Incrementally clean hotels and attractions")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+    clean_data(args.chunk_size)
@@ -1,30 +1,73 @@
 # scripts/scrape_reviews_getgetplaces.py
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 from bs4 import BeautifulSoup
-import requests
+from datetime import datetime
+import argparse
 import logging
+from utils.crawler import Crawler, CrawlState
 from utils.database import Database
 
 logger = logging.getLogger(__name__)
 db = Database()
 
-def scrape_tripadvisor_reviews(city, num_reviews=10):
-    url = f"https://www.tripadvisor.com/Search?q={city}+hotels"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        reviews = []
-        for item in soup.find_all("div", class_="review")[:num_reviews]:
-            review_text = item.get_text(strip=True)
-            reviews.append(review_text)
-        db.db.reviews.insert_many({"city": city, "review": r} for r in reviews)
-        return reviews
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error scraping TripAdvisor for {city}: {e}")
-        return []
+DEFAULT_URL_TEMPLATE = "https://www.tripadvisor.com/Search?q={city}+hotels&o={offset}"
+RESULTS_PER_PAGE = 30
+
+
+def parse_reviews(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [item.get_text(strip=True) for item in soup.find_all("div", class_="review")]
+
+
+def scrape_tripadvisor_reviews(cities, pages=1, url_template=DEFAULT_URL_TEMPLATE, workers=4, per_host_interval=1.0, state_path="crawl_state.json"):
+    """
+    Crawl review pages for `cities` and store reviews that have not been seen before.
+
+    Pages are fetched by a bounded worker pool with per-host rate limiting, re-fetched
+    conditionally using ETag/Last-Modified, and deduplicated by content hash both in the crawl
+    state and in the reviews table. Progress is kept in `state_path` so a crawl can resume.
+
+    Returns:
+        dict: Crawl statistics including pages per second and reviews stored.
+    """
+    url_city = {}
+    for city in cities:
+        for page in range(pages):
+            url_city[url_template.format(city=city, page=page, offset=page * RESULTS_PER_PAGE)] = city
+
+    state = CrawlState(state_path)
+    crawler = Crawler(max_workers=workers, per_host_interval=per_host_interval, state=state)
+    stored = 0
+
+    def store(result):
+        nonlocal stored
+        if result.new_items:
+            # URLs resumed from an earlier run carry the city they were queued with
+            city = result.label or url_city.get(result.url, "Unknown")
+            stored += db.insert_reviews(city, result.url, result.new_items, fetched_at=datetime.utcnow())
+
+    crawler.crawl(url_city, parse_reviews, on_result=store)
+    stats = dict(crawler.stats, stored=stored, pages_per_second=crawler.pages_per_second())
+    logger.info(
+        f"Crawled {stats['pages']} pages ({stats['not_modified']} not modified, {stats['errors']} errors) "
+        f"at {stats['pages_per_second']:.2f} pages/s; stored {stored} new reviews"
+    )
+    return stats
+
 
 if __name__ == "__main__":
-    for city in ["Tampa", "Orlando", "Miami"]:
-        reviews = scrape_tripadvisor_reviews(city)
-        logger.info(f"Scraped {len(reviews)} reviews for {city}")
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Incrementally crawl hotel reviews")
+    parser.add_argument("cities", nargs="*", default=["Tampa", "Orlando", "Miami"])
+    parser.add_argument("--pages", type=int, default=1, help="Result pages per city")
+    parser.add_argument("--url-template", default=DEFAULT_URL_TEMPLATE,
+                        help="Page URL with {city}, {page} and {offset} placeholders (point at a local fixture server for testing)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-host-interval", type=float, default=1.0, help="Minimum seconds between requests to one host")
+    parser.add_argument("--state", default="crawl_state.json")
+    args = parser.parse_args()
+    scrape_tripadvisor_reviews(args.cities, args.pages, args.url_template, args.workers, args.per_host_interval, args.state)
@@ -4,39 +4,165 @@ import os
 # Add the directory containing the 'utils' module to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.database import Database
-from datetime import datetime, timedelta
+from utils.database import Database, User, Trip
+from datetime import date, timedelta
+from multiprocessing import Pool
+from sqlalchemy import text
+import argparse
+import csv
+import io
+import json
+import logging
+import math
 import random
+import time
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
 
 db = Database()
 
-def simulate_users(num_users=10):
-    cities = ["Tampa", "Orlando", "Miami"]
-    for _ in range(num_users):
-        user_id = random.randint(1, 1000)
-        username = f"getget_user{random.randint(1, 1000)}"
-        email = f"{username}@getgetplaces.com"
-        preferences = {"budget": random.uniform(500, 1500), "indoor": random.choice([True, False])}
-        session = db.Session()
-        session.execute(
-            "INSERT INTO users (username, email, preferences) VALUES (:username, :email, :preferences)",
-            {"username": username, "email": email, "preferences": preferences}
-        )
-        session.commit()
-        session.close()
-
-        start_date = datetime(2025, 3, 10)
-        end_date = start_date + timedelta(days=random.randint(3, 7))
-        destination = random.choice(cities)
-        cost = random.uniform(500, 2000)
-        feedback = {"rating": random.uniform(3, 5), "comments": "Good trip!"}
-        session = db.Session()
-        session.execute(
-            "INSERT INTO trips (user_id, start_date, end_date, destination, cost, feedback) VALUES (:user_id, :start_date, :end_date, :destination, :cost, :feedback)",
-            {"user_id": user_id, "start_date": start_date, "end_date": end_date, "destination": destination, "cost": cost, "feedback": feedback}
-        )
-        session.commit()
-        session.close()
+# Destinations with relative popularity (Zipf-like) and a typical per-day spend multiplier
+DESTINATIONS = [
+    ("Orlando", 1.00), ("Miami", 1.25), ("Tampa", 0.90), ("New York", 1.60), ("Las Vegas", 1.20),
+    ("Los Angeles", 1.45), ("San Francisco", 1.55), ("Chicago", 1.20), ("New Orleans", 1.05),
+    ("Nashville", 1.00), ("Seattle", 1.30), ("Boston", 1.40), ("Washington", 1.25), ("Honolulu", 1.70),
+    ("Denver", 1.05), ("Austin", 1.05), ("San Diego", 1.30), ("Key West", 1.35), ("Savannah", 0.95),
+    ("Charleston", 1.00),
+]
+DESTINATION_WEIGHTS = [1 / (rank + 1) ** 0.9 for rank in range(len(DESTINATIONS))]
+# Relative travel volume by month (peaks in summer and late December)
+MONTH_WEIGHTS = [0.7, 0.75, 1.0, 0.95, 1.0, 1.3, 1.5, 1.4, 0.85, 0.9, 0.95, 1.2]
+COMMENTS = ["Good trip!", "Great food.", "Hotel was noisy.", "Loved the beaches.", "Too expensive.", "Would come back."]
+
+
+def _random_start_date(rng, first_year, years):
+    year = first_year + rng.randrange(years)
+    month = rng.choices(range(1, 13), weights=MONTH_WEIGHTS)[0]
+    day = rng.randint(1, 28)
+    return date(year, month, day)
+
+
+def generate_chunk(args):
+    """
+    Generate users [first_id, first_id + count) and their trips.
+
+    Runs in worker processes; each chunk gets its own seeded RNG so output is reproducible
+    regardless of how chunks are scheduled across processes.
+    """
+    first_id, count, trips_per_user, first_year, years, seed = args
+    rng = random.Random(seed * 1_000_003 + first_id)
+    users = []
+    trips = []
+    for user_id in range(first_id, first_id + count):
+        username = f"getget_user{user_id}"
+        budget = round(rng.lognormvariate(math.log(1200), 0.5), 2)
+        users.append({
+            "id": user_id,
+            "username": username,
+            "email": f"{username}@getgetplaces.com",
+            "preferences": {"budget": budget, "indoor": rng.random() < 0.35},
+        })
+        # Trips per user: an exponential draw with mean trips_per_user, rounded to the nearest
+        # whole trip (a geometric-like count with a long tail of frequent travellers), at least one
+        num_trips = max(1, int(rng.expovariate(1 / trips_per_user) + 0.5))
+        for _ in range(num_trips):
+            destination, spend_factor = rng.choices(DESTINATIONS, weights=DESTINATION_WEIGHTS)[0]
+            start_date = _random_start_date(rng, first_year, years)
+            length = min(21, max(1, int(rng.lognormvariate(math.log(4), 0.45))))
+            per_day = rng.lognormvariate(math.log(180 * spend_factor), 0.35)
+            trips.append({
+                "user_id": user_id,
+                "start_date": start_date,
+                "end_date": start_date + timedelta(days=length),
+                "destination": destination,
+                "cost": round(per_day * length, 2),
+                "feedback": {"rating": round(min(5.0, max(1.0, rng.gauss(4.1, 0.6))), 1), "comments": rng.choice(COMMENTS)},
+            })
+    return users, trips
+
+
+def _copy_rows(raw_conn, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(json.dumps(row[c]) if isinstance(row[c], dict) else row[c] for c in columns)
+    buffer.seek(0)
+    with raw_conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def load_chunk(users, trips, use_copy):
+    """Load one chunk in a single transaction, via COPY on Postgres or a multi-row INSERT elsewhere."""
+    if use_copy:
+        raw_conn = db.engine.raw_connection()
+        try:
+            _copy_rows(raw_conn, "users", ("id", "username", "email", "preferences"), users)
+            _copy_rows(raw_conn, "trips", ("user_id", "start_date", "end_date", "destination", "cost", "feedback"), trips)
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+    else:
+        with db.engine.begin() as conn:
+            conn.execute(User.__table__.insert(), users)
+            conn.execute(Trip.__table__.insert(), trips)
+
+
+def simulate_users(num_users=10, chunk_size=10_000, workers=None, trips_per_user=2.0, first_year=2025, years=2, seed=42, use_copy=None):
+    """
+    Bulk-generate `num_users` users and their trips with consistent foreign keys.
+
+    User ids are allocated explicitly after the current maximum so every trip references a
+    real user. Chunks are generated in parallel across processes and loaded as they complete.
+
+    Returns:
+        dict: Row counts, elapsed seconds and rows per second.
+    """
+    if use_copy is None:
+        use_copy = db.engine.dialect.name == "postgresql"
+    with db.engine.connect() as conn:
+        first_id = (conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM users")).scalar() or 0) + 1
+
+    tasks = [
+        (start, min(chunk_size, first_id + num_users - start), trips_per_user, first_year, years, seed)
+        for start in range(first_id, first_id + num_users, chunk_size)
+    ]
+    user_rows = trip_rows = 0
+    started = time.perf_counter()
+    with Pool(processes=workers) as pool:
+        for users, trips in pool.imap_unordered(generate_chunk, tasks):
+            load_chunk(users, trips, use_copy)
+            user_rows += len(users)
+            trip_rows += len(trips)
+            elapsed = time.perf_counter() - started
+            logger.info(f"Loaded {user_rows} users / {trip_rows} trips ({(user_rows + trip_rows) / elapsed:,.0f} rows/s)")
+
+    if db.engine.dialect.name == "postgresql":
+        # Explicit ids bypass the serial sequence; move it past the rows we inserted
+        with db.engine.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT MAX(id) FROM users))"))
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "users": user_rows,
+        "trips": trip_rows,
+        "seconds": elapsed,
+        "rows_per_second": (user_rows + trip_rows) / elapsed if elapsed else 0.0,
+    }
+    logger.info(f"Generated {user_rows} users and {trip_rows} trips in {elapsed:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
+    return stats
+
 
 if __name__ == "__main__":
-    simulate_users()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic users and trips for scale testing")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None, help="Generator processes (default: CPU count)")
+    parser.add_argument("--trips-per-user", type=float, default=2.0)
+    parser.add_argument("--first-year", type=int, default=2025)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-copy", action="store_true", help="Use multi-row INSERT even on Postgres")
+    args = parser.parse_args()
+    simulate_users(args.users, args.chunk_size, args.workers, args.trips_per_user, args.first_year, args.years, args.seed,
+                   use_copy=False if args.no_copy else None)
@@ -0,0 +1,236 @@
+# scripts/stub_providers_getgetplaces.py
+"""
+Local stand-in for the Google Maps, OpenWeatherMap and Priceline endpoints used by the app.
+
+Responses are replayed from recorded JSON fixtures when available (one file per endpoint in
+--fixtures, e.g. textsearch.json, details.json, geocode.json, onecall.json, cars.json) and are
+otherwise synthesised deterministically from the request parameters. Every response can be
+delayed by a configurable latency to mimic real provider round trips.
+"""
+import sys
+import os
+# Add the directory containing the 'utils' module to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timedelta
+import argparse
+import hashlib
+import json
+import logging
+import random
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ROUTES = {
+    "/maps/api/geocode/json": "geocode",
+    "/maps/api/place/textsearch/json": "textsearch",
+    "/maps/api/place/details/json": "details",
+    "/maps/api/place/photo": "photo",
+    "/data/3.0/onecall": "onecall",
+    "/cars/search": "cars",
+}
+
+CITY_CENTERS = {"tampa": (27.9506, -82.4572), "orlando": (28.5383, -81.3792), "miami": (25.7617, -80.1918)}
+REVIEW_SNIPPETS = [
+    "Great pool and very quiet rooms, staff were friendly.",
+    "Parking was expensive but the location is perfect for walking.",
+    "Breakfast was average, the view from the rooftop made up for it.",
+    "Clean, modern and close to the beach. Would stay again.",
+    "Loved the museum exhibits, plan at least two hours here.",
+]
+
+
+def _rng(*parts):
+    seed = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return random.Random(int(seed[:12], 16))
+
+
+def _center(query):
+    query = (query or "").lower()
+    for city, coords in CITY_CENTERS.items():
+        if city in query:
+            return coords
+    rng = _rng("center", query)
+    return rng.uniform(25, 48), rng.uniform(-122, -71)
+
+
+def synthetic_bmp(seed, size=64):
+    """A small 24-bit BMP so image decoding and scoring have real pixels to work on."""
+    rng = _rng("photo", seed)
+    base = [rng.randrange(256) for _ in range(3)]
+    row_bytes = size * 3
+    padding = (4 - row_bytes % 4) % 4
+    rows = []
+    for y in range(size):
+        row = bytearray()
+        for x in range(size):
+            row.extend(((base[0] + x * 3) % 256, (base[1] + y * 3) % 256, (base[2] + x + y) % 256))
+        rows.append(bytes(row) + b"\x00" * padding)
+    pixels = b"".join(rows)
+    header = struct.pack("<2sIHHI", b"BM", 54 + len(pixels), 0, 0, 54)
+    info = struct.pack("<IiiHHIIiiII", 40, size, size, 1, 24, 0, len(pixels), 2835, 2835, 0, 0)
+    return header + info + pixels
+
+
+def synthetic_response(route, params, results=20):
+    """Build a provider-shaped response for `route` from the query parameters."""
+    if route == "geocode":
+        lat, lng = _center(params.get("address"))
+        return {"status": "OK", "results": [{"geometry": {"location": {"lat": lat, "lng": lng}}}]}
+    if route == "textsearch":
+        query = params.get("query", "")
+        lat, lng = _center(query)
+        rng = _rng("textsearch", query)
+        kind = query.split(" in ")[0].rstrip("s").title() or "Place"
+        return {"status": "OK", "results": [
+            {
+                "place_id": f"{query}:{i}",
+                "name": f"{kind} {i}",
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "price_level": rng.randint(1, 4),
+                "geometry": {"location": {"lat": lat + rng.uniform(-0.05, 0.05), "lng": lng + rng.uniform(-0.05, 0.05)}},
+            }
+            for i in range(results)
+        ]}
+    if route == "details":
+        place_id = params.get("place_id", "")
+        rng = _rng("details", place_id)
+        types = rng.choice([["museum", "point_of_interest"], ["park", "point_of_interest"], ["restaurant", "food"], ["gallery"]])
+        return {"status": "OK", "result": {
+            "name": place_id.split(":")[-1],
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "types": types,
+            "reviews": [{"text": rng.choice(REVIEW_SNIPPETS)} for _ in range(3)],
+            "photos": [{"photo_reference": hashlib.sha1(place_id.encode()).hexdigest()}],
+        }}
+    if route == "onecall":
+        rng = _rng("onecall", params.get("lat"), params.get("lon"))
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        return {"daily": [
+            {"dt": int((today + timedelta(days=i)).timestamp()), "weather": [{"main": rng.choice(["Clear", "Clouds", "Rain"])}]}
+            for i in range(8)
+        ]}
+    if route == "cars":
+        location = params.get("pickUpLocation", "")
+        rng = _rng("cars", location)
+        return {"data": [
+            {
+                "vehicleName": f"Car {i}",
+                "price": round(rng.uniform(25, 120), 2),
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "company": rng.choice(["Acme", "Budget Wheels", "Sunshine Rentals"]),
+            }
+            for i in range(results)
+        ]}
+    return None
+
+
+class StubProviderServer:
+    """Threaded HTTP server replaying provider responses with injected latency."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, fixtures_dir=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fixtures = self._load_fixtures(fixtures_dir)
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @staticmethod
+    def _load_fixtures(fixtures_dir):
+        fixtures = {}
+        if not fixtures_dir:
+            return fixtures
+        for route in set(ROUTES.values()) - {"photo"}:
+            path = os.path.join(fixtures_dir, f"{route}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    fixtures[route] = json.load(f)
+                logger.info(f"Loaded recorded {route} fixture from {path}")
+        return fixtures
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self):
+        """Environment variables that point the app at this server."""
+        return {
+            "GOOGLE_MAPS_API_BASE": f"{self.url}/maps/api",
+            "OPENWEATHERMAP_API_BASE": f"{self.url}/data/3.0",
+            "PRICELINE_API_BASE": self.url,
+            "GOOGLE_PLACES_API_KEY": "stub-key",
+            "GOOGLE_GEOCODING_API_KEY": "stub-key",
+            "OPENWEATHERMAP_API_KEY": "stub-key",
+            "RAPIDAPI_KEY_PRICELINE": "stub-key",
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug("stub: " + format, *args)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                route = ROUTES.get(parsed.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                delay = server.latency_ms + (random.uniform(0, server.jitter_ms) if server.jitter_ms else 0)
+                if delay:
+                    time.sleep(delay / 1000)
+                with server._lock:
+                    server.requests_served += 1
+
+                if route == "photo":
+                    body, content_type = synthetic_bmp(params.get("photoreference")), "image/bmp"
+                elif route in server.fixtures:
+                    body, content_type = json.dumps(server.fixtures[route]).encode(), "application/json"
+                elif route:
+                    body, content_type = json.dumps(synthetic_response(route, params)).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve stub provider responses for offline benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="Directory of recorded <endpoint>.json responses to replay")
+    args = parser.parse_args()
+    stub = StubProviderServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.fixtures)
+    for key, value in stub.environ().items():
+        print(f"export {key}={value}")
+    logger.info(f"Stub providers listening on {stub.url}")
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,31 @@
+# tests/conftest.py
+import os
+import sys
+
+# Add the repository root (which holds the 'utils', 'chatbot' and 'vision' packages) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to; `sleep` advances it instead of blocking."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,52 @@
+# tests/test_app_quota.py
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+from utils.quota import QuotaAccountant
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+from stub_providers_getgetplaces import StubProviderServer
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    """The app pointed at StubProviderServer; skipped where its ML dependencies are not installed."""
+    stub = StubProviderServer(latency_ms=0).start()
+    environ = dict(stub.environ(), DATABASE_URL=f"sqlite:///{tmp_path_factory.mktemp('db') / 'app.db'}", IMAGE_SCORER="stats")
+    saved = {key: os.environ.get(key) for key in environ}
+    os.environ.update(environ)
+    try:
+        yield pytest.importorskip("app")
+    finally:
+        stub.stop()
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def exhausted_after(calls, clock):
+    """A Google Places quota with `calls` calls left today and no waiting for more."""
+    return QuotaAccountant({"google_places": (1000, calls)}, clock=clock, sleep=clock.sleep, max_wait=0)
+
+
+@pytest.mark.parametrize("fetch", ["fetch_attractions", "fetch_restaurants"])
+def test_details_stop_at_an_exhausted_quota(app_module, monkeypatch, clock, fetch):
+    start = datetime(2026, 11, 1)
+    # One text search plus three details calls
+    monkeypatch.setattr("utils.api.quota_accountant", exhausted_after(4, clock))
+    kwargs = {"score_images": False} if fetch == "fetch_attractions" else {}
+    places = getattr(app_module, fetch)("Miami", start, start, max_details=10, **kwargs)
+    assert len(places) == 3
+
+
+def test_search_call_denied_surfaces_quota_exceeded(app_module, monkeypatch, clock):
+    from utils.quota import QuotaExceeded
+    start = datetime(2026, 11, 1)
+    monkeypatch.setattr("utils.api.quota_accountant", exhausted_after(0, clock))
+    with pytest.raises(QuotaExceeded):
+        app_module.fetch_restaurants("Miami", start, start)
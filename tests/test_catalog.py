@@ -0,0 +1,90 @@
+# tests/test_catalog.py
+import pytest
+
+from utils.catalog import CityCatalog, LazySchedule, Place
+
+
+def make_places():
+    return [Place("hotel", "Hotel", 4.0, distance=2.0, price=120.0),
+            Place("attraction", "Museum", 4.5, distance=1.0, is_indoor=True),
+            Place("attraction", "Park", 4.5, distance=0.5),
+            Place("attraction", "Zoo", 4.8, distance=6.0)]
+
+
+def test_place_supports_read_only_mapping_access():
+    place = Place("attraction", "Museum", 4.5, lat=1.5, long=2.5, is_indoor=True)
+
+    assert place["rating"] == 4.5
+    assert place.get("is_indoor") is True
+    assert place.get("missing", "default") == "default"
+    assert place.location == "Coordinates: (1.5, 2.5)"
+    with pytest.raises(KeyError):
+        place["missing"]
+    with pytest.raises(AttributeError):
+        place.extra = 1
+
+
+def test_places_are_added_once_and_addressed_by_index():
+    places = make_places()
+    catalog = CityCatalog("Testville", places)
+
+    assert catalog.add(places[2]) == 2
+    assert len(catalog) == 4
+    assert catalog[catalog.index_of(places[3])] is places[3]
+    assert [place.name for place in catalog.of_kind("attraction")] == ["Museum", "Park", "Zoo"]
+
+
+def test_fingerprint_is_cached_and_tracks_place_data():
+    catalog = CityCatalog("Testville", make_places())
+    fingerprint = catalog.fingerprint()
+
+    assert catalog.fingerprint() == fingerprint
+    assert CityCatalog("Testville", make_places()).fingerprint() == fingerprint
+
+    changed = make_places()
+    changed[1] = Place("attraction", "Museum", 4.5, distance=1.0, is_indoor=False)
+    assert CityCatalog("Testville", changed).fingerprint() != fingerprint
+    assert CityCatalog("Testville", make_places()[::-1]).fingerprint() != fingerprint
+
+    catalog.add(Place("restaurant", "Diner", 4.0))
+    assert catalog.fingerprint() != fingerprint
+
+
+def test_ranked_defaults_to_rating_then_distance_until_a_ranking_is_set():
+    places = make_places()
+    catalog = CityCatalog("Testville", places)
+
+    assert [catalog[i].name for i in catalog.ranked("attraction")] == ["Zoo", "Park", "Museum"]
+    catalog.set_ranking("attraction", [places[1], places[3]])
+    assert catalog.ranked("attraction") == [1, 3]
+
+
+def counting_days(count, built):
+    for day in range(1, count + 1):
+        built.append(day)
+        yield f"day {day}"
+
+
+def test_lazy_schedule_builds_only_the_days_asked_for():
+    built = []
+    schedule = LazySchedule(counting_days(30, built), 30)
+
+    assert len(schedule) == 30 and schedule.built == 0
+    assert schedule[0:3] == ["day 1", "day 2", "day 3"]
+    assert built == [1, 2, 3]
+    assert schedule[1] == "day 2" and schedule.built == 3
+    assert schedule[4] == "day 5" and built == [1, 2, 3, 4, 5]
+    assert schedule[-1] == "day 30" and schedule.built == 30
+    assert list(schedule) == [f"day {day}" for day in range(1, 31)]
+    assert built == list(range(1, 31))
+
+
+def test_lazy_schedule_keeps_built_days_and_stops_when_the_cursor_ends():
+    schedule = LazySchedule(counting_days(2, []), 3)
+    first = schedule[0]
+
+    assert schedule[0] is first
+    assert list(schedule) == ["day 1", "day 2"]
+    assert schedule[0:3] == ["day 1", "day 2"]
+    with pytest.raises(IndexError):
+        schedule[2]
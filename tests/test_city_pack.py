@@ -0,0 +1,95 @@
+# tests/test_city_pack.py
+import os
+import struct
+from datetime import date, datetime
+
+import pytest
+
+from utils.catalog import Place
+from utils.city_pack import CityPack, CityPackError, CityPackStore, pack_path, write_city_pack
+
+START = date(2026, 11, 1)
+
+
+def sample_places():
+    return [
+        Place("hotel", "Cheap Inn", 3.5, 1.2, 25.77, -80.19, ("Clean", "Noisy"), price=80.0),
+        Place("hotel", "Grand Hotel", 4.8, 0.4, 25.78, -80.13, ("Lovely",), price=300.0),
+        Place("hotel", "Unforecast Hostel", 3.0, 2.0, 25.76, -80.20, price=40.0),
+        Place("attraction", "Vizcaya Museum", 4.7, 5.0, 25.74, -80.21, ("Beautiful gardens",), is_indoor=True,
+              image_score=0.8, types=("museum", "tourist_attraction")),
+        Place("attraction", "South Beach", 4.6, 3.0, 25.78, -80.13, types=("beach",)),
+        Place("restaurant", "Joe's Stone Crab", 4.5, 2.5, 25.77, -80.13, ("Worth the wait",), types=("restaurant", "seafood")),
+        Place("car", "Compact", 4.0, price=30.0),
+    ]
+
+
+@pytest.fixture
+def pack_file(tmp_path):
+    path = pack_path("Miami, FL", str(tmp_path))
+    forecasts = {"Cheap Inn": [90.0, 95.0, None], "Grand Hotel": [310.0, 320.0, 330.0]}
+    size = write_city_pack(path, "Miami", (25.7617, -80.1918), sample_places(), START, forecasts,
+                           {"Cheap Inn": 1, "Grand Hotel": 4, "Unforecast Hostel": 1})
+    assert size == os.path.getsize(path)
+    return path
+
+
+def test_round_trip(pack_file):
+    pack = CityPack(pack_file)
+    assert (pack.city, pack.center, pack.forecast_start) == ("Miami", (25.7617, -80.1918), START)
+    assert len(pack) == 6  # cars are not packed
+    museum, beach = pack.places("attraction")
+    assert (museum.name, museum.rating, museum.is_indoor, museum.image_score) == ("Vizcaya Museum", 4.7, True, 0.8)
+    assert museum.types == ("museum", "tourist_attraction")
+    assert museum.reviews == ("Beautiful gardens",)
+    assert (museum.lat, museum.long, museum.city) == (25.74, -80.21, "Miami")
+    assert beach.reviews == ()
+    restaurant, = pack.places("restaurant", city="Miami Beach")
+    assert (restaurant.name, restaurant.city, restaurant.types) == ("Joe's Stone Crab", "Miami Beach", ("restaurant", "seafood"))
+
+
+def test_hotels_priced_from_the_forecast(pack_file):
+    calls = []
+
+    def estimate(name, price_level, when):
+        calls.append((name, price_level))
+        return 50.0
+
+    pack = CityPack(pack_file)
+    hotels = pack.hotels(200, datetime(2026, 11, 2), estimate)
+    assert [(h.name, h.price) for h in hotels] == [("Cheap Inn", 95.0), ("Unforecast Hostel", 50.0)]
+    assert calls == [("Unforecast Hostel", 1)]
+
+
+def test_hotels_fall_back_to_live_prices(pack_file):
+    pack = CityPack(pack_file)
+    # Day 3 has no usable Cheap Inn forecast, and June is outside the forecast window
+    assert [h.price for h in pack.hotels(1000, datetime(2026, 11, 3), lambda *a: 70.0)] == [70.0, 330.0, 70.0]
+    assert [h.price for h in pack.hotels(1000, date(2027, 6, 1), lambda *a: None)] == []
+
+
+def test_rejects_other_versions_and_other_files(pack_file, tmp_path):
+    with open(pack_file, "r+b") as f:
+        f.seek(4)
+        f.write(struct.pack("<H", 99))
+    with pytest.raises(CityPackError, match="version 99"):
+        CityPack(pack_file)
+    other = tmp_path / "notes.ggcp"
+    other.write_bytes(b"x" * 128)
+    with pytest.raises(CityPackError):
+        CityPack(str(other))
+
+
+def test_store_maps_once_and_notices_rebuilds(pack_file, tmp_path):
+    store = CityPackStore(str(tmp_path))
+    assert store.get("Atlantis") is None
+    first = store.get("Miami")
+    assert first is not None and store.get("miami") is first
+    write_city_pack(pack_file, "Miami", (25.7617, -80.1918), sample_places()[:2], START, {}, {})
+    rebuilt = store.get("Miami")
+    assert rebuilt is not first and len(rebuilt) == 2
+
+
+def test_store_skips_unreadable_packs(tmp_path):
+    (tmp_path / "miami.ggcp").write_bytes(b"GGCP")
+    assert CityPackStore(str(tmp_path)).get("Miami") is None
@@ -0,0 +1,73 @@
+# tests/test_clean_data.py
+import importlib
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+
+
+@pytest.fixture
+def clean(tmp_path, monkeypatch):
+    """The clean-up script bound to an empty SQLite database."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'clean.db'}")
+    from utils.database import Database
+    module = importlib.import_module("clead_data_getgetplaces")
+    monkeypatch.setattr(module, "db", Database())
+    return module
+
+
+def add_hotels(clean, *rows):
+    with clean.db.engine.begin() as conn:
+        conn.execute(text("INSERT INTO hotels (name, price, rating) VALUES (:name, :price, :rating)"),
+                     [{"name": name, "price": price, "rating": rating} for name, price, rating in rows])
+
+
+def hotels(clean):
+    with clean.db.engine.connect() as conn:
+        return conn.execute(text("SELECT id, name, price FROM hotels ORDER BY id")).all()
+
+
+def test_hotels_are_cleaned_in_chunks_up_to_the_watermark(clean):
+    add_hotels(clean, ("Cheap", 2, 4.0), (None, 100, 4.0), ("Fine", 150, 4.5), ("Palace", 5000, 5.0), ("Unrated", 80, None))
+
+    assert clean.clean_hotels(chunk_size=2) == {"deleted": 2, "clamped": 2, "watermark": 5}
+    assert hotels(clean) == [(1, "Cheap", 10), (3, "Fine", 150), (4, "Palace", 1000)]
+    with clean.db.engine.connect() as conn:
+        assert clean.get_watermark(conn, "hotels") == "5"
+
+
+def test_a_second_run_only_touches_new_hotels(clean):
+    add_hotels(clean, ("Fine", 150, 4.5))
+    clean.clean_hotels(chunk_size=2)
+    # Rows at or below the watermark are left alone even if they would fail the checks now
+    with clean.db.engine.begin() as conn:
+        conn.execute(text("UPDATE hotels SET price = 5000 WHERE id = 1"))
+    add_hotels(clean, ("Palace", 5000, 5.0), (None, 100, 4.0))
+
+    assert clean.clean_hotels(chunk_size=2) == {"deleted": 1, "clamped": 1, "watermark": 3}
+    assert hotels(clean) == [(1, "Fine", 5000), (2, "Palace", 1000)]
+
+
+def test_an_interrupted_run_resumes_after_the_last_committed_chunk(clean, monkeypatch):
+    add_hotels(clean, *[(f"Hotel {i}", 5000, 4.0) for i in range(1, 6)])
+    set_watermark = clean.set_watermark
+    calls = []
+
+    def fail_on_second_chunk(conn, name, last_key):
+        calls.append(last_key)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        set_watermark(conn, name, last_key)
+
+    monkeypatch.setattr(clean, "set_watermark", fail_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        clean.clean_hotels(chunk_size=2)
+    # The failed chunk rolled back with its watermark
+    assert [price for _, _, price in hotels(clean)] == [1000, 1000, 5000, 5000, 5000]
+
+    monkeypatch.setattr(clean, "set_watermark", set_watermark)
+    assert clean.clean_hotels(chunk_size=2) == {"deleted": 0, "clamped": 3, "watermark": 5}
+    assert [price for _, _, price in hotels(clean)] == [1000] * 5
@@ -0,0 +1,89 @@
+# tests/test_crawler.py
+import json
+
+import pytest
+import requests
+
+from utils.crawler import Crawler, CrawlState, HostRateLimiter
+
+
+class FakeSession:
+    """Serves `pages` (url -> list of items); answers 304 when the request's ETag still matches."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        response = requests.Response()
+        response.url = url
+        etag = f'"{len(self.pages[url])}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            response.status_code = 304
+            return response
+        response.status_code = 200
+        response.headers["ETag"] = etag
+        response._content = "\n".join(self.pages[url]).encode("utf-8")
+        return response
+
+
+def parse(text):
+    return [line for line in text.split("\n") if line]
+
+
+def crawler(state, pages):
+    return Crawler(max_workers=2, per_host_interval=0, state=state, session=FakeSession(pages))
+
+
+def test_only_new_items_are_reported_and_304s_skip_parsing(tmp_path):
+    state = CrawlState(str(tmp_path / "state.json"))
+    pages = {"http://a/1": ["good", "bad"]}
+    assert crawler(state, pages).crawl(["http://a/1"], parse)[0].new_items == ["good", "bad"]
+
+    result, = crawler(CrawlState(state.path), pages).crawl(["http://a/1"], parse)
+    assert result.status == "not_modified"
+    pages["http://a/1"].append("new")
+    result, = crawler(CrawlState(state.path), pages).crawl(["http://a/1"], parse)
+    assert result.new_items == ["new"]
+
+
+def test_failed_store_leaves_the_page_pending(tmp_path):
+    path = str(tmp_path / "state.json")
+    pages = {"http://a/1": ["one"], "http://a/2": ["two"]}
+
+    def store(result):
+        if result.url == "http://a/2":
+            raise OSError("database is locked")
+
+    c = crawler(CrawlState(path), pages)
+    c.crawl({"http://a/1": "Tampa", "http://a/2": "Miami"}, parse, on_result=store)
+    assert c.stats["errors"] == 1
+    saved = json.load(open(path))
+    assert saved["pending"] == ["http://a/2"]
+    assert "http://a/2" not in saved["pages"]
+
+    # The next run fetches it again, reports its items as new and still knows its city
+    stored = []
+    crawler(CrawlState(path), pages).crawl([], parse, on_result=lambda r: stored.append((r.label, r.new_items)))
+    assert stored == [("Miami", ["two"])]
+    assert json.load(open(path))["pending"] == []
+
+
+def test_fetch_errors_are_counted(tmp_path):
+    class Broken(FakeSession):
+        def get(self, url, headers=None, timeout=None):
+            raise requests.ConnectionError("down")
+
+    c = Crawler(per_host_interval=0, state=CrawlState(), session=Broken({}))
+    assert c.crawl(["http://a/1"], parse) == []
+    assert c.stats["errors"] == 1
+    assert c.state.pending == ["http://a/1"]
+
+
+def test_rate_limiter_spaces_requests_per_host(clock):
+    limiter = HostRateLimiter(1.0, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        limiter.wait("http://a/x")
+    limiter.wait("http://b/x")
+    assert clock.slept == pytest.approx([1.0, 1.0])
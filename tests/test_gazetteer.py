@@ -0,0 +1,85 @@
+# tests/test_gazetteer.py
+import pytest
+
+from utils.gazetteer import Gazetteer, gazetteer, normalize
+
+CITIES = [
+    {"name": "Portland", "region": "OR", "country": "US", "country_name": "United States", "lat": 45.5152, "lon": -122.6784, "population": 652503},
+    {"name": "Portland", "region": "ME", "country": "US", "country_name": "United States", "lat": 43.6591, "lon": -70.2568, "population": 68408},
+    {"name": "Zürich", "aliases": "Zurich City", "region": "ZH", "country": "CH", "country_name": "Switzerland", "lat": 47.3769, "lon": 8.5417, "population": 421878},
+    {"name": "Washington", "aliases": "Washington DC|Washington D.C.", "region": "DC", "country": "US", "country_name": "United States", "lat": 38.9072, "lon": -77.0369, "population": 689545},
+    {"name": "London", "region": "ENG", "country": "GB", "country_name": "United Kingdom", "lat": 51.5074, "lon": -0.1278, "population": 8982000},
+]
+AIRPORTS = [
+    {"code": "pdx", "name": "Portland International Airport", "country": "US", "lat": 45.5898, "lon": -122.5951},
+    {"code": "PWM", "name": "Portland International Jetport", "country": "US", "lat": 43.6462, "lon": -70.3093},
+    {"code": "ZRH", "name": "Zurich Airport", "country": "CH", "lat": 47.4582, "lon": 8.5555},
+    {"code": "DCA", "name": "Ronald Reagan Washington National Airport", "country": "US", "lat": 38.8512, "lon": -77.0402},
+]
+
+
+@pytest.fixture(scope="module")
+def small():
+    return Gazetteer(CITIES, AIRPORTS)
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize("Zürich") == "zurich"
+    assert normalize("  St. Louis ") == "st louis"
+
+
+def test_lookup_prefers_the_most_populous_match(small):
+    assert small.lookup("portland").region == "OR"
+
+
+@pytest.mark.parametrize("query, region", [("Portland, ME", "ME"), ("Portland, OR, USA", "OR"), ("portland, united states", "OR")])
+def test_lookup_honours_qualifiers(small, query, region):
+    assert small.lookup(query).region == region
+
+
+def test_lookup_rejects_qualifiers_that_do_not_match(small):
+    assert small.lookup("Portland, France") is None
+    assert small.lookup("Atlantis") is None
+
+
+def test_lookup_aliases_accents_and_country_aliases(small):
+    assert small.lookup("Washington, D.C.").name == "Washington"
+    assert small.lookup("Washington DC").name == "Washington"
+    assert small.lookup("Zurich").name == "Zürich"
+    assert small.lookup("London, UK").country == "GB"
+
+
+def test_lookup_airport_codes(small):
+    location = small.lookup("PDX")
+    assert (location.kind, location.code, location.label) == ("airport", "PDX", "Portland International Airport (PDX)")
+
+
+def test_complete_lists_cities_by_population_then_airports(small):
+    assert [(l.kind, l.region or l.code) for l in small.complete("port")] == [
+        ("city", "OR"), ("city", "ME"), ("airport", "PDX"), ("airport", "PWM")]
+    assert [l.name for l in small.complete("port", limit=1)] == ["Portland"]
+    assert small.complete("  ") == []
+
+
+def test_nearest_airport_and_airport_code(small):
+    airport, km = small.nearest_airport(43.66, -70.26)
+    assert airport.code == "PWM"
+    assert km < 10
+    assert small.nearest_airport(0.0, 0.0) is None
+    assert small.airport_code("Portland, ME") == "PWM"
+    assert small.airport_code("ZRH") == "ZRH"
+    assert small.airport_code("Unknown Town", lat=38.9, lon=-77.0) == "DCA"
+    assert small.airport_code("Unknown Town") is None
+
+
+def test_missing_directory_gives_an_empty_gazetteer(tmp_path):
+    empty = Gazetteer.from_directory(str(tmp_path))
+    assert len(empty) == 0
+    assert empty.lookup("Paris") is None
+    assert empty.nearest_airport(48.85, 2.35) is None
+
+
+def test_bundled_gazetteer_resolves_common_destinations():
+    assert gazetteer.lookup("Paris, France").country == "FR"
+    assert gazetteer.lookup("Washington, D.C.").region == "DC"
+    assert gazetteer.airport_code("Miami") == "MIA"
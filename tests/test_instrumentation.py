@@ -0,0 +1,47 @@
+# tests/test_instrumentation.py
+import logging
+import re
+
+from utils.instrumentation import LazyJSON, current_request, debug_sampled, finish_request, span, start_request, timed
+
+
+class Exploding:
+    def __str__(self):
+        raise AssertionError("payload was formatted")
+
+
+def test_spans_accumulate_per_stage_and_finish_detaches():
+    @timed("weather")
+    def fetch_weather():
+        return "sunny"
+
+    start_request("POST /")
+    with span("places"):
+        pass
+    fetch_weather()
+    fetch_weather()
+
+    summary = finish_request(status=200)
+    assert re.fullmatch(r"POST / status=200 total=[\d.]+ms places=[\d.]+ms weather=[\d.]+ms\(x2\)", summary)
+    assert current_request() is None
+    assert finish_request() is None
+    with span("outside a request"):
+        pass
+
+
+def test_lazy_json_truncates_only_when_formatted():
+    payload = LazyJSON({"results": ["x" * 50]}, limit=20)
+    assert str(payload) == '{"results": ["xxxxxx... (67 chars)'
+    assert str(LazyJSON({"ok": True})) == '{"ok": true}'
+
+
+def test_debug_sampled_formats_nothing_when_skipped(caplog):
+    log = logging.getLogger("tests.instrumentation")
+
+    with caplog.at_level(logging.INFO, logger=log.name):
+        debug_sampled(log, "payload %s", Exploding(), rate=1.0)
+    with caplog.at_level(logging.DEBUG, logger=log.name):
+        debug_sampled(log, "payload %s", Exploding(), rate=0.0)
+        debug_sampled(log, "payload %s", LazyJSON([1, 2]), rate=1.0)
+
+    assert [record.getMessage() for record in caplog.records] == ["payload [1, 2]"]
@@ -0,0 +1,50 @@
+# tests/test_intents.py
+import pytest
+
+from chatbot.intents import INTENT_MATCHER
+
+
+@pytest.mark.parametrize("message", [
+    "see you later",
+    "thanks, that looks great",
+    "I'd love to visit again some day",
+    "change of plans, we are tired",
+    "what time is the game?",
+    "cancel that",
+    "",
+])
+def test_chatter_is_not_an_edit(message):
+    assert INTENT_MATCHER.parse(message) is None
+
+
+def test_add_with_day_and_type():
+    intent = INTENT_MATCHER.parse("Please add a museum on day 2")
+    assert (intent.name, intent.day, intent.poi_type) == ("add", 2, "museum")
+
+
+def test_add_to_day_is_the_day_not_a_move():
+    intent = INTENT_MATCHER.parse("squeeze in a beach to day 3")
+    assert (intent.name, intent.day, intent.to_day, intent.poi_type) == ("add", 3, None, "beach")
+
+
+def test_ordinal_and_number_words():
+    assert INTENT_MATCHER.parse("drop the zoo on the second day").day == 2
+    assert INTENT_MATCHER.parse("remove the zoo from day four").day == 4
+
+
+def test_add_needs_only_a_type():
+    intent = INTENT_MATCHER.parse("include some sushi")
+    assert (intent.name, intent.day, intent.poi_type) == ("add", None, "japanese")
+
+
+def test_swap_old_and_new_types():
+    intent = INTENT_MATCHER.parse("replace the museum with a park on day 1")
+    assert (intent.name, intent.day, intent.poi_type, intent.new_type) == ("swap", 1, "museum", "park")
+    intent = INTENT_MATCHER.parse("swap in a park instead of the museum")
+    assert (intent.poi_type, intent.new_type) == ("museum", "park")
+
+
+def test_move_between_days():
+    intent = INTENT_MATCHER.parse("move the beach from day 1 to day 3")
+    assert (intent.name, intent.day, intent.to_day, intent.poi_type) == ("move", 1, 3, "beach")
+    assert INTENT_MATCHER.parse("reschedule day 2 day 5").to_day == 5
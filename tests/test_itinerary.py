@@ -0,0 +1,85 @@
+# tests/test_itinerary.py
+from datetime import datetime
+
+from utils.catalog import Place
+from utils.itinerary import _city_schedule, _format_minutes, build_itinerary
+from utils.poi_index import POIIndex
+
+
+def attraction(name, rating, indoor=False):
+    return {"name": name, "rating": rating, "distance": 1.0 + rating / 10, "lat": 0.0, "long": 0.0,
+            "reviews": [], "is_indoor": indoor}
+
+
+ATTRACTIONS = [attraction("Park", 4.9), attraction("Beach", 4.8), attraction("Museum", 4.5, indoor=True),
+               attraction("Aquarium", 4.4, indoor=True), attraction("Zoo", 4.3), attraction("Gallery", 4.0, indoor=True)]
+
+
+def visited(itinerary):
+    return [[slot.name for slot in day.attractions] for day in itinerary.days]
+
+
+def build(weather):
+    start = datetime(2026, 11, 1)
+    end = datetime(2026, 11, 3)
+    return build_itinerary(["Testville"], start, end, {"Testville": [{"name": "Hotel", "price": 100, "distance": 0}]}, [],
+                           {"Testville": ATTRACTIONS}, {"Testville": []}, {"Testville": weather}, 1000)
+
+
+def test_clear_days_split_the_attractions_in_order():
+    assert visited(build({})) == [["Park", "Beach"], ["Museum", "Aquarium"], ["Zoo", "Gallery"]]
+
+
+def test_rainy_days_never_repeat_an_attraction():
+    days = visited(build({"2026-11-02": "Rain", "2026-11-03": "Rain"}))
+    assert days == [["Park", "Beach"], ["Museum", "Aquarium"], ["Gallery", "Zoo"]]
+    names = [name for day in days for name in day]
+    assert len(names) == len(set(names))
+
+
+def test_pick_skips_used_places():
+    places = [Place("attraction", name, rating, is_indoor=indoor)
+              for name, rating, indoor in (("Park", 4.9, False), ("Museum", 4.5, True), ("Gallery", 4.0, True))]
+    index = POIIndex("Testville", places)
+    used = set()
+    for expected in ("Museum", "Gallery", "Park"):
+        place = index.pick(used, prefer_indoor=True)
+        assert place.name == expected
+        used.add(place)
+    assert index.pick(used) is None
+
+
+def test_city_schedule_gives_the_remainder_to_the_first_cities():
+    city_days, schedule = _city_schedule(["A", "B", "C"], 7)
+    assert city_days == {"A": 3, "B": 2, "C": 2}
+    assert schedule == [("A", 0), ("A", 1), ("A", 2), ("B", 0), ("B", 1), ("C", 0), ("C", 1)]
+
+
+def test_format_minutes_matches_strftime():
+    for minutes in (0, 9 * 60, 12 * 60 + 5, 18 * 60 + 30, 23 * 60 + 59):
+        assert _format_minutes(minutes) == datetime(2026, 11, 1, minutes // 60, minutes % 60).strftime("%I:%M %p")
+
+
+def test_multi_city_trip_with_a_car_renders_each_day():
+    start = datetime(2026, 11, 1)
+    end = datetime(2026, 11, 4)
+    hotels = {city: [{"name": f"{city} Inn", "price": 100, "distance": 0}] for city in ("North", "South")}
+    restaurants = {city: [dict(attraction(f"{city} Bistro & Bar", 4.2))] for city in ("North", "South")}
+    car = {"name": "Compact", "company": "Rent", "price": 200}
+    itinerary = build_itinerary(["North", "South"], start, end, hotels, [car], {"North": ATTRACTIONS, "South": []},
+                                restaurants, {}, 1000, pick_up_time="11:15")
+
+    assert [(day.city, day.car_action) for day in itinerary.days] == [
+        ("North", "pick_up"), ("North", "travel"), ("South", "travel"), ("South", "drop_off")]
+    assert [day.attractions[0].time for day in itinerary.days] == ["11:15 AM", "09:00 AM", "09:00 AM", "09:00 AM"]
+    assert itinerary.days[0].restaurants[0].time == "06:00 PM"
+    assert visited(itinerary)[2] == ["Placeholder Attraction"]
+    assert itinerary.cost_summary == {"hotels": 400, "cars": 200, "food": 200, "total": 800}
+
+    markdown = itinerary.to_markdown()
+    assert markdown.startswith("**Day 2026-11-01 in North**\n")
+    assert "- **Pick up car at 11:15**: Compact from Rent ($200.0)\n" in markdown
+    assert "- **Drop off car at 10:00**: Compact from Rent\n" in markdown
+    html = itinerary.to_html()
+    assert "North Bistro &amp; Bar" in html and "North Bistro & Bar" not in html
+    assert html.endswith("<p>Total Estimated Cost: $800.0</p></div>")
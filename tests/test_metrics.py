@@ -0,0 +1,57 @@
+# tests/test_metrics.py
+import pytest
+
+from utils.metrics import EXTERNAL_CALL_SECONDS, EXTERNAL_CALLS, EXTERNAL_ERRORS, Registry, track_call
+
+
+def test_render_exposition_format():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls made.", ("provider",))
+    calls.inc("google")
+    calls.inc("google", amount=2)
+    calls.inc('we"ird\\name')
+
+    assert registry.render() == (
+        "# HELP calls_total Calls made.\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{provider="google"} 3\n'
+        'calls_total{provider="we\\"ird\\\\name"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[1] == "# TYPE latency_seconds histogram"
+    assert lines[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+    assert latency.count() == 4
+
+
+def test_registering_a_name_twice_returns_the_first_metric():
+    registry = Registry()
+    first = registry.counter("hits_total", "Hits.")
+    assert registry.counter("hits_total", "Hits again.") is first
+    assert registry.render().count("# TYPE hits_total") == 1
+
+
+def test_track_call_counts_calls_errors_and_latency():
+    site = "test_metrics"
+    with track_call("stub", site):
+        pass
+    with pytest.raises(RuntimeError):
+        with track_call("stub", site):
+            raise RuntimeError("boom")
+
+    assert EXTERNAL_CALLS.value("stub", site) == 2
+    assert EXTERNAL_ERRORS.value("stub", site) == 1
+    assert EXTERNAL_CALL_SECONDS.count("stub", site) == 2
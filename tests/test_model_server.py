@@ -0,0 +1,63 @@
+# tests/test_model_server.py
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from vision.model_server import RemoteScorer, ScorerMismatchError, ScoringServer
+from vision.scorers import ImageStatsScorer
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to about 100 bytes, so keep it short
+    directory = tempfile.mkdtemp(prefix="ggp-")
+    yield os.path.join(directory, "scorer.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def server(socket_path):
+    server = ScoringServer(socket_path, ImageStatsScorer(), window_ms=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def photos(count):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (32, 32, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def test_scores_match_the_local_backend(server, socket_path):
+    remote = RemoteScorer(socket_path, timeout=5, backend="stats")
+    images = photos(3)
+    assert remote.name == ImageStatsScorer.name
+    assert remote.score_batch(images) == pytest.approx(ImageStatsScorer().score_batch(images))
+    assert remote.info()["images"] == 3
+
+
+def test_connections_from_other_threads_are_checked_too(server, socket_path):
+    remote = RemoteScorer(socket_path, timeout=5, backend="stats")
+    scores = []
+    thread = threading.Thread(target=lambda: scores.append(remote.score(photos(1)[0])))
+    thread.start()
+    thread.join()
+    assert scores == [pytest.approx(ImageStatsScorer().score(photos(1)[0]))]
+
+
+def test_backend_mismatch_fails_at_startup(server, socket_path):
+    with pytest.raises(ScorerMismatchError, match="image-stats-v1"):
+        RemoteScorer(socket_path, timeout=5, backend="vgg16")
+
+
+def test_missing_server_is_tolerated_until_first_use(socket_path):
+    remote = RemoteScorer(socket_path, timeout=1, backend="stats")
+    assert remote.name == ImageStatsScorer.name
+    with pytest.raises(OSError):
+        remote.score(photos(1)[0])
@@ -0,0 +1,96 @@
+# tests/test_optimizer.py
+import itertools
+import random
+
+import pytest
+
+from utils.catalog import Place
+from utils.optimizer import ATTRACTION_COST_PER_VISIT, PlanOptimizer
+
+
+def utility(place):
+    return place.rating
+
+
+def places(kind, specs):
+    return [Place(kind, f"{kind} {i}", rating, price=price) for i, (rating, price) in enumerate(specs)]
+
+
+def brute_force(optimizer, days, hotels, cars, attractions):
+    """Best score over every hotel/car pair, scored the way the optimizer scores one."""
+    useful = sorted((u for u in map(utility, attractions) if u > 0), reverse=True)
+    best = None
+    for hotel, car in itertools.product(hotels, cars or [None]):
+        fixed = (hotel.price + (car.price if car else 0)) * days
+        split = optimizer._budget_split(fixed, days)
+        if split is None:
+            continue
+        meal_cost, affordable = split
+        visits = min(affordable, 2 * days, len(useful))
+        score, _ = optimizer._score(days, utility(hotel), utility(car) if car else 0.0, sum(useful[:visits]),
+                                    fixed, meal_cost, visits)
+        best = score if best is None else max(best, score)
+    return best
+
+
+def test_pricier_hotel_over_budget_can_win():
+    # $990 leaves $10 for meals and nothing for attractions; $1010 may use the slack
+    under, over = places("hotel", [(4.0, 990), (4.0, 1010)])
+    attractions = places("attraction", [(5.0, 0)] * 4)
+    optimizer = PlanOptimizer(1000, utility)
+    selection = optimizer.optimize(1, [under, over], [], attractions, [])
+    assert selection.hotel is over
+    assert len(selection.attractions) == 2
+    assert selection.utility == pytest.approx(brute_force(optimizer, 1, [under, over], [], attractions))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimize_matches_brute_force(seed):
+    rng = random.Random(seed)
+    hotels = places("hotel", [(rng.uniform(2, 5), rng.uniform(50, 300)) for _ in range(12)])
+    cars = places("car", [(rng.uniform(1, 3), rng.uniform(20, 80)) for _ in range(5)])
+    attractions = places("attraction", [(rng.uniform(-1, 5), 0) for _ in range(10)])
+    optimizer = PlanOptimizer(1500, utility)
+    selection = optimizer.optimize(3, hotels, cars, attractions, [])
+    assert selection.optimal
+    assert selection.utility == pytest.approx(brute_force(optimizer, 3, hotels, cars, attractions))
+    assert selection.cost <= optimizer.max_budget
+    assert all(utility(a) > 0 for a in selection.attractions)
+
+
+def test_optimize_returns_none_when_nothing_fits():
+    hotels = places("hotel", [(5.0, 1000)])
+    assert PlanOptimizer(500, utility).optimize(3, hotels, [], [], []) is None
+
+
+def test_attraction_visits_are_capped_by_budget_and_days():
+    hotels = places("hotel", [(4.0, 100)])
+    attractions = places("attraction", [(5.0, 0)] * 10)
+    # 2 days: $200 hotel, $100 meals, $60 left buys three visits
+    selection = PlanOptimizer(360, utility).optimize(2, hotels, [], attractions, [])
+    assert len(selection.attractions) == 60 // ATTRACTION_COST_PER_VISIT
+    selection = PlanOptimizer(10_000, utility).optimize(2, hotels, [], attractions, [])
+    assert len(selection.attractions) == 4
+
+
+def test_alternatives_form_a_pareto_frontier():
+    rng = random.Random(1)
+    hotels = places("hotel", [(rng.uniform(2, 5), rng.uniform(50, 300)) for _ in range(20)])
+    cars = places("car", [(rng.uniform(1, 3), rng.uniform(20, 80)) for _ in range(4)])
+    attractions = places("attraction", [(rng.uniform(0, 5), 0) for _ in range(12)])
+    restaurants = places("restaurant", [(4.0, 0)] * 5)
+    optimizer = PlanOptimizer(2000, utility)
+    full = optimizer.alternatives([2, 3, 4], hotels, cars, attractions, restaurants, max_alternatives=0)
+    assert len(full) > 2
+    costs = [s.cost for s in full]
+    utilities = [s.utility for s in full]
+    assert costs == sorted(costs)
+    assert all(a < b for a, b in zip(utilities, utilities[1:]))
+    assert all(s.cost <= optimizer.max_budget for s in full)
+
+    thinned = optimizer.alternatives([2, 3, 4], hotels, cars, attractions, restaurants, max_alternatives=2)
+    assert [(s.cost, s.utility) for s in thinned] == [(full[0].cost, full[0].utility), (full[-1].cost, full[-1].utility)]
+
+
+def test_alternatives_empty_without_hotels():
+    assert PlanOptimizer(1000, utility).alternatives([3], [], [], [], []) == []
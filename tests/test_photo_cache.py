@@ -0,0 +1,34 @@
+# tests/test_photo_cache.py
+import os
+
+import numpy as np
+
+from vision.photo_cache import PhotoCache, ScoreStore
+
+
+def test_nothing_is_created_until_first_use(tmp_path):
+    root = tmp_path / "photos"
+    PhotoCache(str(root))
+    ScoreStore(str(root / "scores.sqlite3"))
+    assert not root.exists()
+
+
+def test_photo_cache_round_trip_and_rescan(tmp_path):
+    cache = PhotoCache(str(tmp_path))
+    assert cache.get("ref") is None
+    cache.put("ref", np.ones((4, 4, 3), dtype=np.uint8))
+    reopened = PhotoCache(str(tmp_path))
+    assert len(reopened) == 1
+    assert reopened.get("ref").shape == (4, 4, 3)
+
+
+def test_score_memo_is_bounded_and_backed_by_sqlite(tmp_path):
+    path = str(tmp_path / "scores.sqlite3")
+    store = ScoreStore(path, memo_size=2)
+    for i, ref in enumerate("abc"):
+        store.put(ref, "stats", float(i))
+    assert list(store._scores) == [("b", "stats"), ("c", "stats")]
+    assert store.get("a", "stats") == 0.0
+    assert store.get("a", "other") is None
+    assert os.path.exists(path)
+    assert ScoreStore(path).get("c", "stats") == 2.0
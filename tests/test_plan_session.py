@@ -0,0 +1,116 @@
+# tests/test_plan_session.py
+import pytest
+
+from chatbot.bot import Chatbot
+from utils.catalog import CityCatalog, DaySchedule, LazySchedule, Place, Plan, ScheduleEntry
+from utils.plan_session import PlanEditError, PlanSession, SessionStore
+
+ATTRACTION_TYPES = ("museum", "park", "museum", "zoo", "park", "museum")
+
+
+def make_catalog():
+    places = [Place("hotel", "Hotel", 4.0, price=100.0, lat=40.0, long=-74.0)]
+    # Attraction n is catalog index n; lower indices rank higher
+    places += [Place("attraction", f"Attraction {i}", 5.0 - i / 10, distance=float(i), lat=40.0 + i / 100, long=-74.0,
+                     types=(kind,)) for i, kind in enumerate(ATTRACTION_TYPES, 1)]
+    places += [Place("restaurant", name, 4.5, distance=1.0, lat=40.0, long=-74.01, types=("restaurant", kind))
+               for name, kind in (("Diner", "american_restaurant"), ("Sushi Ko", "japanese_restaurant"),
+                                  ("Trattoria", "italian_restaurant"))]
+    return CityCatalog("Testville", places)
+
+
+def make_plan(catalog, attractions, days=3):
+    """A lazily built plan visiting one of `attractions` (catalog indices) a day."""
+    plan = Plan(days, catalog, 0)
+
+    def cursor():
+        for day in range(days):
+            activities = [ScheduleEntry(catalog, 0, "7:00 PM", "Return to hotel", 0, distance_override=0)]
+            if day < len(attractions):
+                activities.insert(0, ScheduleEntry(catalog, attractions[day], "10:30 AM", "Visit attraction", 10))
+            yield DaySchedule(f"2026-11-0{day + 1}", day + 1, activities, 100 + 10 * (day < len(attractions)))
+
+    plan.schedule = LazySchedule(cursor(), days)
+    plan.reserved = frozenset(attractions)
+    plan.total_cost = days * 100 + 10 * min(days, len(attractions))
+    return plan
+
+
+@pytest.fixture
+def session():
+    catalog = make_catalog()
+    plans = [make_plan(catalog, [1, 2, 3]), make_plan(catalog, [4, 5])]
+    return PlanSession("Testville", 10_000, plans)
+
+
+def test_edits_do_not_build_later_days(session):
+    session.plan.schedule[0]
+    place, days = session.add(1, "park")
+    assert [d.day for d in days] == [1]
+    assert place.name == "Attraction 5"
+    assert session.plan.schedule.built == 1
+
+
+def test_replacements_skip_places_reserved_for_unbuilt_days(session):
+    place, _ = session.add(1, "museum")
+    # Attractions 1 and 3 are better museums, but days 1 and 3 visit them
+    assert place.name == "Attraction 6"
+    with pytest.raises(PlanEditError):
+        session.add(1, "museum")
+
+
+def test_removed_place_can_be_added_again(session):
+    removed, _ = session.remove(1)
+    assert removed.name == "Attraction 1"
+    added, _ = session.add(2, "museum")
+    assert added.name == "Attraction 1"
+
+
+def test_swap_frees_the_old_place(session):
+    (old, new), _ = session.swap(1, "museum", "park")
+    assert (old.name, new.name) == ("Attraction 1", "Attraction 5")
+    assert session.add(3, "museum")[0].name == "Attraction 1"
+
+
+def test_select_edits_another_plan(session):
+    session.select(1)
+    place, days = session.add(1, "museum")
+    assert place.name == "Attraction 1"
+    assert days[0] is session.plans[1].schedule[0]
+    assert session.plans[0].schedule.built == 0
+    with pytest.raises(PlanEditError):
+        session.select(2)
+
+
+def test_over_budget_edit_is_rolled_back(session):
+    session.max_budget = session.plan.total_cost
+    day = session.plan.schedule[0]
+    before = [e.index for e in day.activities]
+    with pytest.raises(PlanEditError):
+        session.add(1)
+    assert [e.index for e in day.activities] == before
+
+
+def test_chat_cuisine_edits_set_the_days_lunch(session):
+    bot = Chatbot()
+    reply, days = bot.respond("add a japanese place on day 2", session)
+    assert reply.startswith("Added Sushi Ko to day 2.")
+    assert [a["name"] for a in days[0]["activities"] if a["activity"] == "Lunch"] == ["Sushi Ko"]
+
+    reply, days = bot.respond("add some pizza on day 2", session)
+    assert reply.startswith("Added Trattoria to day 2.")
+    assert [a["name"] for a in days[0]["activities"] if a["activity"] == "Lunch"] == ["Trattoria"]
+    # The replaced lunch is free again
+    reply, _ = bot.respond("add sushi on day 1", session)
+    assert reply.startswith("Added Sushi Ko to day 1.")
+    reply, _ = bot.respond("add sushi on day 3", session)
+    assert reply == "No other japanese is available in Testville."
+
+
+def test_session_store_expires_idle_sessions(clock, session):
+    store = SessionStore(max_sessions=2, ttl_seconds=60, clock=clock)
+    store.put(session)
+    clock.advance(30)
+    assert store.get(session.id) is session
+    clock.advance(61)
+    assert store.get(session.id) is None
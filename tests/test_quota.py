@@ -0,0 +1,78 @@
+# tests/test_quota.py
+import pytest
+
+from utils.quota import QuotaAccountant, QuotaExceeded, Fidelity, estimated_request_cost, FIDELITY_LEVELS
+
+
+def accountant(clock, per_second=50, per_day=100_000, max_wait=2.0):
+    return QuotaAccountant({"google_places": (per_second, per_day)}, clock=clock, sleep=clock.sleep, max_wait=max_wait)
+
+
+def full_request_cost():
+    _, details, score_images = FIDELITY_LEVELS[0]
+    return estimated_request_cost(Fidelity(details, score_images))
+
+
+def test_back_to_back_requests_are_admitted(clock):
+    quota = accountant(clock)
+    cost = full_request_cost()["google_places"]
+    for _ in range(3):
+        quota.admit({"google_places": cost})
+        for _ in range(cost):
+            quota.acquire("google_places")
+    # Only the calls beyond the 50-call burst waited, each for its share of a second
+    assert sum(clock.slept) == pytest.approx((3 * cost - 50) / 50)
+
+
+def test_acquire_paces_to_the_per_second_limit(clock):
+    quota = accountant(clock, per_second=2)
+    quota.acquire("google_places")
+    quota.acquire("google_places")
+    assert clock.slept == []
+    quota.acquire("google_places")
+    assert clock.slept == [pytest.approx(0.5)]
+
+
+def test_acquire_refuses_when_the_wait_is_too_long(clock):
+    quota = accountant(clock, per_second=1, max_wait=0.5)
+    quota.acquire("google_places")
+    with pytest.raises(QuotaExceeded) as excinfo:
+        quota.acquire("google_places")
+    assert excinfo.value.retry_after == pytest.approx(1.0)
+    assert not quota.try_acquire("google_places")
+
+
+def test_admit_rejects_when_the_daily_quota_is_spent(clock):
+    quota = accountant(clock, per_second=1000, per_day=40)
+    quota.admit({"google_places": 33})
+    for _ in range(33):
+        quota.acquire("google_places")
+    with pytest.raises(QuotaExceeded) as excinfo:
+        quota.admit({"google_places": 33})
+    assert excinfo.value.provider == "google_places"
+    assert excinfo.value.retry_after > 0
+
+
+def test_unknown_providers_are_not_limited(clock):
+    quota = accountant(clock)
+    quota.acquire("someone_else", cost=10_000)
+    quota.admit({"someone_else": 10_000})
+    assert quota.try_acquire("someone_else")
+
+
+def test_fidelity_sheds_as_daily_quota_runs_low_and_recovers(clock):
+    quota = accountant(clock, per_second=10_000, per_day=1000)
+    full = quota.fidelity()
+    assert (full.details_per_search, full.score_images) == FIDELITY_LEVELS[0][1:]
+
+    quota.acquire("google_places", cost=600)  # 40% left
+    shed = quota.fidelity()
+    assert (shed.details_per_search, shed.score_images) == FIDELITY_LEVELS[1][1:]
+
+    quota.acquire("google_places", cost=300)  # 10% left
+    lowest = quota.fidelity()
+    assert (lowest.details_per_search, lowest.score_images) == FIDELITY_LEVELS[2][1:]
+
+    clock.advance(86400)  # a day of refill
+    recovered = quota.fidelity()
+    assert (recovered.details_per_search, recovered.score_images) == FIDELITY_LEVELS[0][1:]
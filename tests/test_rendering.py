@@ -0,0 +1,52 @@
+# tests/test_rendering.py
+import pytest
+from jinja2 import DictLoader, Environment
+
+from utils import rendering
+from utils.catalog import CityCatalog, DaySchedule, Place, Plan, ScheduleEntry
+from utils.rendering import plans_etag, precompile_templates
+
+TEMPLATES = {
+    "index.html": "<form></form>",
+    "results.html": "{% for plan in plans %}{% include '_days.html' %}{% endfor %}",
+    "_days.html": "<p>{{ plan.days }} days</p>",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_digests(monkeypatch):
+    monkeypatch.setattr(rendering, "_template_digests", {})
+
+
+def precompile(**changed):
+    precompile_templates(Environment(loader=DictLoader(dict(TEMPLATES, **changed))))
+
+
+def make_plans():
+    catalog = CityCatalog("Testville", [Place("hotel", "Hotel", 4.0, price=100.0),
+                                         Place("attraction", "Museum", 4.5, distance=1.0)])
+    plan = Plan(1, catalog, 0)
+    plan.schedule = [DaySchedule("2026-11-01", 1, [ScheduleEntry(catalog, 1, "10:30 AM", "Visit attraction", 20)], 120)]
+    plan.total_cost = 120
+    return [plan]
+
+
+def etag(plans):
+    return plans_etag("results.html", "session", "Testville", 1000, plans, 0, 3)
+
+
+def test_etag_is_stable_until_the_plan_changes():
+    precompile()
+    plans = make_plans()
+    first = etag(plans)
+    assert etag(plans) == first
+    plans[0].schedule[0].activities[0].time = "3:00 PM"
+    assert etag(plans) != first
+
+
+def test_etag_changes_with_an_included_template():
+    plans = make_plans()
+    precompile()
+    before = etag(plans)
+    precompile(**{"_days.html": "<p>{{ plan.days }}-day plan</p>"})
+    assert etag(plans) != before
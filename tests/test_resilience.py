@@ -0,0 +1,98 @@
+# tests/test_resilience.py
+import pytest
+import requests
+
+from utils.resilience import (CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, deadline_scope,
+                              remaining_timeout)
+
+
+def fail():
+    raise requests.ConnectionError("provider down")
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+
+    def call():
+        raise requests.HTTPError(f"{status}", response=response)
+    return call
+
+
+def test_deadline_caps_timeouts_and_expires(clock):
+    deadline = Deadline(10, clock=clock)
+    assert deadline.timeout(5) == 5
+    clock.advance(8)
+    assert deadline.timeout(5) == pytest.approx(2)
+    clock.advance(2)
+    assert deadline.expired()
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout(5)
+
+
+def test_remaining_timeout_without_and_with_a_scope():
+    assert remaining_timeout(5) == 5
+    with deadline_scope(1):
+        assert remaining_timeout(5) <= 1
+    assert remaining_timeout(5) == 5
+
+
+def test_circuit_opens_after_threshold_and_fails_fast(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30, clock=clock)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call("key", fail)
+    assert breaker.state == "open"
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call("key", calls.append, 1)
+    assert calls == []
+
+
+def test_half_open_trial_closes_or_reopens(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+    with pytest.raises(requests.ConnectionError):
+        breaker.call("key", fail)
+    clock.advance(30)
+    with pytest.raises(requests.ConnectionError):
+        breaker.call("key", fail)
+    assert breaker.state == "open"
+    clock.advance(30)
+    assert breaker.call("key", lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_only_one_half_open_trial_at_a_time(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.advance(30)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_serves_last_good_result_while_unhealthy(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+    assert breaker.call("key", lambda: {"results": [1]}) == {"results": [1]}
+    assert breaker.call("key", fail) == {"results": [1]}
+    assert breaker.state == "open"
+    assert breaker.call("key", fail) == {"results": [1]}
+    with pytest.raises(CircuitOpenError):
+        breaker.call("other", fail)
+
+
+def test_client_errors_do_not_trip_the_circuit(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, clock=clock)
+    with pytest.raises(requests.HTTPError):
+        breaker.call("key", http_error(404))
+    assert breaker.state == "closed"
+    with pytest.raises(requests.HTTPError):
+        breaker.call("key", http_error(503))
+    assert breaker.state == "open"
+
+
+def test_stale_cache_is_bounded(clock):
+    breaker = CircuitBreaker("test", stale_cache_size=2, clock=clock)
+    for key in "abc":
+        breaker.call(key, lambda: key)
+    assert breaker.stale("a") is None
+    assert breaker.stale("c") == "c"
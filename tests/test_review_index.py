@@ -0,0 +1,45 @@
+# tests/test_review_index.py
+from utils.review_index import ReviewIndex, parse_query
+
+
+def make_index():
+    index = ReviewIndex()
+    index.add("Paris", "hotel:Le Grand", ["Free parking and a lovely pool.", "Staff were rude."])
+    index.add("Paris", "hotel:Petit", ["Parking is free only on weekends.", "Nice pool."])
+    index.add("Lyon", "hotel:Rhone", ["Free parking, no pool."])
+    return index
+
+
+def test_parse_query_keeps_quoted_phrases_together():
+    assert parse_query('"Free parking" pool') == [("free", "parking"), ("pool",)]
+    assert parse_query('unbalanced "quote') == [("unbalanced",), ("quote",)]
+
+
+def test_phrases_match_adjacent_tokens_only():
+    index = make_index()
+
+    assert index.search("paris", '"free parking"') == {"hotel:Le Grand"}
+    assert index.search("Paris", "free parking") == {"hotel:Le Grand", "hotel:Petit"}
+    assert index.search("Paris", '"free parking" pool') == {"hotel:Le Grand"}
+    assert index.search("Paris", "sauna") == set()
+    assert index.search("Berlin", "pool") == set()
+
+
+def test_reindexing_the_same_reviews_is_a_no_op():
+    index = make_index()
+
+    assert index.add("Paris", "hotel:Le Grand", ["Staff were rude.", "", None]) == 0
+    assert index.add("Paris", "hotel:Petit", ["Staff were rude."]) == 1
+    assert index.match_counts("Paris", "rude") == {"hotel:Le Grand": 1, "hotel:Petit": 1}
+
+
+def test_rank_key_boosts_places_whose_reviews_match():
+    index = make_index()
+    places = [{"name": "Le Grand", "rating": 4.0, "distance": 2.0},
+              {"name": "Petit", "rating": 4.5, "distance": 1.0},
+              {"name": "Other", "rating": 4.2, "distance": 0.5}]
+
+    ranked = sorted(places, key=index.rank_key("Paris", "hotel", '"free parking"', weight=1.0))
+    assert [place["name"] for place in ranked] == ["Le Grand", "Petit", "Other"]
+    ranked = sorted(places, key=index.rank_key("Paris", "hotel", ""))
+    assert [place["name"] for place in ranked] == ["Petit", "Other", "Le Grand"]
@@ -0,0 +1,28 @@
+# tests/test_scorers.py
+import numpy as np
+import pytest
+
+from vision.scorers import SCORER_NAMES, ImageStatsScorer, get_scorer
+
+
+def test_stats_scorer_prefers_detailed_well_exposed_photos():
+    rng = np.random.default_rng(0)
+    scorer = ImageStatsScorer()
+    flat_grey = np.full((64, 64, 3), 128, dtype=np.uint8)
+    black = np.zeros((64, 64, 3), dtype=np.uint8)
+    textured = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+    flat_score, black_score, textured_score = scorer.score_batch([flat_grey, black, textured])
+    assert black_score == pytest.approx(0.0)
+    assert flat_score == pytest.approx(0.15, abs=0.01)
+    assert textured_score > flat_score
+    assert 0.0 <= textured_score <= 1.0
+    assert scorer.score(textured) == textured_score
+
+
+def test_get_scorer_builds_the_named_backend():
+    scorer = get_scorer("stats")
+    assert isinstance(scorer, ImageStatsScorer)
+    assert scorer.name == SCORER_NAMES["stats"]
+    with pytest.raises(ValueError, match="Unknown image scorer"):
+        get_scorer("resnet")
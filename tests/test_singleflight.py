@@ -0,0 +1,70 @@
+# tests/test_singleflight.py
+import threading
+import time
+
+import pytest
+
+from utils.singleflight import COALESCED_CALLS, SingleFlight
+
+
+def run_concurrently(flight, key, func, followers):
+    """Start a leader and `followers` callers for `key`; release the leader once they all wait on it."""
+    release = threading.Event()
+    results = []
+
+    def call():
+        try:
+            results.append(flight.do(key, func, release))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(followers + 1)]
+    threads[0].start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while COALESCED_CALLS.value(flight.name) < followers and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test_share")
+    calls = []
+
+    def fetch(release):
+        calls.append(1)
+        release.wait(5)
+        return {"places": 3}
+
+    results = run_concurrently(flight, ("Paris", "attractions"), fetch, followers=4)
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert COALESCED_CALLS.value("test_share") == 4
+    assert flight.in_flight() == 0
+
+
+def test_waiters_get_the_leaders_exception_and_nothing_is_cached():
+    flight = SingleFlight("test_error")
+
+    def fail(release):
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    results = run_concurrently(flight, "key", fail, followers=2)
+    assert len(results) == 3 and all(isinstance(result, RuntimeError) for result in results)
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight("test_keys")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert COALESCED_CALLS.value("test_keys") == 0
+    with pytest.raises(ValueError):
+        flight.do("a", int, "not a number")
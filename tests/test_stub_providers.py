@@ -0,0 +1,58 @@
+# tests/test_stub_providers.py
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+from vision.photo_cache import decode_photo
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+from stub_providers_getgetplaces import StubProviderServer
+
+
+@pytest.fixture
+def stub(tmp_path):
+    (tmp_path / "geocode.json").write_text(json.dumps({"status": "OK", "results": [], "recorded": True}))
+    server = StubProviderServer(latency_ms=0, fixtures_dir=str(tmp_path)).start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def get(stub, path, **params):
+    response = requests.get(f"{stub.url}{path}", params=params, timeout=5)
+    response.raise_for_status()
+    return response
+
+
+def test_synthetic_responses_are_deterministic(stub):
+    search = get(stub, "/maps/api/place/textsearch/json", query="museums in Tampa").json()
+    assert search == get(stub, "/maps/api/place/textsearch/json", query="museums in Tampa").json()
+    assert len(search["results"]) == 20 and search["results"][0]["name"] == "Museum 0"
+    assert abs(search["results"][0]["geometry"]["location"]["lat"] - 27.95) < 0.1
+
+    details = get(stub, "/maps/api/place/details/json", place_id=search["results"][0]["place_id"]).json()
+    assert details["status"] == "OK" and len(details["result"]["reviews"]) == 3
+
+
+def test_recorded_fixtures_replace_synthetic_responses(stub):
+    assert get(stub, "/maps/api/geocode/json", address="Tampa").json()["recorded"] is True
+
+
+def test_photos_decode_and_unknown_paths_404(stub):
+    photo = get(stub, "/maps/api/place/photo", photoreference="abc")
+    assert photo.headers["Content-Type"] == "image/bmp"
+    assert decode_photo(photo.content).shape == (224, 224, 3)
+
+    assert requests.get(f"{stub.url}/nope", timeout=5).status_code == 404
+    assert stub.requests_served == 2
+
+
+def test_environ_points_every_provider_at_the_stub(stub):
+    environ = stub.environ()
+    assert environ["GOOGLE_MAPS_API_BASE"] == f"{stub.url}/maps/api"
+    assert environ["OPENWEATHERMAP_API_BASE"] == f"{stub.url}/data/3.0"
+    assert environ["PRICELINE_API_BASE"] == stub.url
@@ -0,0 +1,73 @@
+# tests/test_travel_time.py
+import numpy as np
+import pytest
+
+from utils.catalog import Place
+from utils.travel_time import SpeedModel, TravelTimeService
+
+BANDS = [(2.0, 15.0), (10.0, 25.0), (30.0, 40.0), (float("inf"), 60.0)]
+
+
+@pytest.fixture
+def model():
+    return SpeedModel(bands=BANDS, detour_factor=1.0, city_profiles={"new york": "dense"},
+                      peak_factor=0.5, night_factor=2.0)
+
+
+def points(count, city_offset=0.0):
+    return [Place("attraction", f"Place {i}", lat=40.0 + city_offset + i / 100, long=-74.0) for i in range(count)]
+
+
+def test_bands_are_driven_piecewise(model):
+    assert model.minutes(2.0) == pytest.approx(8.0)
+    # 2 km at 15 km/h, then 8 km at 25 km/h
+    assert model.minutes(10.0) == pytest.approx(8.0 + 19.2)
+    assert model.minutes(40.0) == pytest.approx(8.0 + 19.2 + 30.0 + 10.0)
+
+
+def test_minutes_never_decrease_with_distance(model):
+    km = np.linspace(0, 100, 10_001)
+    minutes = model.minutes(km)
+    assert np.all(np.diff(minutes) > 0)
+    for limit, _ in BANDS[:-1]:
+        assert model.minutes(limit + 0.01) > model.minutes(limit)
+
+
+def test_city_profile_and_hour_scale_speed(model):
+    base = model.minutes(5.0)
+    assert model.minutes(5.0, city="New York") == pytest.approx(base / 0.75)
+    assert model.minutes(5.0, hour=8) == pytest.approx(base / 0.5)
+    assert model.minutes(5.0, hour=23) == pytest.approx(base / 2.0)
+    assert model.minutes(5.0, hour=12) == pytest.approx(base)
+    assert model.time_factor(None) == 1.0
+
+
+def test_matrix_is_reused_while_it_covers_the_places(model):
+    service = TravelTimeService(model)
+    places = points(5)
+    matrix = service.matrix("Testville", places)
+    assert service.matrix("testville", places[:3]) is matrix
+    grown = service.matrix("Testville", places + points(2, city_offset=1.0))
+    assert grown is not matrix and len(grown) == 7
+    assert grown.between(places[0], places[1]) == pytest.approx(matrix.between(places[0], places[1]))
+
+
+def test_cache_evicts_least_recently_used_cities(model):
+    service = TravelTimeService(model, max_cities=2)
+    for city in ("A", "B", "C"):
+        service.matrix(city, points(3))
+    assert len(service) == 2
+    assert service.total_bytes == sum(m.nbytes for m in service._matrices.values())
+
+
+def test_cache_is_capped_by_size(model):
+    one_city = TravelTimeService(model).matrix("A", points(20)).nbytes
+    service = TravelTimeService(model, max_bytes=int(2.5 * one_city))
+    for city in ("A", "B", "C", "D"):
+        service.matrix(city, points(20))
+    assert len(service) == 2
+    assert service.total_bytes <= service.max_bytes
+    # A matrix bigger than the cap is still served and kept on its own
+    tiny = TravelTimeService(model, max_bytes=1)
+    tiny.matrix("A", points(20))
+    assert len(tiny) == 1
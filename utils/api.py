@@ -3,18 +3,55 @@ import requests
 import os
 from dotenv import load_dotenv
 from geopy.distance import geodesic
+from utils.instrumentation import timed
+from utils.metrics import track_call, record_cache
+from utils.singleflight import SingleFlight
+from utils.resilience import circuit_breaker, remaining_timeout
+from utils.quota import quota_accountant
+from utils.gazetteer import gazetteer
 
 load_dotenv()
 
+# Provider base URLs; overridable so benchmarks can point them at a local stub server
+GOOGLE_MAPS_API_BASE = os.getenv("GOOGLE_MAPS_API_BASE", "https://maps.googleapis.com/maps/api")
+OPENWEATHERMAP_API_BASE = os.getenv("OPENWEATHERMAP_API_BASE", "https://api.openweathermap.org/data/3.0")
+PRICELINE_API_BASE = os.getenv("PRICELINE_API_BASE", "https://priceline-com2.p.rapidapi.com")
+
+provider_flights = SingleFlight("provider")
+
+def _get_json(url, params, headers, timeout, provider, site):
+    quota_accountant.acquire(provider)
+    with track_call(provider, site):
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+def fetch_json(url, params=None, headers=None, timeout=10, provider="unknown", site="unknown"):
+    """
+    GET `url` and decode the JSON body.
+
+    Identical concurrent requests (same URL, params and headers) share one in-flight provider
+    call and its result, so the returned data must be treated as read-only. The timeout is
+    capped by the current request deadline, and each provider sits behind a circuit breaker
+    that serves the last good response (or fails fast) while the provider is unhealthy.
+    """
+    key = (url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+    timeout = remaining_timeout(timeout)
+    return provider_flights.do(key, circuit_breaker(provider).call, key, _get_json, url, params, headers, timeout, provider, site)
+
+@timed("geocode")
 def get_coordinates(destination):
+    # Well-known cities (and airport codes) resolve from the bundled gazetteer without a provider call
+    location = gazetteer.lookup(destination)
+    record_cache("gazetteer", location is not None)
+    if location is not None:
+        return location.lat, location.lon
     api_key = os.getenv("GOOGLE_GEOCODING_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_GEOCODING_API_KEY not set")
-    url = f"https://maps.googleapis.com/maps/api/geocode/json?address={destination}&key={api_key}"
+    url = f"{GOOGLE_MAPS_API_BASE}/geocode/json?address={destination}&key={api_key}"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(url, timeout=10, provider="google_geocoding", site="get_coordinates")
         if data.get("status") == "OK":
             location = data["results"][0]["geometry"]["location"]
             return location["lat"], location["lng"]
@@ -22,10 +59,12 @@ def get_coordinates(destination):
     except requests.exceptions.RequestException as e:
         raise ValueError(f"Geocoding API Error: {e}")
 
-def get_airport_code(destination):
-    # Placeholder for airport code lookup (e.g., using a static map or API)
-    airport_codes = {"Tampa": "TPA", "Orlando": "MCO", "Miami": "MIA"}
-    return airport_codes.get(destination, None)
+def get_airport_code(destination, lat=None, lon=None):
+    """
+    IATA code of the airport nearest `destination` (or to `lat`/`lon` for cities the gazetteer does
+    not know), or None when no airport is within GAZETTEER_AIRPORT_MAX_KM.
+    """
+    return gazetteer.airport_code(destination, lat, lon)
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     return geodesic((lat1, lon1), (lat2, lon2)).km
\ No newline at end of file
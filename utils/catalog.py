@@ -0,0 +1,231 @@
+# utils/catalog.py
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Place:
+    """
+    A hotel, car, attraction or restaurant.
+
+    Records are created once by the fetchers and shared by reference afterwards. Read-only
+    mapping access (`place["rating"]`, `place.get("is_indoor")`) is supported so helpers written
+    against the old place dicts keep working.
+    """
+
+    __slots__ = ("kind", "name", "rating", "distance", "lat", "long", "reviews", "price", "company",
+                 "is_indoor", "image_score", "city", "types")
+
+    def __init__(self, kind, name, rating=0.0, distance=0.0, lat=0.0, long=0.0, reviews=(), price=0.0,
+                 company=None, is_indoor=False, image_score=0.0, city=None, types=()):
+        self.kind = kind
+        self.name = name
+        self.rating = rating
+        self.distance = distance
+        self.lat = lat
+        self.long = long
+        self.reviews = tuple(reviews)
+        self.price = price
+        self.company = company
+        self.is_indoor = is_indoor
+        self.image_score = image_score
+        self.city = city
+        self.types = tuple(types)
+
+    @property
+    def location(self):
+        return f"Coordinates: ({self.lat}, {self.long})"
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"Place({self.kind!r}, {self.name!r}, rating={self.rating}, distance={self.distance:.2f})"
+
+
+class CityCatalog:
+    """
+    Every place fetched for one city in one request, addressed by integer index.
+
+    Plans and schedule entries store indices into the catalog instead of copies of place data.
+    """
+
+    def __init__(self, city, places=()):
+        self.city = city
+        self.places = []
+        self._index = {}
+        self._rankings = {}
+        self._fingerprint = None
+        for place in places:
+            self.add(place)
+
+    @classmethod
+    def from_places(cls, city, *groups):
+        return cls(city, (place for group in groups for place in group))
+
+    def add(self, place):
+        """Add `place` (if not already present) and return its index."""
+        index = self._index.get(id(place))
+        if index is None:
+            index = self._index[id(place)] = len(self.places)
+            self.places.append(place)
+            self._fingerprint = None
+        return index
+
+    def index_of(self, place):
+        return self._index[id(place)]
+
+    def __getitem__(self, index):
+        return self.places[index]
+
+    def __len__(self):
+        return len(self.places)
+
+    def fingerprint(self):
+        """Digest of every place's data; places are not modified once added, so it is computed once."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for place in self.places:
+                digest.update(repr(tuple(getattr(place, field) for field in Place.__slots__)).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def of_kind(self, kind):
+        return [place for place in self.places if place.kind == kind]
+
+    def set_ranking(self, kind, places):
+        """Remember the planner's best-first order for `kind`, so later edits pick replacements the same way."""
+        self._rankings[kind] = [self.index_of(place) for place in places]
+
+    def ranked(self, kind):
+        """Indices of `kind` places best-first (by rating and distance if no ranking was set)."""
+        ranking = self._rankings.get(kind)
+        if ranking is None:
+            ranking = [self._index[id(place)] for place in sorted(self.of_kind(kind), key=lambda p: (-p.rating, p.distance))]
+        return ranking
+
+
+class ScheduleEntry:
+    """One timed activity in a day plan, pointing at a catalog place."""
+
+    __slots__ = ("catalog", "index", "time", "activity", "cost", "weather", "distance_override")
+
+    def __init__(self, catalog, index, time, activity, cost, weather=None, distance_override=None):
+        self.catalog = catalog
+        self.index = index
+        self.time = time
+        self.activity = activity
+        self.cost = cost
+        self.weather = weather
+        self.distance_override = distance_override
+
+    @property
+    def place(self):
+        return self.catalog.places[self.index]
+
+    @property
+    def distance(self):
+        return self.place.distance if self.distance_override is None else self.distance_override
+
+    @property
+    def location(self):
+        return self.place.location
+
+
+class DaySchedule:
+    __slots__ = ("date", "day", "activities", "daily_cost")
+
+    def __init__(self, date, day, activities, daily_cost):
+        self.date = date
+        self.day = day
+        self.activities = activities
+        self.daily_cost = daily_cost
+
+
+class LazySchedule:
+    """
+    A plan's DaySchedules, produced in order by a generator only when a day is first asked for.
+
+    The generator is the plan's cursor: it holds the builder's running state (attractions and
+    restaurants used so far, the next date), so showing the first page of a 30-day plan builds three
+    days, not thirty. Built days are kept because chat edits change them in place. Indexing, slicing,
+    iteration and len() behave like the list of days it replaces; callers must not advance one
+    schedule from two threads at once (PlanSession holds its lock).
+    """
+
+    __slots__ = ("length", "_days", "_cursor")
+
+    def __init__(self, cursor, length):
+        self.length = length
+        self._days = []
+        self._cursor = cursor
+
+    @property
+    def built(self):
+        """Number of days built so far."""
+        return len(self._days)
+
+    def _build_to(self, count):
+        while len(self._days) < count and self._cursor is not None:
+            try:
+                self._days.append(next(self._cursor))
+            except StopIteration:
+                self._cursor = None
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            self._build_to(stop)
+            return self._days[start:stop:step]
+        if key < 0:
+            key += self.length
+        self._build_to(key + 1)
+        return self._days[key]
+
+    def __iter__(self):
+        for i in range(self.length):
+            self._build_to(i + 1)
+            if i >= len(self._days):
+                return
+            yield self._days[i]
+
+
+class Plan:
+    """
+    A plan of `days` days; the hotel and car are catalog indices (car_index is None without a car).
+
+    `schedule` is a list of DaySchedules or a LazySchedule that builds them on demand; `reserved`
+    holds the catalog indices of the attractions and restaurants its days not built yet may use.
+    """
+
+    __slots__ = ("days", "total_cost", "schedule", "catalog", "hotel_index", "car_index", "reserved")
+
+    def __init__(self, days, catalog, hotel_index, car_index=None):
+        self.days = days
+        self.total_cost = 0
+        self.schedule = []
+        self.catalog = catalog
+        self.hotel_index = hotel_index
+        self.car_index = car_index
+        self.reserved = frozenset()
+
+    @property
+    def hotel(self):
+        return self.catalog.places[self.hotel_index]
+
+    @property
+    def car(self):
+        return None if self.car_index is None else self.catalog.places[self.car_index]
@@ -0,0 +1,262 @@
+# utils/city_pack.py
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import date as Date, datetime
+
+import numpy as np
+
+from utils.catalog import Place
+from utils.gazetteer import gazetteer, normalize
+from utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+CITY_PACK_DIR = os.getenv("CITY_PACK_DIR", "city_packs")
+CITY_PACK_MAX_OPEN = int(os.getenv("CITY_PACK_MAX_OPEN", "256"))
+CITY_PACK_SUFFIX = ".ggcp"
+CITY_PACK_MAGIC = b"GGCP"
+CITY_PACK_VERSION = 1
+
+KINDS = ("hotel", "attraction", "restaurant")
+
+# magic, version, reserved, centre lat/lon, built at (unix seconds), place/string/ref counts,
+# forecast start (proleptic ordinal), forecast days, forecast rows
+_HEADER = struct.Struct("<4sHHddqIIIIII")
+_ALIGN = 8
+
+# One fixed-size record per place; strings (name, reviews, types) are ids into the string table
+PLACE_DTYPE = np.dtype([
+    ("kind", "u1"), ("is_indoor", "u1"), ("price_level", "u1"), ("_pad", "u1"),
+    ("reviews_count", "<u2"), ("types_count", "<u2"),
+    ("name", "<u4"), ("reviews_start", "<u4"), ("types_start", "<u4"), ("forecast_row", "<i4"),
+    ("rating", "<f8"), ("distance", "<f8"), ("price", "<f8"), ("image_score", "<f8"),
+    ("lat", "<f8"), ("lon", "<f8"),
+])
+
+
+class CityPackError(ValueError):
+    """Raised for a file that is not a city pack, or one written in another format version."""
+
+
+def pack_key(city):
+    """File stem for `city`: the gazetteer's name for it when known, so "Paris, France" and "paris" share a pack."""
+    location = gazetteer.lookup(city)
+    name = location.name if location is not None and location.kind == "city" else city
+    return normalize(name).replace(" ", "-")
+
+
+def pack_path(city, directory=CITY_PACK_DIR):
+    return os.path.join(directory, pack_key(city) + CITY_PACK_SUFFIX)
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(place_count, string_count, ref_count, forecast_rows, forecast_days):
+    """Byte offsets of each section; they follow from the header counts, so the file stores none."""
+    places = _aligned(_HEADER.size)
+    refs = _aligned(places + place_count * PLACE_DTYPE.itemsize)
+    string_offsets = _aligned(refs + ref_count * 4)
+    forecasts = _aligned(string_offsets + (string_count + 1) * 4)
+    strings = _aligned(forecasts + forecast_rows * forecast_days * 8)
+    return places, refs, string_offsets, forecasts, strings
+
+
+def write_city_pack(path, city, center, places, forecast_start, forecasts, price_levels):
+    """
+    Write `places` (hotels, attractions and restaurants) for `city` as a city pack at `path`.
+
+    `forecasts` maps each hotel name to its nightly prices for consecutive days from
+    `forecast_start` (None where the forecast was unusable) and `price_levels` maps it to the price
+    level the forecast came from. The file is written beside `path` and renamed over it, so a
+    process that maps packs never sees a partial file. Returns the number of bytes written.
+    """
+    strings, string_ids, refs = [], {}, []
+
+    def intern(text):
+        text = str(text or "")
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        return string_ids[text]
+
+    intern(city)
+    places = [p for p in places if p.kind in KINDS]
+    forecast_days = max((len(prices) for prices in forecasts.values()), default=0)
+    forecast_rows = []
+    records = np.zeros(len(places), dtype=PLACE_DTYPE)
+    for row, place in enumerate(places):
+        record = records[row]
+        record["kind"] = KINDS.index(place.kind)
+        record["is_indoor"] = bool(place.is_indoor)
+        record["price_level"] = price_levels.get(place.name, 0)
+        record["name"] = intern(place.name)
+        record["reviews_start"], record["reviews_count"] = len(refs), len(place.reviews)
+        refs.extend(intern(review) for review in place.reviews)
+        record["types_start"], record["types_count"] = len(refs), len(place.types)
+        refs.extend(intern(t) for t in place.types)
+        record["forecast_row"] = -1
+        if place.kind == "hotel" and place.name in forecasts:
+            record["forecast_row"] = len(forecast_rows)
+            prices = [np.nan if price is None else price for price in forecasts[place.name]]
+            forecast_rows.append(prices + [np.nan] * (forecast_days - len(prices)))
+        record["rating"], record["distance"] = place.rating or 0, place.distance or 0
+        record["price"], record["image_score"] = place.price or 0, place.image_score or 0
+        record["lat"], record["lon"] = place.lat or 0, place.long or 0
+
+    blob = b"".join(strings)
+    string_offsets = np.cumsum([0] + [len(s) for s in strings], dtype="<u4")
+    offsets = _layout(len(places), len(strings), len(refs), len(forecast_rows), forecast_days)
+    sections = (records.tobytes(), np.asarray(refs, dtype="<u4").tobytes(), string_offsets.tobytes(),
+                np.asarray(forecast_rows, dtype="<f8").tobytes(), blob)
+    header = _HEADER.pack(CITY_PACK_MAGIC, CITY_PACK_VERSION, 0, float(center[0]), float(center[1]), int(time.time()),
+                          len(places), len(strings), len(refs), forecast_start.toordinal(), forecast_days, len(forecast_rows))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class CityPack:
+    """
+    A memory-mapped city pack.
+
+    Opening one reads only the header; place records, review/type references and price forecasts
+    are numpy views straight onto the mapping, and strings are decoded only for the places a request
+    turns into Place objects. Hotels are filtered by budget on the forecast column before any of
+    them is materialized.
+    """
+
+    __slots__ = ("path", "city", "center", "built_at", "forecast_start", "records", "refs", "string_offsets",
+                 "forecasts", "_mmap", "_strings_at")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise CityPackError(f"{path} is too short to be a city pack")
+        (magic, version, _, lat, lon, built_at, place_count, string_count, ref_count,
+         forecast_start, forecast_days, forecast_rows) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != CITY_PACK_MAGIC:
+            raise CityPackError(f"{path} is not a city pack")
+        if version != CITY_PACK_VERSION:
+            raise CityPackError(f"{path} is city pack version {version}; this build reads version {CITY_PACK_VERSION}")
+        places, refs, string_offsets, forecasts, self._strings_at = _layout(
+            place_count, string_count, ref_count, forecast_rows, forecast_days)
+        self.records = np.frombuffer(self._mmap, PLACE_DTYPE, place_count, places)
+        self.refs = np.frombuffer(self._mmap, "<u4", ref_count, refs)
+        self.string_offsets = np.frombuffer(self._mmap, "<u4", string_count + 1, string_offsets)
+        self.forecasts = np.frombuffer(self._mmap, "<f8", forecast_rows * forecast_days, forecasts).reshape(
+            forecast_rows, forecast_days)
+        self.center = (lat, lon)
+        self.built_at = datetime.fromtimestamp(built_at)
+        self.forecast_start = Date.fromordinal(forecast_start)
+        self.city = self.string(0)
+
+    def __len__(self):
+        return len(self.records)
+
+    def string(self, string_id):
+        start = self._strings_at + int(self.string_offsets[string_id])
+        end = self._strings_at + int(self.string_offsets[string_id + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def _strings(self, start, count):
+        return tuple(self.string(int(i)) for i in self.refs[start:start + count])
+
+    def _place(self, row, city, price=None):
+        record = self.records[row]
+        return Place(KINDS[record["kind"]], self.string(int(record["name"])), float(record["rating"]),
+                     float(record["distance"]), float(record["lat"]), float(record["lon"]),
+                     self._strings(int(record["reviews_start"]), int(record["reviews_count"])),
+                     price=float(record["price"] if price is None else price), is_indoor=bool(record["is_indoor"]),
+                     image_score=float(record["image_score"]), city=city,
+                     types=self._strings(int(record["types_start"]), int(record["types_count"])))
+
+    def places(self, kind, city=None):
+        """Every packed place of `kind` ("attraction" or "restaurant"), in the order they were fetched."""
+        rows = np.flatnonzero(self.records["kind"] == KINDS.index(kind))
+        return [self._place(row, city or self.city) for row in rows]
+
+    def hotels(self, budget, pick_up_date, estimate_price, city=None):
+        """
+        Hotels priced for `pick_up_date` and within `budget`, as fetch_hotels would return them.
+
+        Prices come from the packed forecast; dates outside it (or days the forecast was unusable)
+        are priced live with `estimate_price(name, price_level, date)`.
+        """
+        rows = np.flatnonzero(self.records["kind"] == KINDS.index("hotel"))
+        day = (pick_up_date.date() if isinstance(pick_up_date, datetime) else pick_up_date) - self.forecast_start
+        prices = np.full(len(rows), np.nan)
+        forecast_rows = self.records["forecast_row"][rows]
+        if 0 <= day.days < self.forecasts.shape[1]:
+            packed = forecast_rows >= 0
+            prices[packed] = self.forecasts[forecast_rows[packed], day.days]
+        for i in np.flatnonzero(np.isnan(prices)):
+            record = self.records[rows[i]]
+            price = estimate_price(self.string(int(record["name"])), int(record["price_level"]), pick_up_date)
+            prices[i] = np.nan if price is None else price
+        within = np.flatnonzero(prices <= budget)
+        return [self._place(rows[i], city or self.city, prices[i]) for i in within]
+
+
+class CityPackStore:
+    """
+    City packs in CITY_PACK_DIR, mapped on first use.
+
+    `get` returns None for cities without a readable pack, so callers fetch them live. A pack
+    rebuilt in place is noticed by its changed inode or mtime and mapped again. At most `max_open`
+    packs stay mapped; the least recently used is evicted first.
+    """
+
+    def __init__(self, directory=CITY_PACK_DIR, max_open=CITY_PACK_MAX_OPEN):
+        self.directory = directory
+        self.max_open = max_open
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, city):
+        path = pack_path(city, self.directory)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            record_cache("city_pack", False)
+            return None
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            opened = self._open.get(path)
+            if opened is not None and opened[0] == stamp:
+                self._open.move_to_end(path)
+                record_cache("city_pack", opened[1] is not None)
+                return opened[1]
+        try:
+            pack = CityPack(path)
+            logger.info(f"Mapped city pack for {pack.city} ({len(pack)} places, built {pack.built_at:%Y-%m-%d})")
+        except (OSError, ValueError) as e:
+            # Remembered until the file changes, so a bad pack is reported once and then skipped
+            logger.warning(f"Ignoring city pack {path}: {e}")
+            pack = None
+        with self._lock:
+            # Evicted packs are unmapped when they are garbage collected
+            self._open[path] = (stamp, pack)
+            self._open.move_to_end(path)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+        record_cache("city_pack", pack is not None)
+        return pack
+
+
+city_packs = CityPackStore()
@@ -0,0 +1,202 @@
+# utils/crawler.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class HostRateLimiter:
+    """Enforces a minimum interval between requests to the same host, across worker threads."""
+
+    def __init__(self, min_interval=1.0, clock=time.monotonic, sleep=time.sleep):
+        self.min_interval = min_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            self.sleep(delay)
+
+
+class CrawlState:
+    """
+    Resumable crawl state persisted as JSON.
+
+    Tracks per-URL validators (ETag/Last-Modified) and the content hashes already seen, plus the
+    URLs still pending and the caller's label for each URL (e.g. its city), so an interrupted crawl
+    picks up where it left off.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.pages = {}
+        self.pending = []
+        self.labels = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.pages = data.get("pages", {})
+            self.pending = data.get("pending", [])
+            self.labels = data.get("labels", {})
+
+    def page(self, url):
+        return self.pages.get(url, {})
+
+    def record(self, url, etag, last_modified, hashes):
+        with self._lock:
+            self.pages[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "hashes": sorted(hashes),
+                "fetched_at": datetime.utcnow().isoformat(timespec="seconds"),
+            }
+            if url in self.pending:
+                self.pending.remove(url)
+
+    def mark_done(self, url):
+        with self._lock:
+            if url in self.pending:
+                self.pending.remove(url)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {"pages": self.pages, "pending": self.pending, "labels": self.labels}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class CrawlResult:
+    __slots__ = ("url", "status", "new_items", "items", "label", "etag", "last_modified", "hashes")
+
+    def __init__(self, url, status, new_items=(), items=(), label=None, etag=None, last_modified=None, hashes=()):
+        self.url = url
+        self.status = status
+        self.new_items = list(new_items)
+        self.items = list(items)
+        self.label = label
+        self.etag = etag
+        self.last_modified = last_modified
+        self.hashes = set(hashes)
+
+
+class Crawler:
+    """
+    Bounded-concurrency page crawler with per-host politeness and conditional re-fetch.
+
+    `parse` turns a response body into a list of item strings (e.g. review texts). Only items
+    whose content hash has not been seen on that page before are reported as new, so callers
+    can skip rewriting unchanged reviews.
+    """
+
+    def __init__(self, max_workers=4, per_host_interval=1.0, state=None, session=None, timeout=10, headers=None):
+        self.max_workers = max_workers
+        self.rate_limiter = HostRateLimiter(per_host_interval)
+        self.state = state or CrawlState()
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.headers = headers or {"User-Agent": "Mozilla/5.0"}
+        self.stats = {"pages": 0, "not_modified": 0, "errors": 0, "new_items": 0, "seconds": 0.0}
+
+    def _fetch(self, url, parse):
+        previous = self.state.page(url)
+        headers = dict(self.headers)
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        self.rate_limiter.wait(url)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        label = self.state.labels.get(url)
+        if response.status_code == 304:
+            return CrawlResult(url, "not_modified", label=label)
+        response.raise_for_status()
+
+        items = parse(response.text)
+        seen = set(previous.get("hashes", []))
+        hashes = {content_hash(item) for item in items}
+        new_items = [item for item in items if content_hash(item) not in seen]
+        return CrawlResult(url, "fetched", new_items, items, label,
+                           response.headers.get("ETag"), response.headers.get("Last-Modified"), hashes)
+
+    def _complete(self, result):
+        """Mark a page handled; only called once `on_result` has stored it."""
+        if result.status == "not_modified":
+            self.state.mark_done(result.url)
+        else:
+            self.state.record(result.url, result.etag, result.last_modified, result.hashes)
+        self.state.save()
+
+    def crawl(self, urls, parse, on_result=None):
+        """
+        Crawl `urls` (plus any pending URLs from a previous run) and return the CrawlResults.
+
+        `urls` may be a dict mapping each URL to a label (e.g. its city), which is kept in the
+        state and handed back as `CrawlResult.label`, also for URLs resumed from a previous run.
+        `on_result` is called from the calling thread for each successful result, which keeps
+        database writes off the worker threads. A page is marked done, and the state saved, only
+        after `on_result` returns; if it raises, the page stays pending for the next run.
+        """
+        if isinstance(urls, dict):
+            self.state.labels.update(urls)
+        queue = list(dict.fromkeys(list(self.state.pending) + list(urls)))
+        self.state.pending = list(queue)
+        self.state.save()
+
+        started = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._fetch, url, parse): url for url in queue}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    result = future.result()
+                except requests.RequestException as e:
+                    logger.error(f"Error crawling {url}: {e}")
+                    self.stats["errors"] += 1
+                    continue
+                if on_result:
+                    try:
+                        on_result(result)
+                    except Exception as e:
+                        logger.error(f"Error storing {url}; it stays pending: {e}")
+                        self.stats["errors"] += 1
+                        continue
+                self._complete(result)
+                self.stats["pages"] += 1
+                if result.status == "not_modified":
+                    self.stats["not_modified"] += 1
+                self.stats["new_items"] += len(result.new_items)
+                results.append(result)
+
+        self.stats["seconds"] = time.perf_counter() - started
+        return results
+
+    def pages_per_second(self):
+        return self.stats["pages"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
@@ -1,6 +1,8 @@
 # utils/distance.py
 import math
 
+from utils.travel_time import speed_model
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     R = 6371  # Earth's radius in kilometers
     phi1 = math.radians(lat1)
@@ -13,5 +15,12 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     distance = R * c
     return distance
 
-def estimate_travel_time(distance_km, speed_kmh=30):
-    return (distance_km / speed_kmh) * 60
\ No newline at end of file
+def estimate_travel_time(distance_km, speed_kmh=None, city=None, hour=None):
+    """
+    Minutes to cover a straight-line `distance_km`: at a constant `speed_kmh` when given, else from the
+    travel-time speed model (distance band, `city` profile, departure `hour`). To time many legs in
+    one city, ask utils.travel_time.travel_time_service for the city's matrix instead.
+    """
+    if speed_kmh is not None:
+        return (distance_km / speed_kmh) * 60
+    return speed_model.minutes(distance_km, city, hour)
\ No newline at end of file
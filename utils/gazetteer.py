@@ -0,0 +1,315 @@
+# utils/gazetteer.py
+import csv
+import logging
+import math
+import os
+import re
+import unicodedata
+from array import array
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_DIR = os.getenv("GAZETTEER_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+GAZETTEER_AIRPORT_MAX_KM = float(os.getenv("GAZETTEER_AIRPORT_MAX_KM", "80"))
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX = 25
+EARTH_RADIUS_KM = 6371
+
+CITY, AIRPORT = 0, 1
+KIND_NAMES = ("city", "airport")
+# Qualifiers people type after a city name that are neither a region nor an ISO country code
+COUNTRY_ALIASES = {"usa": "US", "united states of america": "US", "america": "US", "uk": "GB", "england": "GB",
+                   "scotland": "GB", "great britain": "GB", "uae": "AE", "holland": "NL", "czechia": "CZ"}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase and strip accents and punctuation: "Zürich" -> "zurich", "St. Louis" -> "st louis"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(_NON_ALNUM.sub(" ", text).split())
+
+
+class Location:
+    """A city or airport from the gazetteer; built on demand from the gazetteer's columns."""
+
+    __slots__ = ("kind", "name", "code", "region", "country", "country_name", "lat", "lon", "population")
+
+    def __init__(self, kind, name, code, region, country, country_name, lat, lon, population):
+        self.kind = kind
+        self.name = name
+        self.code = code
+        self.region = region
+        self.country = country
+        self.country_name = country_name
+        self.lat = lat
+        self.lon = lon
+        self.population = population
+
+    @property
+    def label(self):
+        if self.kind == "airport":
+            return f"{self.name} ({self.code})"
+        return ", ".join(part for part in (self.name, self.region if self.country == "US" else None, self.country_name) if part)
+
+    def to_dict(self):
+        return {"kind": self.kind, "name": self.name, "label": self.label, "code": self.code,
+                "country": self.country, "lat": self.lat, "lon": self.lon}
+
+    def __repr__(self):
+        return f"Location({self.kind!r}, {self.name!r}, code={self.code!r}, country={self.country!r})"
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = []
+        self.top = ()
+
+
+class PrefixTrie:
+    """
+    Character trie from normalized names to location ids.
+
+    After `finalize`, every node holds the best `limit` ids found anywhere below it, so completing
+    a prefix is a walk of len(prefix) nodes with no search of the subtree.
+    """
+
+    def __init__(self, limit=AUTOCOMPLETE_MAX):
+        self.root = _TrieNode()
+        self.limit = limit
+
+    def insert(self, key, location_id):
+        node = self.root
+        for ch in key:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+        if location_id not in node.ids:
+            node.ids.append(location_id)
+
+    def _find(self, key):
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def finalize(self, rank):
+        """Precompute each node's best ids; `rank[id]` orders ids, lower is better."""
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            candidates = set(node.ids)
+            for child in node.children.values():
+                candidates.update(child.top)
+            node.top = tuple(sorted(candidates, key=rank.__getitem__)[:self.limit])
+
+    def exact(self, key):
+        node = self._find(key)
+        return node.ids if node is not None else []
+
+    def complete(self, prefix):
+        node = self._find(prefix)
+        return node.top if node is not None else ()
+
+
+class NearestIndex:
+    """
+    Static k-d tree for nearest-point queries on the sphere.
+
+    Points are stored as 3-D unit vectors in flat arrays and the tree is implicit in a permutation
+    array (each subrange's median is its root), so it costs a few machine words per point. Chord
+    distance between unit vectors grows with great-circle distance, so the nearest by chord is the
+    nearest on the Earth's surface, including across the antimeridian.
+    """
+
+    def __init__(self, ids, lats, lons):
+        self.ids = array("l", ids)
+        self.x, self.y, self.z = array("d"), array("d"), array("d")
+        for lat, lon in zip(lats, lons):
+            phi, lam = math.radians(lat), math.radians(lon)
+            self.x.append(math.cos(phi) * math.cos(lam))
+            self.y.append(math.cos(phi) * math.sin(lam))
+            self.z.append(math.sin(phi))
+        self._axes = (self.x, self.y, self.z)
+        self.order = array("l", range(len(self.ids)))
+        self._build(0, len(self.order), 0)
+
+    def _build(self, lo, hi, depth):
+        if hi - lo <= 1:
+            return
+        axis = self._axes[depth % 3]
+        self.order[lo:hi] = array("l", sorted(self.order[lo:hi], key=axis.__getitem__))
+        mid = (lo + hi) // 2
+        self._build(lo, mid, depth + 1)
+        self._build(mid + 1, hi, depth + 1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, lat, lon):
+        """Return (id, distance in km) of the point nearest to (lat, lon), or None if the index is empty."""
+        if not self.ids:
+            return None
+        phi, lam = math.radians(lat), math.radians(lon)
+        query = (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+        x, y, z, order, axes = self.x, self.y, self.z, self.order, self._axes
+        best = [float("inf"), -1]
+
+        def search(lo, hi, depth):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            point = order[mid]
+            d = (x[point] - query[0]) ** 2 + (y[point] - query[1]) ** 2 + (z[point] - query[2]) ** 2
+            if d < best[0]:
+                best[0], best[1] = d, point
+            diff = query[depth % 3] - axes[depth % 3][point]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            search(near[0], near[1], depth + 1)
+            if diff * diff < best[0]:
+                search(far[0], far[1], depth + 1)
+
+        search(0, len(order), 0)
+        chord = math.sqrt(best[0])
+        return self.ids[best[1]], 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class Gazetteer:
+    """
+    Offline index of cities and airports.
+
+    Locations live in parallel column arrays indexed by id; lookups go through a prefix trie of
+    normalized names, aliases and airport codes, and nearest-airport queries through a k-d tree.
+    Location objects are only created for results.
+    """
+
+    def __init__(self, cities=(), airports=()):
+        self.kinds = array("b")
+        self.names, self.codes, self.regions, self.countries, self.country_names = [], [], [], [], []
+        self.lats, self.lons = array("d"), array("d")
+        self.populations = array("q")
+        self.trie = PrefixTrie()
+        country_names = {}
+
+        for row in cities:
+            location_id = self._add(CITY, row["name"], None, row.get("region") or None, row["country"],
+                                    row.get("country_name") or None, row["lat"], row["lon"], row.get("population") or 0)
+            country_names[row["country"]] = row.get("country_name")
+            for key in [row["name"]] + [alias for alias in (row.get("aliases") or "").split("|") if alias]:
+                self.trie.insert(normalize(key), location_id)
+        airport_ids = []
+        for row in airports:
+            location_id = self._add(AIRPORT, row["name"], row["code"].upper(), None, row["country"],
+                                    country_names.get(row["country"]), row["lat"], row["lon"], 0)
+            airport_ids.append(location_id)
+            self.trie.insert(normalize(row["code"]), location_id)
+            self.trie.insert(normalize(row["name"]), location_id)
+
+        # Cities before airports, bigger cities first
+        ranked = sorted(range(len(self.names)), key=lambda i: (self.kinds[i], -self.populations[i], self.names[i]))
+        rank = [0] * len(ranked)
+        for position, location_id in enumerate(ranked):
+            rank[location_id] = position
+        self.trie.finalize(rank)
+        self.airports = NearestIndex(airport_ids, [self.lats[i] for i in airport_ids], [self.lons[i] for i in airport_ids])
+        self._country_by_name = {normalize(name): code for code, name in country_names.items() if name}
+        self._country_by_name.update(COUNTRY_ALIASES)
+
+    @classmethod
+    def from_directory(cls, path=GAZETTEER_DIR):
+        """Load cities.csv and airports.csv from `path`; a missing directory gives an empty gazetteer."""
+        try:
+            with open(os.path.join(path, "cities.csv"), newline="", encoding="utf-8") as f:
+                cities = list(csv.DictReader(f))
+            with open(os.path.join(path, "airports.csv"), newline="", encoding="utf-8") as f:
+                airports = list(csv.DictReader(f))
+        except OSError as e:
+            logger.warning(f"Gazetteer data unavailable in {path}: {e}")
+            return cls()
+        gazetteer = cls(cities, airports)
+        logger.info(f"Loaded gazetteer with {len(cities)} cities and {len(airports)} airports from {path}")
+        return gazetteer
+
+    def _add(self, kind, name, code, region, country, country_name, lat, lon, population):
+        self.kinds.append(kind)
+        self.names.append(name)
+        self.codes.append(code)
+        self.regions.append(region)
+        self.countries.append(country)
+        self.country_names.append(country_name)
+        self.lats.append(float(lat))
+        self.lons.append(float(lon))
+        self.populations.append(int(population))
+        return len(self.names) - 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def location(self, location_id):
+        return Location(KIND_NAMES[self.kinds[location_id]], self.names[location_id], self.codes[location_id],
+                        self.regions[location_id], self.countries[location_id], self.country_names[location_id],
+                        self.lats[location_id], self.lons[location_id], self.populations[location_id])
+
+    def _qualifies(self, location_id, qualifier):
+        region, country = self.regions[location_id], self.countries[location_id]
+        compact = qualifier.replace(" ", "")  # "D.C." normalizes to "d c"
+        return (compact == country.lower() or (region and compact == region.lower())
+                or self._country_by_name.get(qualifier) == country)
+
+    def lookup(self, query):
+        """
+        Resolve "Miami", "Paris, France", "Portland, OR" or an airport code like "MIA" to a Location.
+
+        Qualifiers after commas must each match the place's region, country code or country name;
+        among several matches the most populous city wins. Returns None when nothing matches, so
+        callers can fall back to a live geocoder.
+        """
+        name, *qualifiers = [normalize(part) for part in query.split(",")]
+        qualifiers = [q for q in qualifiers if q]
+        ids = [i for i in self.trie.exact(name) if all(self._qualifies(i, q) for q in qualifiers)]
+        if not ids:
+            return None
+        return self.location(min(ids, key=lambda i: (self.kinds[i], -self.populations[i])))
+
+    def complete(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Best cities (by population) and then airports whose name, alias or code starts with `prefix`."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        return [self.location(i) for i in self.trie.complete(key)[:limit]]
+
+    def nearest_airport(self, lat, lon, max_km=GAZETTEER_AIRPORT_MAX_KM):
+        """Return (airport Location, distance in km) nearest to (lat, lon), or None if none is within `max_km`."""
+        found = self.airports.nearest(lat, lon)
+        if found is None or found[1] > max_km:
+            return None
+        return self.location(found[0]), found[1]
+
+    def airport_code(self, destination, lat=None, lon=None, max_km=GAZETTEER_AIRPORT_MAX_KM):
+        """
+        IATA code of the airport serving `destination`: the code itself if it is one, else the airport
+        nearest the city (or to `lat`/`lon` when the city is not in the gazetteer).
+        """
+        location = self.lookup(destination)
+        if location is not None:
+            if location.kind == "airport":
+                return location.code
+            lat, lon = location.lat, location.lon
+        if lat is None or lon is None:
+            return None
+        found = self.nearest_airport(lat, lon, max_km)
+        return found[0].code if found else None
+
+
+gazetteer = Gazetteer.from_directory()
@@ -0,0 +1,128 @@
+# utils/instrumentation.py
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEBUG_SAMPLE_RATE = float(os.getenv("DEBUG_LOG_SAMPLE_RATE", "0.1"))
+PAYLOAD_LOG_LIMIT = int(os.getenv("DEBUG_LOG_PAYLOAD_LIMIT", "2000"))
+
+_local = threading.local()
+
+
+def configure_logging():
+    """Configure root logging from LOG_LEVEL (default INFO) instead of forcing DEBUG everywhere."""
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=[logging.StreamHandler()])
+    logging.getLogger().setLevel(level)
+
+
+class LazyJSON:
+    """Defers serialising (and truncating) a payload until a log record is actually emitted."""
+
+    __slots__ = ("payload", "limit")
+
+    def __init__(self, payload, limit=PAYLOAD_LOG_LIMIT):
+        self.payload = payload
+        self.limit = limit
+
+    def __str__(self):
+        try:
+            text = json.dumps(self.payload, default=str)
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}... ({len(text)} chars)"
+        return text
+
+
+def debug_sampled(log, msg, *args, rate=None):
+    """
+    Emit a debug record for only a fraction of calls.
+
+    Nothing is formatted unless DEBUG is enabled for `log` and the call is sampled, so large
+    payload dumps cost nothing when debug output is off.
+    """
+    if not log.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= (DEBUG_SAMPLE_RATE if rate is None else rate):
+        return
+    log.debug(msg, *args)
+
+
+class RequestTimings:
+    """Per-request accumulator of stage durations (seconds) and call counts."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counts = {}
+
+    def add(self, stage, elapsed):
+        self.stages[stage] = self.stages.get(stage, 0.0) + elapsed
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def summary(self, status=None):
+        parts = [f"{self.name}"]
+        if status is not None:
+            parts.append(f"status={status}")
+        parts.append(f"total={self.total() * 1000:.1f}ms")
+        for stage, elapsed in self.stages.items():
+            count = self.counts[stage]
+            suffix = f"(x{count})" if count > 1 else ""
+            parts.append(f"{stage}={elapsed * 1000:.1f}ms{suffix}")
+        return " ".join(parts)
+
+
+def start_request(name):
+    """Attach a fresh RequestTimings to the current thread and return it."""
+    timings = RequestTimings(name)
+    _local.timings = timings
+    return timings
+
+
+def current_request():
+    return getattr(_local, "timings", None)
+
+
+def finish_request(status=None):
+    """Detach the current RequestTimings and return its one-line summary (or None)."""
+    timings = getattr(_local, "timings", None)
+    if timings is None:
+        return None
+    _local.timings = None
+    return timings.summary(status)
+
+
+@contextmanager
+def span(stage):
+    """Time a stage and add it to the current request's timings, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = getattr(_local, "timings", None)
+        if timings is not None:
+            timings.add(stage, time.perf_counter() - started)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,122 +1,307 @@
 # utils/itinerary.py
 from datetime import datetime, timedelta
-from utils.distance import estimate_travel_time
-from utils.api import get_coordinates
+from html import escape
+from utils.poi_index import build_poi_indexes
+from utils.travel_time import place_key, travel_time_service
 import logging
 
 logger = logging.getLogger(__name__)
 
-def generate_itinerary(destinations, pick_up_date, drop_off_date, hotels_by_city, cars, attractions_by_city, restaurants_by_city, weather_by_city, budget, pick_up_time="10:00", drop_off_time="10:00"):
-    itinerary = []
-    cost_summary = {"hotels": 0, "cars": 0, "food": 0, "total": 0}
+FOOD_COST_PER_DAY = 50
+SLOT_MINUTES = 90
+DAY_START = "09:00"
+DINNER_START = "18:00"
 
-    num_days = (drop_off_date - pick_up_date).days + 1
+PLACEHOLDER_HOTEL = {"name": "Placeholder Hotel", "price": 100}
+PLACEHOLDER_ATTRACTION = {"name": "Placeholder Attraction", "rating": 4.0, "distance": 1.0, "reviews": ["Default review"]}
+PLACEHOLDER_RESTAURANT = {"name": "Placeholder Restaurant", "rating": 4.0, "distance": 1.0, "reviews": ["Default review"]}
+
+
+def _parse_minutes(time_str):
+    """Convert an "HH:MM" string to minutes past midnight."""
+    parsed = datetime.strptime(time_str, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+def _format_minutes(minutes):
+    """Format minutes past midnight the same way strftime("%I:%M %p") does."""
+    minutes = int(minutes) % (24 * 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour % 12) or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+class ItinerarySlot:
+    """A single timed stop (attraction or restaurant) within a day."""
+
+    __slots__ = ("time", "name", "rating", "distance", "travel_minutes", "reviews")
+
+    def __init__(self, time, name, rating, distance, travel_minutes, reviews):
+        self.time = time
+        self.name = name
+        self.rating = rating
+        self.distance = distance
+        self.travel_minutes = travel_minutes
+        self.reviews = reviews
+
+
+class ItineraryDay:
+    """One calendar day of the itinerary, including the city, stay and slots."""
+
+    __slots__ = ("date", "city", "weather", "hotel", "car_action", "car", "attractions", "restaurants")
+
+    def __init__(self, date, city, weather, hotel, car_action, car, attractions, restaurants):
+        self.date = date
+        self.city = city
+        self.weather = weather
+        self.hotel = hotel
+        self.car_action = car_action
+        self.car = car
+        self.attractions = attractions
+        self.restaurants = restaurants
+
+
+class Itinerary:
+    """Structured day/slot itinerary that renders to markdown or HTML in a single join."""
+
+    def __init__(self, days, cost_summary, pick_up_time="10:00", drop_off_time="10:00"):
+        self.days = days
+        self.cost_summary = cost_summary
+        self.pick_up_time = pick_up_time
+        self.drop_off_time = drop_off_time
+
+    def _car_markdown(self, day):
+        car = day.car
+        if day.car_action == "pick_up":
+            return f"- **Pick up car at {self.pick_up_time}**: {car['name']} from {car['company']} (${car['price']:.1f})\n"
+        if day.car_action == "drop_off":
+            return f"- **Drop off car at {self.drop_off_time}**: {car['name']} from {car['company']}\n"
+        return f"- **Travel with**: {car['name']} from {car['company']} (${car['price']:.1f})\n"
+
+    @staticmethod
+    def _slots_markdown(parts, heading, slots):
+        parts.append(heading)
+        for slot in slots:
+            parts.append(f"  - {slot.time} - {slot.name} (Rating: {slot.rating}, Distance: {slot.distance:.1f} km, Travel: ~{slot.travel_minutes:.0f} min)\n")
+            for review in slot.reviews:
+                parts.append(f"    - Review: {review[:50]}...\n")
+
+    def to_markdown(self):
+        parts = []
+        for index, day in enumerate(self.days):
+            if index:
+                parts.append("\n")
+            parts.append(f"**Day {day.date.strftime('%Y-%m-%d')} in {day.city}**\n")
+            parts.append(f"- **Weather Forecast**: {day.weather}\n")
+            parts.append(f"- **Stay at**: {day.hotel['name']} (${day.hotel['price']:.1f})\n")
+            if day.car_action:
+                parts.append(self._car_markdown(day))
+            self._slots_markdown(parts, "- **Attractions to Visit:**\n", day.attractions)
+            self._slots_markdown(parts, "- **Restaurants to Dine at:**\n", day.restaurants)
+        return "".join(parts)
+
+    def cost_summary_markdown(self):
+        cost_summary = self.cost_summary
+        return (
+            "**Cost Summary:**\n"
+            f"- Hotels: ${cost_summary['hotels']:.1f}\n"
+            f"- Car Rental: ${cost_summary['cars']:.1f}\n"
+            f"- Estimated Food: ${cost_summary['food']:.1f}\n"
+            f"- **Total Estimated Cost**: ${cost_summary['total']:.1f}\n"
+        )
+
+    @staticmethod
+    def _slots_html(parts, heading, slots):
+        parts.append(f"<h4>{heading}</h4><ul>")
+        for slot in slots:
+            parts.append(
+                f"<li>{slot.time} - {escape(str(slot.name))} (Rating: {slot.rating}, "
+                f"Distance: {slot.distance:.1f} km, Travel: ~{slot.travel_minutes:.0f} min)"
+            )
+            if slot.reviews:
+                parts.append("<ul>")
+                for review in slot.reviews:
+                    parts.append(f"<li>{escape(review[:50])}...</li>")
+                parts.append("</ul>")
+            parts.append("</li>")
+        parts.append("</ul>")
+
+    def to_html(self):
+        parts = []
+        for day in self.days:
+            parts.append(f'<div class="day"><h3>Day {day.date.strftime("%Y-%m-%d")} in {escape(str(day.city))}</h3>')
+            parts.append(f"<p><strong>Weather Forecast:</strong> {escape(str(day.weather))}</p>")
+            parts.append(f"<p><strong>Stay at:</strong> {escape(str(day.hotel['name']))} (${day.hotel['price']:.1f})</p>")
+            if day.car_action:
+                parts.append(f"<p>{escape(self._car_markdown(day)[2:].strip()).replace('**', '')}</p>")
+            self._slots_html(parts, "Attractions to Visit", day.attractions)
+            self._slots_html(parts, "Restaurants to Dine at", day.restaurants)
+            parts.append("</div>")
+        cost_summary = self.cost_summary
+        parts.append(
+            '<div class="total-cost">'
+            f"<p>Hotels: ${cost_summary['hotels']:.1f}</p>"
+            f"<p>Car Rental: ${cost_summary['cars']:.1f}</p>"
+            f"<p>Estimated Food: ${cost_summary['food']:.1f}</p>"
+            f"<p>Total Estimated Cost: ${cost_summary['total']:.1f}</p>"
+            "</div>"
+        )
+        return "".join(parts)
+
+
+def _city_schedule(destinations, num_days):
+    """
+    Precompute, once per trip, which city each day belongs to and its offset within that city.
+
+    Returns:
+        tuple: (city_days, schedule) where city_days maps city -> days allotted and schedule is a
+        list of (city, day_in_city) indexed by day of the trip.
+    """
     num_cities = len(destinations)
     days_per_city = max(1, num_days // num_cities)
     remaining_days = num_days % num_cities
 
-    current_date = pick_up_date
     city_days = {}
     for city in destinations:
         days = days_per_city + (1 if remaining_days > 0 else 0)
         city_days[city] = days
         remaining_days -= 1 if remaining_days > 0 else 0
 
-    food_cost_per_day = 50
-    cost_summary["food"] = food_cost_per_day * num_days
+    schedule = []
+    for city in city_days:
+        schedule.extend((city, offset) for offset in range(city_days[city]))
+        if len(schedule) >= num_days:
+            break
+    del schedule[num_days:]
+    return city_days, schedule
+
+
+def _build_slots(places, start_minutes, travel, origin_row):
+    """Time `places` in order, each leg read from the city's matrix at the hour it starts."""
+    slots = []
+    minutes = start_minutes
+    current = origin_row
+    for place, row in zip(places, travel.rows(places)):
+        travel_time = travel.minutes(current, row, minutes // 60)
+        slots.append(ItinerarySlot(_format_minutes(minutes), place["name"], place["rating"], place["distance"], travel_time, place["reviews"]))
+        minutes += SLOT_MINUTES + travel_time
+        current = row
+    return slots
+
+
+def _take(candidates, used, count):
+    """The first `count` of `candidates` whose place_key is not in `used`, which records them."""
+    taken = []
+    for place in candidates:
+        if len(taken) == count:
+            break
+        key = place_key(place)
+        if key not in used:
+            used.add(key)
+            taken.append(place)
+    return taken
+
+
+def _city_travel_times(city, hotel, attractions, restaurants, poi_index):
+    """One travel-time matrix request covering every place the itinerary may visit in `city`."""
+    places = [hotel, PLACEHOLDER_ATTRACTION, PLACEHOLDER_RESTAURANT] + list(attractions) + list(restaurants)
+    if poi_index is not None:
+        places += poi_index.ranked(prefer_indoor=True)
+    return travel_time_service.matrix(city, places)
+
+
+def build_itinerary(destinations, pick_up_date, drop_off_date, hotels_by_city, cars, attractions_by_city, restaurants_by_city, weather_by_city, budget, pick_up_time="10:00", drop_off_time="10:00", poi_index_by_city=None):
+    """
+    Build a structured itinerary for a multi-city trip.
+
+    Day-to-city offsets and time-of-day anchors are computed once up front, so the cost of
+    building the itinerary is linear in the number of days and slots. Rainy days are re-planned
+    from `poi_index_by_city` (built from `attractions_by_city` when not supplied) without any
+    provider calls; no attraction is visited twice in one city, whatever the weather. Travel times come from one matrix request per city; each day's stops are timed
+    as a route from the hotel, at the hour each leg starts.
+
+    Returns:
+        Itinerary: The day/slot model; call to_markdown() or to_html() to render it.
+    """
+    cost_summary = {"hotels": 0, "cars": 0, "food": 0, "total": 0}
+
+    num_days = (drop_off_date - pick_up_date).days + 1
+    city_days, schedule = _city_schedule(destinations, num_days)
+    if poi_index_by_city is None:
+        poi_index_by_city = build_poi_indexes(attractions_by_city)
+
+    cost_summary["food"] = FOOD_COST_PER_DAY * num_days
 
     car = cars[0] if cars else {"name": "No car recommended", "price": 0}
     cost_summary["cars"] = car["price"] if cars else 0
+    has_car = car["name"] != "No car recommended"
+
+    pick_up_minutes = _parse_minutes(pick_up_time)
+    day_start_minutes = _parse_minutes(DAY_START)
+    dinner_minutes = _parse_minutes(DINNER_START)
 
-    while current_date <= drop_off_date:
-        days_passed = (current_date - pick_up_date).days
-        city_days_cumulative = 0
-        current_city = destinations[0]
-        for i, city in enumerate(destinations):
-            city_days_cumulative += city_days[city]
-            if days_passed < city_days_cumulative:
-                current_city = city
-                break
+    travel_by_city = {}
+    used_by_city = {}
+    days = []
+    for days_passed, (current_city, days_in_city) in enumerate(schedule):
+        current_date = pick_up_date + timedelta(days=days_passed)
 
         hotels = hotels_by_city.get(current_city, [])
         attractions = attractions_by_city.get(current_city, [])
         restaurants = restaurants_by_city.get(current_city, [])
-        hotel = hotels[0] if hotels else {"name": "Placeholder Hotel", "price": 100}
+        hotel = hotels[0] if hotels else PLACEHOLDER_HOTEL
         weather = weather_by_city.get(current_city, {}).get(current_date.strftime("%Y-%m-%d"), "Clear")
 
         # Use placeholder cost if hotel price is 0
         cost_summary["hotels"] += hotel["price"] if hotel["price"] > 0 else 100
 
-        is_rainy = "Rain" in weather
-        if is_rainy:
-            try:
-                central_lat, central_lon = get_coordinates(current_city)
-            except ValueError as e:
-                logger.error(f"Failed to fetch coordinates for {current_city} during itinerary generation: {e}")
-                central_lat, central_lon = (0, 0)
-            hotel_coords = (hotels[0]["geometry"]["location"]["lat"] if hotels and "geometry" in hotels[0] else central_lat,
-                           hotels[0]["geometry"]["location"]["lng"] if hotels and "geometry" in hotels[0] else central_lon) if hotels else (central_lat, central_lon)
-            attractions = recommend_attractions(current_city, pick_up_date, drop_off_date, hotel_coords[0], hotel_coords[1], prefer_indoor=True)
-
-        day_itinerary = f"**Day {current_date.strftime('%Y-%m-%d')} in {current_city}**\n"
-        day_itinerary += f"- **Weather Forecast**: {weather}\n"
-        day_itinerary += f"- **Stay at**: {hotel['name']} (${hotel['price']:.1f})\n"
-        if car and car["name"] != "No car recommended":
-            if current_date == pick_up_date:
-                day_itinerary += f"- **Pick up car at {pick_up_time}**: {car['name']} from {car['company']} (${car['price']:.1f})\n"
+        travel = travel_by_city.get(current_city)
+        if travel is None:
+            travel = travel_by_city[current_city] = _city_travel_times(
+                current_city, hotel, attractions, restaurants, poi_index_by_city.get(current_city))
+        hotel_row = travel.rows([hotel])[0]
+
+        car_action = None
+        if has_car:
+            if days_passed == 0:
+                car_action = "pick_up"
             elif current_date == drop_off_date:
-                day_itinerary += f"- **Drop off car at {drop_off_time}**: {car['name']} from {car['company']}\n"
+                car_action = "drop_off"
             else:
-                day_itinerary += f"- **Travel with**: {car['name']} from {car['company']} (${car['price']:.1f})\n"
+                car_action = "travel"
 
         total_attractions = len(attractions)
         total_restaurants = len(restaurants)
         attractions_per_day = max(1, total_attractions // city_days[current_city]) if total_attractions > 0 else 1
         restaurants_per_day = max(1, total_restaurants // city_days[current_city]) if total_restaurants > 0 else 1
 
-        days_in_city = (current_date - pick_up_date).days - sum(city_days[c] for c, d in city_days.items() if destinations.index(c) < destinations.index(current_city))
-        attraction_start = days_in_city * attractions_per_day
         restaurant_start = days_in_city * restaurants_per_day
 
+        # Rainy days draw from the city's indoor-first ranking from the prebuilt index; either way
+        # attractions already visited in this city are skipped
+        candidates = attractions
+        if "Rain" in weather and current_city in poi_index_by_city:
+            candidates = poi_index_by_city[current_city].ranked(prefer_indoor=True)
+        used = used_by_city.setdefault(current_city, set())
+
         # Ensure at least one attraction and restaurant per day
-        day_attractions = attractions[attraction_start:attraction_start + attractions_per_day]
-        if not day_attractions:
-            day_attractions = [{"name": "Placeholder Attraction", "rating": 4.0, "distance": 1.0, "reviews": ["Default review"]}]
-
-        day_itinerary += "- **Attractions to Visit:**\n"
-        start_time = datetime.strptime(pick_up_time if current_date == pick_up_date else "09:00", "%H:%M")
-        for attr in day_attractions:
-            travel_time = estimate_travel_time(attr["distance"])
-            time_str = start_time.strftime("%I:%M %p")
-            day_itinerary += f"  - {time_str} - {attr['name']} (Rating: {attr['rating']}, Distance: {attr['distance']:.1f} km, Travel: ~{travel_time:.0f} min)\n"
-            for review in attr['reviews']:
-                day_itinerary += f"    - Review: {review[:50]}...\n"
-            start_time += timedelta(hours=1.5) + timedelta(minutes=travel_time)
-
-        day_restaurants = restaurants[restaurant_start:restaurant_start + restaurants_per_day]
-        if not day_restaurants:
-            day_restaurants = [{"name": "Placeholder Restaurant", "rating": 4.0, "distance": 1.0, "reviews": ["Default review"]}]
-
-        day_itinerary += "- **Restaurants to Dine at:**\n"
-        start_time = datetime.strptime("18:00", "%H:%M")
-        for rest in day_restaurants:
-            travel_time = estimate_travel_time(rest["distance"])
-            time_str = start_time.strftime("%I:%M %p")
-            day_itinerary += f"  - {time_str} - {rest['name']} (Rating: {rest['rating']}, Distance: {rest['distance']:.1f} km, Travel: ~{travel_time:.0f} min)\n"
-            for review in rest['reviews']:
-                day_itinerary += f"    - Review: {review[:50]}...\n"
-            start_time += timedelta(hours=1.5) + timedelta(minutes=travel_time)
-
-        itinerary.append(day_itinerary)
-        current_date += timedelta(days=1)
+        day_attractions = _take(candidates, used, attractions_per_day) or [PLACEHOLDER_ATTRACTION]
+        day_restaurants = restaurants[restaurant_start:restaurant_start + restaurants_per_day] or [PLACEHOLDER_RESTAURANT]
+
+        days.append(ItineraryDay(
+            current_date,
+            current_city,
+            weather,
+            hotel,
+            car_action,
+            car,
+            _build_slots(day_attractions, pick_up_minutes if days_passed == 0 else day_start_minutes, travel, hotel_row),
+            _build_slots(day_restaurants, dinner_minutes, travel, hotel_row),
+        ))
 
     cost_summary["total"] = cost_summary["hotels"] + cost_summary["cars"] + cost_summary["food"]
-    cost_summary_str = (
-        "**Cost Summary:**\n"
-        f"- Hotels: ${cost_summary['hotels']:.1f}\n"
-        f"- Car Rental: ${cost_summary['cars']:.1f}\n"
-        f"- Estimated Food: ${cost_summary['food']:.1f}\n"
-        f"- **Total Estimated Cost**: ${cost_summary['total']:.1f}\n"
-    )
-
-    return "\n".join(itinerary), cost_summary_str
\ No newline at end of file
+    return Itinerary(days, cost_summary, pick_up_time, drop_off_time)
+
+
+def generate_itinerary(destinations, pick_up_date, drop_off_date, hotels_by_city, cars, attractions_by_city, restaurants_by_city, weather_by_city, budget, pick_up_time="10:00", drop_off_time="10:00", poi_index_by_city=None):
+    itinerary = build_itinerary(destinations, pick_up_date, drop_off_date, hotels_by_city, cars, attractions_by_city, restaurants_by_city, weather_by_city, budget, pick_up_time, drop_off_time, poi_index_by_city)
+    return itinerary.to_markdown(), itinerary.cost_summary_markdown()
@@ -0,0 +1,240 @@
+# utils/optimizer.py
+import logging
+import os
+import time
+
+import numpy as np
+
+from utils.distance import estimate_travel_time
+
+logger = logging.getLogger(__name__)
+
+PLAN_OPTIMIZER_TIME_CAP_MS = float(os.getenv("PLAN_OPTIMIZER_TIME_CAP_MS", "50"))
+MEAL_COST_PER_DAY = 50
+ATTRACTION_COST_PER_VISIT = 20
+ATTRACTIONS_PER_DAY = 2
+BUDGET_SLACK = 0.2
+KEYWORD_MATCH_WEIGHT = 1.0
+PREFERENCE_WEIGHT = 0.5
+IMAGE_SCORE_WEIGHT = 1.0
+TRAVEL_HOUR_WEIGHT = 1.0
+MAX_ALTERNATIVES = int(os.getenv("PLAN_MAX_ALTERNATIVES", "5"))
+
+
+def place_utility(place, keyword_matches=None, preference=None, travel_minutes=None):
+    """
+    Utility of including `place` in a plan.
+
+    Rating, plus review keyword matches ({"kind:name": clauses matched}), the recommendation
+    model's predicted preference and the photo score, minus the hours needed to get there
+    (`travel_minutes`, normally read from the city's travel-time matrix; estimated from the place's
+    distance when not given).
+    """
+    value = place.rating
+    if keyword_matches:
+        value += KEYWORD_MATCH_WEIGHT * keyword_matches.get(f"{place.kind}:{place.name}", 0)
+    if preference is not None:
+        value += PREFERENCE_WEIGHT * preference
+    value += IMAGE_SCORE_WEIGHT * (place.image_score or 0)
+    if travel_minutes is None:
+        travel_minutes = estimate_travel_time(place.distance or 0)
+    return value - TRAVEL_HOUR_WEIGHT * travel_minutes / 60
+
+
+class PlanSelection:
+    """The hotel, car, attractions and restaurants chosen for one plan length, with its cost and utility."""
+
+    __slots__ = ("days", "hotel", "car", "attractions", "restaurants", "meal_cost", "cost", "utility", "optimal")
+
+    def __init__(self, days, hotel, car, attractions, restaurants, meal_cost, cost, utility, optimal):
+        self.days = days
+        self.hotel = hotel
+        self.car = car
+        self.attractions = attractions
+        self.restaurants = restaurants
+        self.meal_cost = meal_cost
+        self.cost = cost
+        self.utility = utility
+        self.optimal = optimal
+
+
+def _by_utility(options):
+    """
+    (utility, place) options best first, cheaper first among equals.
+
+    Nothing is dropped on price: a hotel just over budget may use the slack while a cheaper one
+    just under it may not, so the pricier option can leave more for attractions.
+    """
+    return sorted(options, key=lambda t: (-t[0], t[1].price))
+
+
+class PlanOptimizer:
+    """
+    Chooses hotel, car, attractions and restaurants together to maximise total utility.
+
+    Costs follow generate_plans: hotel and car are charged per day, meals $50/day (or half of what
+    is left when that does not fit), attractions $20 per visit with at most two per day. The plan
+    may use the 20% slack over `budget` only when the hotel and car alone exceed it, and every
+    dollar over budget costs `overspend_penalty` utility.
+
+    Once a hotel and car are fixed the best attractions are simply the highest-utility ones that
+    fit, so the search is a branch-and-bound over (hotel, car) pairs using prefix sums of sorted
+    attraction utilities. Hotels and cars are explored best-first and pruned with an optimistic
+    bound; if `time_cap_ms` runs out the best plan found so far (seeded with the old greedy choice)
+    is returned and marked as not proven optimal.
+    """
+
+    def __init__(self, budget, utility, slack=BUDGET_SLACK, overspend_penalty=None, time_cap_ms=PLAN_OPTIMIZER_TIME_CAP_MS,
+                 clock=time.perf_counter):
+        self.budget = budget
+        self.max_budget = budget * (1 + slack)
+        self.utility = utility
+        # By default, spending the whole slack costs about as much as one good attraction is worth
+        self.overspend_penalty = overspend_penalty if overspend_penalty is not None else 4.0 / max(budget * slack, 1)
+        self.time_cap = time_cap_ms / 1000
+        self.clock = clock
+
+    def _ranked(self, places):
+        """Places by utility, best first (stable for ties)."""
+        return [p for _, _, p in sorted(((self.utility(p), i, p) for i, p in enumerate(places)), key=lambda t: (-t[0], t[1]))]
+
+    def _useful_attractions(self, attractions):
+        """Attractions that add utility, best first, and the prefix sums of their utilities."""
+        useful = [(u, a) for u, a in ((self.utility(a), a) for a in self._ranked(attractions)) if u > 0]
+        prefix = [0.0]
+        for u, _ in useful:
+            prefix.append(prefix[-1] + u)
+        return useful, prefix
+
+    def _budget_split(self, fixed_cost, days):
+        """Return (meal cost, affordable attraction visits) for a plan whose hotel+car cost `fixed_cost`, or None."""
+        remaining = self.budget - fixed_cost
+        if remaining < 0:
+            if fixed_cost > self.max_budget:
+                return None
+            remaining = self.max_budget - fixed_cost
+        meal_cost = MEAL_COST_PER_DAY * days
+        if meal_cost > remaining:
+            meal_cost = remaining * 0.5
+        remaining -= meal_cost
+        return meal_cost, max(0, int(remaining // ATTRACTION_COST_PER_VISIT))
+
+    def _score(self, days, hotel_utility, car_utility, attraction_value, fixed_cost, meal_cost, visits):
+        cost = fixed_cost + meal_cost + visits * ATTRACTION_COST_PER_VISIT
+        overspend = max(0.0, cost - self.budget)
+        return days * (hotel_utility + car_utility) + attraction_value - self.overspend_penalty * overspend, cost
+
+    def optimize(self, days, hotels, cars, attractions, restaurants, greedy=None):
+        """
+        Return the best PlanSelection for a `days`-day plan, or None if no hotel/car fits the budget.
+
+        `greedy` may be a (hotel, car) pair used as the starting incumbent.
+        """
+        started = self.clock()
+        useful, prefix = self._useful_attractions(attractions)
+        max_visits = ATTRACTIONS_PER_DAY * days
+        best_attraction_value = prefix[min(max_visits, len(useful))]
+        chosen_restaurants = self._ranked(restaurants)[:days]
+
+        hotel_options = _by_utility((self.utility(h), h) for h in hotels)
+        car_options = _by_utility((self.utility(c), c) for c in cars) or [(0.0, None)]
+        best_car_utility = car_options[0][0]
+
+        best = None  # (score, cost, hotel, car, visits, meal_cost)
+
+        def consider(hotel_utility, hotel, car_utility, car):
+            nonlocal best
+            fixed_cost = (hotel.price + (car.price if car else 0)) * days
+            split = self._budget_split(fixed_cost, days)
+            if split is None:
+                return
+            meal_cost, affordable = split
+            visits = min(affordable, max_visits, len(useful))
+            score, cost = self._score(days, hotel_utility, car_utility, prefix[visits], fixed_cost, meal_cost, visits)
+            if best is None or score > best[0] or (score == best[0] and cost < best[1]):
+                best = (score, cost, hotel, car, visits, meal_cost)
+
+        if greedy is not None and greedy[0] is not None:
+            hotel, car = greedy
+            consider(self.utility(hotel), hotel, self.utility(car) if car else 0.0, car)
+
+        explored = 0
+        complete = True
+        for hotel_utility, hotel in hotel_options:
+            if best is not None and days * (hotel_utility + best_car_utility) + best_attraction_value <= best[0]:
+                break  # hotels are sorted by utility, so no later hotel can do better
+            for car_utility, car in car_options:
+                if best is not None and days * (hotel_utility + car_utility) + best_attraction_value <= best[0]:
+                    break
+                consider(hotel_utility, hotel, car_utility, car)
+                explored += 1
+                if explored % 256 == 0 and self.clock() - started > self.time_cap:
+                    complete = False
+                    break
+            if not complete:
+                logger.warning(f"Plan optimizer hit its {self.time_cap * 1000:.0f}ms cap after {explored} hotel/car pairs; using best so far")
+                break
+
+        if best is None:
+            return None
+        score, cost, hotel, car, visits, meal_cost = best
+        chosen_attractions = [a for _, a in useful[:visits]]
+        logger.debug("Optimized %s-day plan: hotel=%s car=%s attractions=%d utility=%.2f cost=%.2f (%d pairs, %.1fms)",
+                     days, hotel.name, car.name if car else None, visits, score, cost, explored, (self.clock() - started) * 1000)
+        return PlanSelection(days, hotel, car, chosen_attractions, chosen_restaurants, meal_cost, cost, score, complete)
+
+    def alternatives(self, lengths, hotels, cars, attractions, restaurants, max_alternatives=MAX_ALTERNATIVES):
+        """
+        Score every (trip length, hotel, car) combination in one vectorized pass and return the
+        Pareto-optimal PlanSelections over (cost, utility), cheapest first.
+
+        Unlike `optimize`, cost is an objective rather than a penalty, so the frontier runs from the
+        cheapest feasible plan to the best one the slack allows. Long frontiers are thinned to
+        `max_alternatives` evenly spaced points, always keeping both ends.
+        """
+        if not hotels or not lengths:
+            return []
+        useful, prefix = self._useful_attractions(attractions)
+        ranked_restaurants = self._ranked(restaurants)
+        restaurant_prefix = np.concatenate(([0.0], np.cumsum([self.utility(r) for r in ranked_restaurants])))
+        car_options = list(cars) or [None]
+
+        days = np.asarray(lengths, dtype=float)[:, None, None]
+        hotel_utility = np.array([self.utility(h) for h in hotels])[None, :, None]
+        hotel_price = np.array([h.price for h in hotels], dtype=float)[None, :, None]
+        car_utility = np.array([self.utility(c) if c else 0.0 for c in car_options])[None, None, :]
+        car_price = np.array([c.price if c else 0.0 for c in car_options], dtype=float)[None, None, :]
+
+        # Same budget rules as _budget_split, over the whole (length, hotel, car) grid
+        fixed = days * (hotel_price + car_price)
+        feasible = fixed <= self.max_budget
+        remaining = np.where(fixed <= self.budget, self.budget - fixed, self.max_budget - fixed)
+        meals = np.broadcast_to(MEAL_COST_PER_DAY * days, fixed.shape)
+        meals = np.where(meals > remaining, remaining * 0.5, meals)
+        visits = np.clip(np.floor((remaining - meals) / ATTRACTION_COST_PER_VISIT), 0, None)
+        visits = np.minimum(visits, np.minimum(ATTRACTIONS_PER_DAY * days, len(useful))).astype(int)
+        lunches = np.minimum(days, len(ranked_restaurants)).astype(int)
+        utility = days * (hotel_utility + car_utility) + np.asarray(prefix)[visits] + restaurant_prefix[lunches]
+        cost = fixed + meals + visits * ATTRACTION_COST_PER_VISIT
+
+        candidates = np.flatnonzero(feasible)
+        if not candidates.size:
+            return []
+        flat_cost, flat_utility = cost.ravel()[candidates], utility.ravel()[candidates]
+        order = np.lexsort((-flat_utility, flat_cost))
+        sorted_utility = flat_utility[order]
+        best_before = np.concatenate(([-np.inf], np.maximum.accumulate(sorted_utility)[:-1]))
+        frontier = candidates[order[sorted_utility > best_before]]
+        if max_alternatives and len(frontier) > max_alternatives:
+            frontier = frontier[np.unique(np.linspace(0, len(frontier) - 1, max_alternatives).round().astype(int))]
+
+        selections = []
+        for flat in frontier:
+            li, hi, ci = np.unravel_index(flat, fixed.shape)
+            length = int(lengths[li])
+            selections.append(PlanSelection(
+                length, hotels[hi], car_options[ci], [a for _, a in useful[:visits.flat[flat]]],
+                ranked_restaurants[:length], float(meals.flat[flat]), float(cost.flat[flat]), float(utility.flat[flat]), True))
+        logger.debug("Pareto frontier: %d of %d feasible plans (%d lengths x %d hotels x %d cars)",
+                     len(selections), candidates.size, len(lengths), len(hotels), len(car_options))
+        return selections
@@ -0,0 +1,305 @@
+# utils/plan_session.py
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from utils.catalog import ScheduleEntry
+from utils.metrics import REGISTRY, record_cache
+from utils.optimizer import ATTRACTION_COST_PER_VISIT, BUDGET_SLACK, MEAL_COST_PER_DAY
+from utils.travel_time import travel_time_service
+
+logger = logging.getLogger(__name__)
+
+PLAN_SESSION_MAX = int(os.getenv("PLAN_SESSION_MAX", "1000"))
+PLAN_SESSION_TTL_SECONDS = float(os.getenv("PLAN_SESSION_TTL_SECONDS", "1800"))
+
+MORNING_SLOT = "10:30 AM"
+LUNCH_SLOT = "1:00 PM"
+AFTERNOON_SLOTS = ("3:00 PM", "4:30 PM", "6:00 PM")
+MAX_VISITS_PER_DAY = 1 + len(AFTERNOON_SLOTS)
+INDOOR_WORDS = {"indoor", "indoors", "inside"}
+OUTDOOR_WORDS = {"outdoor", "outdoors", "outside"}
+MEAL_WORDS = {"lunch", "meal", "food", "restaurant", "restaurants"}
+
+ACTIVE_SESSIONS = REGISTRY.gauge("getgetplaces_plan_sessions", "Plan sessions currently held for chat edits.")
+
+
+class PlanEditError(ValueError):
+    """Raised when a chat edit cannot be applied (bad day, nothing matching, over budget)."""
+
+
+def matches(place, poi_type):
+    """True if `place` fits a POI type such as "museum", "park", "italian" or "indoor"."""
+    if not poi_type:
+        return True
+    poi_type = poi_type.lower()
+    if poi_type in MEAL_WORDS:
+        return place.kind == "restaurant"
+    if poi_type in INDOOR_WORDS:
+        return bool(place.is_indoor)
+    if poi_type in OUTDOOR_WORDS:
+        return not place.is_indoor
+    singular = poi_type[:-1] if poi_type.endswith("s") else poi_type
+    return any(singular in t for t in place.types) or singular in place.name.lower()
+
+
+class PlanSession:
+    """
+    A generated set of plans kept server-side so chat edits can change them in place.
+
+    The catalog fetched for the request stays with the plans, so edits never call providers; each
+    edit re-costs and re-routes only the days it touches. Edits apply to plan `active`, which the
+    caller selects with `select`.
+    """
+
+    def __init__(self, destination, budget, plans):
+        self.id = secrets.token_urlsafe(16)
+        self.destination = destination
+        self.budget = budget
+        self.max_budget = budget * (1 + BUDGET_SLACK)
+        self.plans = plans
+        self.active = 0
+        self.lock = threading.Lock()
+        # Last RenderedPage of these plans, reused until an edit changes their ETag
+        self.rendered = None
+        self._travel = None
+        # Per plan: catalog indices on its built days or reserved for the rest, kept up to date by edits
+        self._used_places = {}
+
+    @property
+    def plan(self):
+        return self.plans[self.active]
+
+    def select(self, plan_number):
+        """Make plan `plan_number` (0-based, in display order) the one edits apply to."""
+        if not 0 <= plan_number < len(self.plans):
+            raise PlanEditError(f"There are {len(self.plans)} plan(s); there is no plan {plan_number + 1}.")
+        self.active = plan_number
+
+    @property
+    def catalog(self):
+        return self.plan.catalog
+
+    def _day(self, day):
+        if day is None:
+            day = 1
+        if not 1 <= day <= len(self.plan.schedule):
+            raise PlanEditError(f"This plan has {len(self.plan.schedule)} day(s); there is no day {day}.")
+        return self.plan.schedule[day - 1]
+
+    def _used(self):
+        """
+        Catalog indices the active plan already uses. Days not built yet are covered by the plan's
+        reserved places rather than built, so a replacement never repeats a place later in the trip.
+        """
+        used = self._used_places.get(self.active)
+        if used is None:
+            schedule = self.plan.schedule
+            built = schedule[:getattr(schedule, "built", len(schedule))]
+            used = set(self.plan.reserved)
+            used.update(entry.index for day in built for entry in day.activities)
+            self._used_places[self.active] = used
+        return used
+
+    def _find(self, day_schedule, kind, poi_type):
+        for entry in day_schedule.activities:
+            if entry.place.kind == kind and matches(entry.place, poi_type):
+                return entry
+        return None
+
+    def _best_unused(self, kind, poi_type, prefer_indoor=False):
+        used = self._used()
+        candidates = [i for i in self.catalog.ranked(kind) if i not in used and matches(self.catalog[i], poi_type)]
+        if prefer_indoor:
+            candidates.sort(key=lambda i: not self.catalog[i].is_indoor)
+        return candidates[0] if candidates else None
+
+    def _travel_times(self):
+        """The city's travel-time matrix and the matrix row of each catalog index, fetched once per catalog."""
+        catalog = self.catalog
+        if self._travel is None or self._travel[0] is not catalog:
+            matrix = travel_time_service.matrix(self.destination, catalog.places)
+            self._travel = (catalog, matrix, matrix.rows(catalog.places))
+        return self._travel[1], self._travel[2]
+
+    def _weather(self, day_schedule):
+        return next((entry.weather for entry in day_schedule.activities if entry.weather), None)
+
+    def _relayout(self, day_schedule):
+        """Re-route a day's visits (nearest by travel time, from the hotel), re-time them and re-cost the day."""
+        plan = self.plan
+        hotel = plan.hotel
+        car = [e for e in day_schedule.activities if e.activity == "Pick up car"]
+        lunch = [e for e in day_schedule.activities if e.activity == "Lunch"]
+        back = [e for e in day_schedule.activities if e.activity == "Return to hotel"]
+        visits = [e for e in day_schedule.activities if e.activity == "Visit attraction"]
+
+        travel, rows = self._travel_times()
+        route, current = [], rows[plan.hotel_index]
+        while visits:
+            nearest = min(visits, key=lambda e: travel.base_minutes[current, rows[e.index]])
+            visits.remove(nearest)
+            route.append(nearest)
+            current = rows[nearest.index]
+        for entry, slot in zip(route, (MORNING_SLOT,) + AFTERNOON_SLOTS):
+            entry.time = slot
+
+        day_schedule.activities = car + route[:1] + lunch + route[1:] + back
+        old_cost = day_schedule.daily_cost
+        day_schedule.daily_cost = hotel.price + sum(entry.cost for entry in day_schedule.activities)
+        # Adjust by the difference so days not built yet stay unbuilt
+        plan.total_cost += day_schedule.daily_cost - old_cost
+
+    def _commit(self, days, undo):
+        """Re-lay out the touched days; roll back if the plan no longer fits the budget."""
+        for day_schedule in days:
+            self._relayout(day_schedule)
+        if self.plan.total_cost > self.max_budget:
+            undo()
+            for day_schedule in days:
+                self._relayout(day_schedule)
+            raise PlanEditError(f"That change would bring the plan over your budget (max ${self.max_budget:.2f}).")
+        return days
+
+    def add(self, day, poi_type=None, kind="attraction"):
+        """Add the best unused attraction matching `poi_type` to `day`; for kind "restaurant", set its lunch instead."""
+        if kind == "restaurant":
+            return self._set_lunch(day, poi_type)
+        day_schedule = self._day(day)
+        visits = [e for e in day_schedule.activities if e.activity == "Visit attraction"]
+        if len(visits) >= MAX_VISITS_PER_DAY:
+            raise PlanEditError(f"Day {day_schedule.day} already has {MAX_VISITS_PER_DAY} attractions.")
+        weather = self._weather(day_schedule)
+        index = self._best_unused("attraction", poi_type, prefer_indoor=bool(weather and "Rain" in weather))
+        if index is None:
+            raise PlanEditError(f"No other {poi_type or 'attraction'} is available in {self.destination}.")
+        entry = ScheduleEntry(self.catalog, index, MORNING_SLOT, "Visit attraction", ATTRACTION_COST_PER_VISIT, weather)
+        day_schedule.activities.append(entry)
+        self._commit([day_schedule], lambda: day_schedule.activities.remove(entry))
+        self._used().add(index)
+        return entry.place, [day_schedule]
+
+    def _set_lunch(self, day, poi_type=None):
+        """Have lunch on `day` at the best unused restaurant matching `poi_type`, replacing any lunch already planned."""
+        day_schedule = self._day(day)
+        index = self._best_unused("restaurant", poi_type)
+        if index is None:
+            raise PlanEditError(f"No other {poi_type or 'restaurant'} is available in {self.destination}.")
+        entry = next((e for e in day_schedule.activities if e.activity == "Lunch"), None)
+        if entry is not None:
+            old_index = entry.index
+            entry.index = index
+            self._commit([day_schedule], lambda: setattr(entry, "index", old_index))
+            self._used().discard(old_index)
+        else:
+            entry = ScheduleEntry(self.catalog, index, LUNCH_SLOT, "Lunch", MEAL_COST_PER_DAY, self._weather(day_schedule))
+            day_schedule.activities.append(entry)
+            self._commit([day_schedule], lambda: day_schedule.activities.remove(entry))
+        self._used().add(index)
+        return entry.place, [day_schedule]
+
+    def remove(self, day, poi_type=None):
+        day_schedule = self._day(day)
+        entry = self._find(day_schedule, "attraction", poi_type) or (poi_type and self._find(day_schedule, "restaurant", poi_type))
+        if not entry:
+            raise PlanEditError(f"Day {day_schedule.day} has no {poi_type or 'attraction'} to remove.")
+        day_schedule.activities.remove(entry)
+        self._commit([day_schedule], lambda: day_schedule.activities.append(entry))
+        self._used().discard(entry.index)
+        return entry.place, [day_schedule]
+
+    def swap(self, day, poi_type=None, new_type=None):
+        """Replace the first attraction (or restaurant) on `day` matching `poi_type` with the best unused one matching `new_type`."""
+        day_schedule = self._day(day)
+        entry = self._find(day_schedule, "attraction", poi_type) or self._find(day_schedule, "restaurant", poi_type)
+        if not entry:
+            raise PlanEditError(f"Day {day_schedule.day} has no {poi_type or 'attraction'} to swap.")
+        kind = entry.place.kind
+        index = self._best_unused(kind, new_type)
+        if index is None:
+            raise PlanEditError(f"No other {new_type or kind} is available in {self.destination}.")
+        old_index, old_place = entry.index, entry.place
+        entry.index = index
+        self._commit([day_schedule], lambda: setattr(entry, "index", old_index))
+        used = self._used()
+        used.discard(old_index)
+        used.add(index)
+        return (old_place, entry.place), [day_schedule]
+
+    def move(self, day, to_day, poi_type=None):
+        source, target = self._day(day), self._day(to_day)
+        if source is target:
+            raise PlanEditError("That activity is already on that day.")
+        entry = self._find(source, "attraction", poi_type)
+        if not entry:
+            raise PlanEditError(f"Day {source.day} has no {poi_type or 'attraction'} to move.")
+        if sum(e.activity == "Visit attraction" for e in target.activities) >= MAX_VISITS_PER_DAY:
+            raise PlanEditError(f"Day {target.day} already has {MAX_VISITS_PER_DAY} attractions.")
+        old_weather = entry.weather
+        source.activities.remove(entry)
+        target.activities.append(entry)
+        entry.weather = self._weather(target) or old_weather
+
+        def undo():
+            target.activities.remove(entry)
+            source.activities.append(entry)
+            entry.weather = old_weather
+        self._commit([source, target], undo)
+        return entry.place, [source, target]
+
+
+class SessionStore:
+    """Bounded, TTL-expiring store of PlanSessions (least recently used sessions are evicted first)."""
+
+    def __init__(self, max_sessions=PLAN_SESSION_MAX, ttl_seconds=PLAN_SESSION_TTL_SECONDS, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._sessions:
+            session_id, (_, touched) = next(iter(self._sessions.items()))
+            if now - touched < self.ttl:
+                break
+            del self._sessions[session_id]
+
+    def put(self, session):
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            self._sessions[session.id] = (session, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            ACTIVE_SESSIONS.set(len(self._sessions))
+        return session.id
+
+    def get(self, session_id):
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            item = self._sessions.get(session_id) if session_id else None
+            if item is not None:
+                self._sessions[session_id] = (item[0], now)
+                self._sessions.move_to_end(session_id)
+            ACTIVE_SESSIONS.set(len(self._sessions))
+        record_cache("plan_session", item is not None)
+        return item[0] if item else None
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+def day_summary(day_schedule):
+    """JSON-friendly view of a day, returned to the chat client after an edit."""
+    return {
+        "day": day_schedule.day,
+        "date": day_schedule.date,
+        "daily_cost": round(day_schedule.daily_cost, 2),
+        "activities": [{"time": e.time, "activity": e.activity, "name": e.place.name, "cost": round(e.cost, 2)}
+                       for e in day_schedule.activities],
+    }
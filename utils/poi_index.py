@@ -0,0 +1,45 @@
+# utils/poi_index.py
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _rank_key(place):
+    return (-place.get("rating", 0), place.get("distance", 0))
+
+
+class POIIndex:
+    """
+    Attractions for a single city, partitioned into indoor and outdoor lists.
+
+    Both partitions are sorted once by rating (highest first) and distance (closest first), or by
+    a caller-supplied `key`, so weather-driven substitutions are plain in-memory lookups with no
+    provider calls.
+    """
+
+    def __init__(self, city, attractions, key=_rank_key):
+        self.city = city
+        self.indoor = sorted((a for a in attractions if a.get("is_indoor")), key=key)
+        self.outdoor = sorted((a for a in attractions if not a.get("is_indoor")), key=key)
+        self._ranked = sorted(attractions, key=key)
+        self._indoor_first = self.indoor + self.outdoor
+        logger.debug("Built POI index for %s: %d indoor, %d outdoor", city, len(self.indoor), len(self.outdoor))
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def ranked(self, prefer_indoor=False):
+        """Return all attractions in rank order, with indoor ones first when prefer_indoor is set."""
+        return self._indoor_first if prefer_indoor else self._ranked
+
+    def pick(self, used, prefer_indoor=False):
+        """Return the best-ranked attraction not in the set `used`, or None if all have been used."""
+        for attraction in self.ranked(prefer_indoor):
+            if attraction not in used:
+                return attraction
+        return None
+
+
+def build_poi_indexes(attractions_by_city):
+    """Build a POIIndex for every city in `attractions_by_city`."""
+    return {city: POIIndex(city, attractions) for city, attractions in attractions_by_city.items()}
@@ -0,0 +1,210 @@
+# utils/quota.py
+import logging
+import os
+import threading
+import time
+
+from utils.metrics import REGISTRY
+from utils.resilience import remaining_timeout
+
+logger = logging.getLogger(__name__)
+
+QUOTA_REMAINING = REGISTRY.gauge(
+    "getgetplaces_quota_remaining_ratio", "Fraction of the daily provider quota still available.", ("provider",))
+QUOTA_REJECTED = REGISTRY.counter(
+    "getgetplaces_quota_rejected_total", "Provider calls or requests refused for lack of quota.", ("provider",))
+
+# Default (per-second, per-day) limits; override with QUOTA_<PROVIDER>_PER_SECOND / _PER_DAY
+DEFAULT_LIMITS = {
+    "google_places": (50, 100_000),
+    "google_geocoding": (50, 40_000),
+    "openweathermap": (10, 1_000),
+    "rapidapi_priceline": (5, 500),
+}
+
+# Longest a call waits for per-second room before it is refused
+QUOTA_MAX_WAIT_SECONDS = float(os.getenv("QUOTA_MAX_WAIT_SECONDS", "2"))
+
+# Enrichment levels by remaining daily quota: (min remaining ratio, place details per search, score images)
+FIDELITY_LEVELS = (
+    (0.5, 10, True),
+    (0.2, 5, False),
+    (0.0, 2, False),
+)
+
+
+class QuotaExceeded(Exception):
+    """Raised when a provider call (or a whole request) cannot be admitted within quota."""
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f"Quota exhausted for {provider}; retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+    def wait_time(self, cost=1):
+        """Seconds until `cost` tokens will be available (0 if they already are)."""
+        missing = cost - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate else float("inf")
+
+    def take(self, cost=1):
+        self._refill()
+        self.tokens -= cost
+
+
+class ProviderQuota:
+    """Per-second and per-day token buckets for one provider, checked and consumed together."""
+
+    def __init__(self, name, per_second, per_day, clock=time.monotonic):
+        self.name = name
+        self.second = TokenBucket(per_second, per_second, clock)
+        self.day = TokenBucket(per_day / 86400, per_day, clock)
+        self._lock = threading.Lock()
+
+    def retry_after(self, cost=1):
+        """Seconds until `cost` calls fit; a multi-call cost only needs per-second room for a full burst."""
+        with self._lock:
+            return max(self.second.wait_time(min(cost, self.second.capacity)), self.day.wait_time(cost))
+
+    def daily_wait(self, cost=1):
+        """Seconds until the daily bucket holds `cost` calls; the per-second limit is paced per call."""
+        with self._lock:
+            return self.day.wait_time(cost)
+
+    def reserve(self, cost=1, max_wait=0.0):
+        """
+        Take `cost` calls now and return how long the caller must wait before making them, or None.
+
+        The daily bucket must already hold `cost`. The per-second bucket may go negative by up to
+        `max_wait` seconds of refill, so concurrent callers queue behind each other rather than fail.
+        """
+        with self._lock:
+            wait = self.second.wait_time(cost)
+            if wait > max_wait or self.day.wait_time(cost) > 0:
+                return None
+            self.second.take(cost)
+            self.day.take(cost)
+            QUOTA_REMAINING.set(self.day.tokens / self.day.capacity, self.name)
+            return wait
+
+    def try_acquire(self, cost=1):
+        return self.reserve(cost) is not None
+
+    def remaining_ratio(self):
+        with self._lock:
+            return self.day.available() / self.day.capacity
+
+
+class Fidelity:
+    __slots__ = ("details_per_search", "score_images")
+
+    def __init__(self, details_per_search, score_images):
+        self.details_per_search = details_per_search
+        self.score_images = score_images
+
+
+class QuotaAccountant:
+    """
+    Tracks provider quota and decides how much enrichment a request can afford.
+
+    `acquire` is called for every real provider call and paces it to the per-second limit,
+    waiting up to `max_wait` seconds for room; `admit` checks up front that a request's estimated
+    cost fits in the daily quota, so exhausted providers produce a clean 429 instead of a provider
+    error; `fidelity` sheds load by lowering enrichment (fewer details, no image scoring) as the
+    daily quota runs low. Pass a fake `clock` and `sleep` to drive the buckets deterministically.
+    """
+
+    def __init__(self, limits=None, clock=time.monotonic, sleep=time.sleep, max_wait=QUOTA_MAX_WAIT_SECONDS):
+        self.clock = clock
+        self.sleep = sleep
+        self.max_wait = max_wait
+        self.providers = {}
+        for name, (per_second, per_day) in (limits or self.limits_from_env()).items():
+            self.providers[name] = ProviderQuota(name, per_second, per_day, clock)
+
+    @staticmethod
+    def limits_from_env():
+        limits = {}
+        for name, (per_second, per_day) in DEFAULT_LIMITS.items():
+            prefix = f"QUOTA_{name.upper()}"
+            limits[name] = (float(os.getenv(f"{prefix}_PER_SECOND", per_second)), float(os.getenv(f"{prefix}_PER_DAY", per_day)))
+        return limits
+
+    def acquire(self, provider, cost=1):
+        quota = self.providers.get(provider)
+        if quota is None:
+            return
+        # Never wait past the request's deadline
+        wait = quota.reserve(cost, remaining_timeout(self.max_wait))
+        if wait is None:
+            QUOTA_REJECTED.inc(provider)
+            raise QuotaExceeded(provider, quota.retry_after(cost))
+        if wait > 0:
+            self.sleep(wait)
+
+    def try_acquire(self, provider, cost=1):
+        """Take `cost` calls only if they fit right now, without waiting."""
+        quota = self.providers.get(provider)
+        return quota is None or quota.try_acquire(cost)
+
+    def admit(self, costs):
+        """
+        Raise QuotaExceeded unless every provider in `costs` ({provider: calls}) has daily room for the request.
+
+        Only the daily quota is checked: a request's calls are spread over its lifetime and each is
+        paced to the per-second limit by `acquire`, so back-to-back requests are not refused for
+        a burst they will never make at once.
+        """
+        for provider, cost in costs.items():
+            quota = self.providers.get(provider)
+            if quota is None:
+                continue
+            retry_after = quota.daily_wait(cost)
+            if retry_after > 0:
+                QUOTA_REJECTED.inc(provider)
+                raise QuotaExceeded(provider, retry_after)
+
+    def fidelity(self, provider="google_places"):
+        quota = self.providers.get(provider)
+        remaining = quota.remaining_ratio() if quota else 1.0
+        for threshold, details_per_search, score_images in FIDELITY_LEVELS:
+            if remaining >= threshold:
+                return Fidelity(details_per_search, score_images)
+        return Fidelity(*FIDELITY_LEVELS[-1][1:])
+
+
+quota_accountant = QuotaAccountant()
+
+
+def estimated_request_cost(fidelity):
+    """Provider calls a single trip-planning request is expected to make at `fidelity`."""
+    details = fidelity.details_per_search
+    photos = details if fidelity.score_images else 0
+    return {
+        # hotels search, attractions search + details + photos, restaurants search + details
+        "google_places": 1 + (1 + details + photos) + (1 + details),
+        # every fetcher and generate_plans geocode the destination
+        "google_geocoding": 5,
+        "rapidapi_priceline": 1,
+    }
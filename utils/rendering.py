@@ -0,0 +1,122 @@
+# utils/rendering.py
+import gzip
+import hashlib
+import logging
+import os
+import time
+
+from flask import Response
+
+from utils.metrics import REGISTRY, record_cache
+
+logger = logging.getLogger(__name__)
+
+RENDER_GZIP_MIN_BYTES = int(os.getenv("RENDER_GZIP_MIN_BYTES", "1024"))
+RENDER_GZIP_LEVEL = int(os.getenv("RENDER_GZIP_LEVEL", "6"))
+PLAN_PAGE_DAYS = int(os.getenv("PLAN_PAGE_DAYS", "3"))
+PRECOMPILED_TEMPLATES = ("index.html", "results.html", "_days.html")
+
+RENDER_SECONDS = REGISTRY.histogram(
+    "getgetplaces_render_seconds", "Time spent rendering a page template.", ("template",))
+RESPONSE_BYTES = REGISTRY.counter(
+    "getgetplaces_response_bytes_total", "Rendered page bytes sent, by content encoding.", ("template", "encoding"))
+NOT_MODIFIED = REGISTRY.counter(
+    "getgetplaces_not_modified_total", "Conditional GETs answered with 304 Not Modified.", ("template",))
+
+_template_digests = {}
+
+
+def precompile_templates(jinja_env, names=PRECOMPILED_TEMPLATES):
+    """
+    Compile `names` once at startup and stop checking their sources for changes.
+
+    Block tags no longer leave their indentation and newline behind, which is most of the
+    whitespace in a long results page. The source digests of all of them are folded into page
+    ETags, so a deploy that changes a template, or one it includes (results.html includes
+    _days.html), never answers 304 for a stale page.
+    """
+    jinja_env.auto_reload = False
+    jinja_env.trim_blocks = True
+    jinja_env.lstrip_blocks = True
+    for name in names:
+        source, _, _ = jinja_env.loader.get_source(jinja_env, name)
+        _template_digests[name] = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+        jinja_env.get_template(name)
+    logger.info(f"Precompiled {len(names)} templates")
+
+
+def plans_etag(template, session_id, destination, budget, plans, start=0, count=None):
+    """
+    Strong validator for a rendered plans page showing days [start, start + count) of each plan.
+
+    Hashes what the page shows: the catalog fingerprint, each plan's hotel, car and cost, and every
+    schedule entry (place index, time, activity, cost, weather) on those days. A chat edit changes
+    the hash; a reload of an unchanged plan does not. Only the shown days are built.
+    """
+    stop = None if count is None else start + count
+    digest = hashlib.blake2b(digest_size=16)
+    # Every template's digest, not just `template`'s: a page also shows the templates it includes
+    templates = ",".join(f"{name}:{source}" for name, source in sorted(_template_digests.items()))
+    digest.update(f"{template}|{templates}|{session_id}|{destination}|{budget!r}|{start}|{stop}".encode())
+    for plan in plans:
+        digest.update(f"|{plan.catalog.fingerprint()}|{plan.days}|{plan.hotel_index}|{plan.car_index}|{plan.total_cost!r}".encode())
+        for day in plan.schedule[start:stop]:
+            digest.update(f"|{day.date}|{day.daily_cost!r}".encode())
+            for e in day.activities:
+                digest.update(f"|{e.index},{e.time},{e.activity},{e.cost!r},{e.weather},{e.distance_override!r}".encode())
+    return digest.hexdigest()
+
+
+class RenderedPage:
+    """A rendered page and its ETag; the gzip encoding is produced once, on first request."""
+
+    __slots__ = ("template", "etag", "body", "_gzipped")
+
+    def __init__(self, template, etag, body):
+        self.template = template
+        self.etag = etag
+        self.body = body.encode("utf-8")
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=RENDER_GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+
+def render_page(jinja_env, template, etag, context, cached=None):
+    """Render `template`, reusing `cached` (a RenderedPage) when its ETag still matches."""
+    if cached is not None and cached.template == template and cached.etag == etag:
+        record_cache("rendered_page", True)
+        return cached
+    record_cache("rendered_page", False)
+    started = time.perf_counter()
+    body = jinja_env.get_template(template).render(**context)
+    RENDER_SECONDS.observe(time.perf_counter() - started, template)
+    return RenderedPage(template, etag, body)
+
+
+def accepts_gzip(request):
+    return "gzip" in request.headers.get("Accept-Encoding", "").lower()
+
+
+def page_response(page, request):
+    """
+    Build the response for `page`: gzip it when it is large and the client accepts gzip, and answer
+    a matching If-None-Match with 304. Each encoding has its own ETag, as HTTP requires.
+    """
+    compress = len(page.body) >= RENDER_GZIP_MIN_BYTES and accepts_gzip(request)
+    response = Response(page.gzipped if compress else page.body, mimetype="text/html")
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    # Plans change through chat edits, so clients must revalidate; a 304 costs a hash, not a render
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.set_etag(f"{page.etag}-gz" if compress else page.etag)
+    response.make_conditional(request)
+    if response.status_code == 304:
+        NOT_MODIFIED.inc(page.template)
+    else:
+        RESPONSE_BYTES.inc(page.template, "gzip" if compress else "identity", amount=response.content_length or 0)
+    return response
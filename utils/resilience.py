@@ -0,0 +1,212 @@
+# utils/resilience.py
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import requests
+
+from utils.metrics import REGISTRY, record_cache
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SLO_SECONDS = float(os.getenv("REQUEST_SLO_SECONDS", "20"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+STALE_CACHE_SIZE = int(os.getenv("STALE_CACHE_SIZE", "1024"))
+
+CIRCUIT_OPENED = REGISTRY.counter(
+    "getgetplaces_circuit_opened_total", "Times a provider circuit breaker tripped open.", ("provider",))
+CIRCUIT_REJECTED = REGISTRY.counter(
+    "getgetplaces_circuit_rejected_total", "Calls failed fast because the provider circuit was open.", ("provider",))
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when the request-wide deadline has no budget left for another provider call."""
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class Deadline:
+    def __init__(self, seconds, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, default):
+        """Return the per-call timeout: `default` capped at the remaining budget."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return min(default, remaining)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deadline_scope(seconds=REQUEST_SLO_SECONDS):
+    """Install a request-wide deadline for the current thread; every stage shares its budget."""
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = Deadline(seconds)
+    try:
+        yield _local.deadline
+    finally:
+        _local.deadline = previous
+
+
+def begin_deadline(seconds=REQUEST_SLO_SECONDS):
+    """Install a deadline for the current thread without a with-block (e.g. from a before_request hook)."""
+    _local.deadline = Deadline(seconds)
+    return _local.deadline
+
+
+def end_deadline():
+    _local.deadline = None
+
+
+def current_deadline():
+    return getattr(_local, "deadline", None)
+
+
+def remaining_timeout(default):
+    """Timeout for the next provider call: `default`, capped by the current deadline if there is one."""
+    deadline = current_deadline()
+    return deadline.timeout(default) if deadline else default
+
+
+def out_of_time():
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired()
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls fail fast for
+    `reset_timeout` seconds; then a single trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit. Successful responses are kept in a small LRU so callers can
+    fall back to the last good data while the provider is unhealthy.
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_SECONDS,
+                 stale_cache_size=STALE_CACHE_SIZE, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._stale = OrderedDict()
+        self._stale_size = stale_cache_size
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self, key=None, result=None):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+            if key is not None:
+                self._stale[key] = result
+                self._stale.move_to_end(key)
+                while len(self._stale) > self._stale_size:
+                    self._stale.popitem(last=False)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    CIRCUIT_OPENED.inc(self.name)
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = self.clock()
+
+    def release_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stale(self, key):
+        with self._lock:
+            return self._stale.get(key)
+
+    def call(self, key, func, *args, **kwargs):
+        """
+        Run `func` through the breaker.
+
+        Falls back to the last good result for `key` when the circuit is open or the call fails;
+        raises CircuitOpenError (or the original error) when there is nothing to fall back to.
+        """
+        if not self.allow():
+            CIRCUIT_REJECTED.inc(self.name)
+            cached = self.stale(key)
+            record_cache(f"stale:{self.name}", cached is not None)
+            if cached is not None:
+                return cached
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            result = func(*args, **kwargs)
+        except requests.HTTPError as e:
+            # Client errors say nothing about provider health
+            if e.response is not None and e.response.status_code < 500:
+                self.record_success()
+                raise
+            self.record_failure()
+            return self._fallback(key, e)
+        except requests.RequestException as e:
+            if isinstance(e, requests.Timeout) and out_of_time():
+                # Our own deadline cut the call short; don't blame the provider
+                self.release_trial()
+                raise
+            self.record_failure()
+            return self._fallback(key, e)
+        except BaseException:
+            self.release_trial()
+            raise
+        self.record_success(key, result)
+        return result
+
+    def _fallback(self, key, error):
+        cached = self.stale(key)
+        record_cache(f"stale:{self.name}", cached is not None)
+        if cached is None:
+            raise error
+        logger.warning(f"{self.name} call failed ({error}); serving last good response")
+        return cached
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(provider):
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
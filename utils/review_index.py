@@ -0,0 +1,153 @@
+# utils/review_index.py
+import hashlib
+import json
+import logging
+import re
+import shlex
+import threading
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query):
+    """
+    Split a query into clauses; each clause is a tuple of tokens.
+
+    Quoted text becomes a phrase clause (e.g. '"free parking" pool' -> [("free", "parking"), ("pool",)]).
+    """
+    if isinstance(query, (list, tuple)):
+        parts = query
+    else:
+        try:
+            parts = shlex.split(query)
+        except ValueError:
+            parts = query.split()
+    clauses = []
+    for part in parts:
+        tokens = part if isinstance(part, tuple) else tuple(tokenize(part))
+        if tokens:
+            clauses.append(tokens)
+    return clauses
+
+
+class _CityIndex:
+    __slots__ = ("postings", "doc_subjects", "subject_docs", "hashes")
+
+    def __init__(self):
+        # token -> {doc_id: [positions]}
+        self.postings = {}
+        self.doc_subjects = []
+        self.subject_docs = {}
+        self.hashes = set()
+
+
+class ReviewIndex:
+    """
+    Incremental per-city inverted index over review text.
+
+    Each review is a document attached to a subject (e.g. "hotel:Hotel Name"). Postings keep
+    token positions so phrase queries can be answered without rescanning review text, and
+    reviews are deduplicated by content hash so re-indexing the same data is a no-op.
+    """
+
+    def __init__(self):
+        self._cities = {}
+        self._lock = threading.Lock()
+
+    def add(self, city, subject, reviews):
+        """Index `reviews` (an iterable of strings) for `subject` in `city`. Returns the number added."""
+        added = 0
+        with self._lock:
+            index = self._cities.setdefault(city.lower(), _CityIndex())
+            for review in reviews:
+                if not isinstance(review, str) or not review:
+                    continue
+                digest = hashlib.sha1(f"{subject}\0{review}".encode("utf-8")).digest()
+                if digest in index.hashes:
+                    continue
+                index.hashes.add(digest)
+                doc_id = len(index.doc_subjects)
+                index.doc_subjects.append(subject)
+                index.subject_docs.setdefault(subject, []).append(doc_id)
+                for position, token in enumerate(tokenize(review)):
+                    index.postings.setdefault(token, {}).setdefault(doc_id, []).append(position)
+                added += 1
+        return added
+
+    def _clause_docs(self, index, clause):
+        postings = [index.postings.get(token) for token in clause]
+        if not all(postings):
+            return set()
+        docs = set(postings[0])
+        for posting in postings[1:]:
+            docs &= posting.keys()
+        if len(clause) == 1:
+            return docs
+        matched = set()
+        for doc_id in docs:
+            starts = set(postings[0][doc_id])
+            for offset, posting in enumerate(postings[1:], start=1):
+                starts &= {p - offset for p in posting[doc_id]}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc_id)
+        return matched
+
+    def match_counts(self, city, query):
+        """Return {subject: number of query clauses matched by any of its reviews}."""
+        index = self._cities.get(city.lower())
+        if index is None:
+            return {}
+        counts = {}
+        for clause in parse_query(query):
+            subjects = {index.doc_subjects[doc_id] for doc_id in self._clause_docs(index, clause)}
+            for subject in subjects:
+                counts[subject] = counts.get(subject, 0) + 1
+        return counts
+
+    def search(self, city, query):
+        """Return the subjects whose reviews match every clause of `query` (keywords and "quoted phrases")."""
+        clauses = parse_query(query)
+        if not clauses:
+            return set()
+        return {subject for subject, count in self.match_counts(city, clauses).items() if count == len(clauses)}
+
+    def rank_key(self, city, kind, query, weight=1.0):
+        """
+        Build a sort key for place dicts of `kind` that favours places whose reviews match `query`.
+
+        Places are ordered by rating plus `weight` per matched clause (highest first), then distance.
+        """
+        counts = self.match_counts(city, query) if query else {}
+
+        def key(place):
+            return (-(place.get("rating", 0) + weight * counts.get(f"{kind}:{place.get('name')}", 0)), place.get("distance", 0))
+        return key
+
+    def load_from_database(self, db):
+        """Index the reviews already stored in hotels, cars and the scraped reviews table."""
+        from sqlalchemy import text
+
+        added = 0
+        with db.engine.connect() as conn:
+            for kind, table in (("hotel", "hotels"), ("car", "cars")):
+                for name, city, reviews in conn.execute(text(f"SELECT name, city, reviews FROM {table} WHERE reviews IS NOT NULL")):
+                    if isinstance(reviews, str):
+                        try:
+                            reviews = json.loads(reviews)
+                        except ValueError:
+                            reviews = [reviews]
+                    if city and reviews:
+                        added += self.add(city, f"{kind}:{name}", reviews)
+            for city, source_url, review in conn.execute(text("SELECT city, source_url, review FROM reviews")):
+                if city and review:
+                    added += self.add(city, f"page:{source_url}", [review])
+        logger.info(f"Indexed {added} stored reviews")
+        return added
@@ -0,0 +1,60 @@
+# utils/singleflight.py
+import threading
+
+from utils.metrics import REGISTRY
+
+COALESCED_CALLS = REGISTRY.counter(
+    "getgetplaces_coalesced_calls_total", "Calls that shared an identical in-flight call instead of issuing their own.", ("group",))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is in flight wait
+    and receive the same result (or exception). Nothing is cached once the call completes.
+    Shared results must be treated as read-only by callers.
+    """
+
+    def __init__(self, name="default"):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            COALESCED_CALLS.inc(self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,233 @@
+# utils/travel_time.py
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.gazetteer import normalize
+from utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371
+# Roads are longer than the straight line between two points
+TRAVEL_DETOUR_FACTOR = float(os.getenv("TRAVEL_DETOUR_FACTOR", "1.3"))
+# "max road km:km/h" bands; short hops are dominated by lights and parking, long ones by highways
+TRAVEL_SPEED_BANDS = os.getenv("TRAVEL_SPEED_BANDS", "2:15,10:25,30:40,inf:60")
+TRAVEL_PEAK_FACTOR = float(os.getenv("TRAVEL_PEAK_FACTOR", "0.7"))
+TRAVEL_NIGHT_FACTOR = float(os.getenv("TRAVEL_NIGHT_FACTOR", "1.2"))
+PEAK_HOURS = frozenset(range(7, 10)) | frozenset(range(16, 19))
+NIGHT_HOURS = frozenset(range(22, 24)) | frozenset(range(0, 6))
+PROFILE_SPEED_FACTORS = {"dense": 0.75, "default": 1.0, "sprawl": 1.15}
+DEFAULT_CITY_PROFILES = {
+    "new york": "dense", "london": "dense", "paris": "dense", "tokyo": "dense", "hong kong": "dense",
+    "mexico city": "dense", "istanbul": "dense", "bangkok": "dense", "rome": "dense",
+    "los angeles": "sprawl", "houston": "sprawl", "phoenix": "sprawl", "dallas": "sprawl", "orlando": "sprawl",
+}
+TRAVEL_CITY_PROFILES = os.getenv("TRAVEL_CITY_PROFILES", "")  # e.g. "miami:sprawl,boston:dense"
+TRAVEL_MATRIX_CACHE_CITIES = int(os.getenv("TRAVEL_MATRIX_CACHE_CITIES", "64"))
+TRAVEL_MATRIX_MAX_POINTS = int(os.getenv("TRAVEL_MATRIX_MAX_POINTS", "2000"))
+TRAVEL_MATRIX_CACHE_MB = float(os.getenv("TRAVEL_MATRIX_CACHE_MB", "256"))
+
+
+def _parse_bands(spec):
+    bands = []
+    for part in spec.split(","):
+        limit, speed = part.split(":")
+        bands.append((float(limit), float(speed)))
+    return sorted(bands)
+
+
+def _parse_profiles(spec):
+    profiles = dict(DEFAULT_CITY_PROFILES)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        city, profile = part.rsplit(":", 1)
+        profiles[normalize(city)] = profile.strip()
+    return profiles
+
+
+class SpeedModel:
+    """
+    Door-to-door travel speed for a straight-line distance.
+
+    Straight-line km are stretched by `detour_factor` to road km, and each distance band is driven
+    at its own speed: with the default bands the first 2 km take 15 km/h, the next 8 km 25 km/h and
+    so on, so a longer trip never takes less time. The city's profile (dense, default, sprawl)
+    scales every speed, and so does the hour of departure (slower at peak, faster at night).
+    Everything is vectorized, so a whole matrix of distances is converted at once.
+    """
+
+    def __init__(self, bands=None, detour_factor=TRAVEL_DETOUR_FACTOR, city_profiles=None,
+                 peak_factor=TRAVEL_PEAK_FACTOR, night_factor=TRAVEL_NIGHT_FACTOR):
+        bands = bands or _parse_bands(TRAVEL_SPEED_BANDS)
+        self.band_limits = np.array([limit for limit, _ in bands[:-1]] + [np.inf])
+        self.band_starts = np.concatenate(([0.0], self.band_limits[:-1]))
+        self.band_speeds = np.array([speed for _, speed in bands])
+        self.detour_factor = detour_factor
+        self.city_profiles = city_profiles if city_profiles is not None else _parse_profiles(TRAVEL_CITY_PROFILES)
+        self.peak_factor = peak_factor
+        self.night_factor = night_factor
+
+    def profile(self, city):
+        return self.city_profiles.get(normalize(city), "default") if city else "default"
+
+    def time_factor(self, hour):
+        """Speed multiplier for a departure at `hour` (0-23); None means free-flow."""
+        if hour is None:
+            return 1.0
+        hour = int(hour) % 24
+        if hour in PEAK_HOURS:
+            return self.peak_factor
+        if hour in NIGHT_HOURS:
+            return self.night_factor
+        return 1.0
+
+    def minutes(self, straight_km, city=None, hour=None):
+        """Minutes to travel `straight_km` (a number or an array) in `city`, leaving at `hour`."""
+        road_km = np.asarray(straight_km, dtype=float) * self.detour_factor
+        hours = np.zeros_like(road_km)
+        for start, limit, speed in zip(self.band_starts, self.band_limits, self.band_speeds):
+            hours += (np.clip(road_km, start, limit) - start) / speed
+        factor = PROFILE_SPEED_FACTORS.get(self.profile(city), 1.0) * self.time_factor(hour)
+        minutes = hours / factor * 60
+        return float(minutes) if minutes.ndim == 0 else minutes
+
+
+def haversine_matrix(lats, lons):
+    """Pairwise great-circle distances in km between points given as coordinate arrays."""
+    phi, lam = np.radians(lats), np.radians(lons)
+    a = (np.sin((phi[:, None] - phi[None, :]) / 2) ** 2
+         + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin((lam[:, None] - lam[None, :]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def place_key(place):
+    """Identity of a place within a city's matrix: its name, coordinates and distance from the hotel."""
+    return (place.get("name"), place.get("lat"), place.get("long"), place.get("distance"))
+
+
+class TravelTimeMatrix:
+    """
+    Free-flow travel minutes between every pair of a city's places.
+
+    Pairs where either place has no coordinates (missing, or the 0,0 fallback) use the
+    destination's distance from the hotel instead, as the old per-leg estimate did.
+    """
+
+    def __init__(self, city, places, model):
+        self.city = city
+        self.model = model
+        self.keys = [place_key(p) for p in places]
+        self.index = {key: row for row, key in enumerate(self.keys)}
+        lats = np.array([float(p.get("lat") or 0.0) for p in places])
+        lons = np.array([float(p.get("long") or 0.0) for p in places])
+        known = (lats != 0) | (lons != 0)
+        fallback = np.array([float(p.get("distance") or 0.0) for p in places])
+        self.km = np.where(known[:, None] & known[None, :], haversine_matrix(lats, lons), fallback[None, :])
+        np.fill_diagonal(self.km, 0.0)
+        self.base_minutes = model.minutes(self.km, city)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return self.km.nbytes + self.base_minutes.nbytes
+
+    def covers(self, keys):
+        return all(key in self.index for key in keys)
+
+    def rows(self, places):
+        """Matrix rows of `places` (which must be in the matrix)."""
+        return [self.index[place_key(p)] for p in places]
+
+    def minutes(self, origin_row, destination_row, hour=None):
+        """Travel minutes from one row to another, leaving at `hour` (free-flow if None)."""
+        return float(self.base_minutes[origin_row, destination_row]) / self.model.time_factor(hour)
+
+    def between(self, origin, destination, hour=None):
+        return self.minutes(self.index[place_key(origin)], self.index[place_key(destination)], hour)
+
+
+class TravelTimeService:
+    """
+    Many-to-many travel times, one matrix per city.
+
+    `matrix(city, places)` answers from the city's cached matrix when it already covers every
+    place, so the planner, chat edits and itineraries for one city share a single computation. A
+    miss rebuilds the city's matrix over the cached places plus the new ones (up to
+    TRAVEL_MATRIX_MAX_POINTS); the least recently used cities are evicted first, once there are more
+    than `max_cities` or the cached matrices take more than `max_bytes` together.
+    """
+
+    def __init__(self, model=None, max_cities=TRAVEL_MATRIX_CACHE_CITIES, max_points=TRAVEL_MATRIX_MAX_POINTS,
+                 max_bytes=int(TRAVEL_MATRIX_CACHE_MB * 1024 * 1024)):
+        self.model = model or SpeedModel()
+        self.max_cities = max_cities
+        self.max_points = max_points
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def matrix(self, city, places):
+        city_key = normalize(city or "")
+        keys = [place_key(p) for p in places]
+        with self._lock:
+            cached = self._matrices.get(city_key)
+            if cached is not None and cached.covers(keys):
+                self._matrices.move_to_end(city_key)
+                record_cache("travel_matrix", True)
+                return cached
+        record_cache("travel_matrix", False)
+
+        points = list(places)
+        if cached is not None:
+            seen = set(cached.keys)
+            missing = [p for p, key in zip(places, keys) if key not in seen]
+            if len(cached) + len(missing) <= self.max_points:
+                points = [_KeyedPoint(key) for key in cached.keys] + missing
+        matrix = TravelTimeMatrix(city, _unique(points), self.model)
+        logger.debug("Built %dx%d travel-time matrix for %s", len(matrix), len(matrix), city)
+        with self._lock:
+            replaced = self._matrices.pop(city_key, None)
+            self.total_bytes += matrix.nbytes - (replaced.nbytes if replaced is not None else 0)
+            self._matrices[city_key] = matrix
+            # The newest matrix always stays, even if it alone is over max_bytes
+            while len(self._matrices) > 1 and (len(self._matrices) > self.max_cities or self.total_bytes > self.max_bytes):
+                _, evicted = self._matrices.popitem(last=False)
+                self.total_bytes -= evicted.nbytes
+        return matrix
+
+    def __len__(self):
+        return len(self._matrices)
+
+
+class _KeyedPoint:
+    """A place rebuilt from its matrix key, so a grown matrix keeps the rows it had."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def get(self, field, default=None):
+        name, lat, lon, distance = self.key
+        return {"name": name, "lat": lat, "long": lon, "distance": distance}.get(field, default)
+
+
+def _unique(places):
+    seen = set()
+    unique = []
+    for place in places:
+        key = place_key(place)
+        if key not in seen:
+            seen.add(key)
+            unique.append(place)
+    return unique
+
+
+speed_model = SpeedModel()
+travel_time_service = TravelTimeService(speed_model)
@@ -4,10 +4,13 @@ import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import logging
+from utils.instrumentation import timed
+from utils.api import OPENWEATHERMAP_API_BASE, fetch_json
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+@timed("weather")
 def fetch_weather(lat, lon, start_date, end_date):
     """
     Fetch weather data for the given coordinates between start_date and end_date.
@@ -39,7 +42,7 @@ def fetch_weather(lat, lon, start_date, end_date):
             current_date += timedelta(days=1)
         return weather_by_date
 
-    url = "https://api.openweathermap.org/data/3.0/onecall"
+    url = f"{OPENWEATHERMAP_API_BASE}/onecall"
     params = {
         "lat": lat,
         "lon": lon,
@@ -48,9 +51,7 @@ def fetch_weather(lat, lon, start_date, end_date):
         "appid": api_key
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(url, params=params, timeout=10, provider="openweathermap", site="fetch_weather")
         daily_forecasts = data.get("daily", [])
 
         weather_by_date = {}
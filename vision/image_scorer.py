@@ -1,20 +1,35 @@
 # vision/image_scorer.py
-from tensorflow.keras.applications.vgg16 import VGG16, preprocess_input
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
-import numpy as np
-import requests
 import logging
+import sqlite3
+
+from utils.metrics import track_call
+from vision.photo_cache import photo_downloader, score_store
+from vision.scorers import get_scorer
 
 logger = logging.getLogger(__name__)
-model = VGG16(weights="imagenet", include_top=False)
+# Backend chosen by IMAGE_SCORER (vgg16, vgg16_112, stats or remote)
+scorer = get_scorer()
+
+def cached_score(photo_reference):
+    """Return the remembered score for a photo, or None if it has never been scored (or the store is unreadable)."""
+    try:
+        return score_store.get(photo_reference, scorer.name)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Score store unavailable, treating photo as unscored: {e}")
+        return None
 
-def score_image(image_url):
+def score_image(image_url, photo_reference=None):
     try:
-        response = requests.get(image_url, stream=True)
-        img = load_img(response.raw, target_size=(224, 224))
-        img_array = preprocess_input(img_to_array(img))
-        features = model.predict(img_array[np.newaxis, ...])
-        return np.mean(features)
+        if photo_reference is not None:
+            score = cached_score(photo_reference)
+            if score is not None:
+                return score
+        with track_call("google_places", "score_image"):
+            pixels = photo_downloader.pixels(image_url, photo_reference)
+            score = scorer.score(pixels)
+        if photo_reference is not None:
+            score_store.put(photo_reference, scorer.name, score)
+        return score
     except Exception as e:
         logger.error(f"Error scoring image: {e}")
         return 0
\ No newline at end of file
@@ -0,0 +1,240 @@
+# vision/model_server.py
+"""
+Out-of-process image scoring.
+
+One server process holds the model and scores photos sent by every web worker, batching requests
+that arrive within a short window. Workers select it with IMAGE_SCORER=remote and only keep a
+thin socket client in memory. Start it with:
+
+    python -m vision.model_server --backend vgg16 --socket /tmp/getgetplaces-scorer.sock
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from vision.scorers import ImageScorer, SCORER_NAMES
+
+logger = logging.getLogger(__name__)
+
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET", "/tmp/getgetplaces-scorer.sock")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", "10"))
+# Backend the server is expected to run; clients check it on every connection
+MODEL_SERVER_BACKEND = os.getenv("MODEL_SERVER_BACKEND", "vgg16")
+
+_LENGTH = struct.Struct("!I")
+
+
+def _read_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Socket closed mid-message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock, header, payload=b""):
+    """Frame: header length, JSON header, payload length, payload bytes."""
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded + _LENGTH.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    header = json.loads(_read_exact(sock, _LENGTH.unpack(_read_exact(sock, _LENGTH.size))[0]))
+    payload = _read_exact(sock, _LENGTH.unpack(_read_exact(sock, _LENGTH.size))[0])
+    return header, payload
+
+
+class ScorerMismatchError(RuntimeError):
+    """Raised when the model server runs a different backend than this client expects."""
+
+
+class Batcher:
+    """Collects score requests from many connections and runs them through the scorer in batches."""
+
+    def __init__(self, scorer, window_ms=10, max_batch=16):
+        self.scorer = scorer
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.images = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="scorer-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, pixels):
+        future = Future()
+        self._queue.put((pixels, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                scores = self.scorer.score_batch([pixels for pixels, _ in batch])
+            except Exception as e:
+                logger.error(f"Error scoring batch of {len(batch)}: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.images += len(batch)
+            for (_, future), score in zip(batch, scores):
+                future.set_result(score)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                header, payload = recv_message(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+            op = header.get("op")
+            if op == "info":
+                send_message(self.request, {"scorer": server.batcher.scorer.name,
+                                            "batches": server.batcher.batches, "images": server.batcher.images})
+            elif op == "score":
+                try:
+                    pixels = np.frombuffer(payload, dtype=np.uint8).reshape(header["shape"])
+                    score = server.batcher.submit(pixels).result()
+                    send_message(self.request, {"score": score})
+                except Exception as e:
+                    send_message(self.request, {"error": f"{type(e).__name__}: {e}"})
+            else:
+                send_message(self.request, {"error": f"Unknown op {op!r}"})
+
+
+class ScoringServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, scorer, window_ms=10, max_batch=16):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.batcher = Batcher(scorer, window_ms, max_batch)
+        super().__init__(socket_path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class RemoteScorer(ImageScorer):
+    """
+    Thin client for ScoringServer, usable wherever an ImageScorer is expected.
+
+    Keeps one connection per thread and reconnects once if the server was restarted. `name` is the
+    score-store name of the configured `backend` (MODEL_SERVER_BACKEND), so reading it never touches
+    the socket; every new connection asks the server for its backend and raises ScorerMismatchError
+    if it is another one, so scores are never stored under the wrong model. The first connection is
+    made here: a mismatch stops the worker at startup, while a server that is not up yet is only
+    logged and retried on first use.
+    """
+
+    def __init__(self, socket_path=MODEL_SERVER_SOCKET, timeout=MODEL_SERVER_TIMEOUT, backend=MODEL_SERVER_BACKEND):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.name = SCORER_NAMES.get(backend, backend)
+        self._local = threading.local()
+        try:
+            self._connect()
+        except OSError as e:
+            logger.warning(f"Model server at {socket_path} unavailable ({e}); will connect on first use")
+
+    def info(self):
+        """The server's backend and batch counters (one round-trip)."""
+        return self._request({"op": "info"})
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            send_message(sock, {"op": "info"})
+            info, _ = recv_message(sock)
+        except OSError:
+            sock.close()
+            raise
+        if info.get("scorer") != self.name:
+            sock.close()
+            raise ScorerMismatchError(f"Model server at {self.socket_path} scores with {info.get('scorer')!r}, "
+                                      f"but this worker expects {self.name!r}; set MODEL_SERVER_BACKEND to match the server")
+        self._local.sock = sock
+        return sock
+
+    def _request(self, header, payload=b""):
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                send_message(sock, header, payload)
+                response, _ = recv_message(sock)
+                break
+            except (ConnectionError, BrokenPipeError):
+                sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise
+            except OSError:
+                sock.close()
+                self._local.sock = None
+                raise
+        if "error" in response:
+            raise RuntimeError(f"Model server error: {response['error']}")
+        return response
+
+    def score_batch(self, images):
+        # Each image is its own request; the server batches across all connected workers
+        return [self._request({"op": "score", "shape": list(pixels.shape)},
+                              np.ascontiguousarray(pixels, dtype=np.uint8).tobytes())["score"] for pixels in images]
+
+
+def main():
+    from vision.scorers import get_scorer
+
+    parser = argparse.ArgumentParser(description="Serve an image scorer over a local socket")
+    parser.add_argument("--backend", default=MODEL_SERVER_BACKEND)
+    parser.add_argument("--socket", default=MODEL_SERVER_SOCKET)
+    parser.add_argument("--window-ms", type=float, default=10.0, help="How long to wait to fill a batch")
+    parser.add_argument("--max-batch", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = ScoringServer(args.socket, get_scorer(args.backend), args.window_ms, args.max_batch)
+    logger.info(f"Scoring with {args.backend} on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# vision/photo_cache.py
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import requests
+from PIL import Image
+
+from utils.metrics import track_call, record_cache
+from utils.quota import quota_accountant
+from utils.resilience import remaining_timeout
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PHOTO_CACHE_DIR = os.getenv("PHOTO_CACHE_DIR", "photo_cache")
+PHOTO_CACHE_MAX_MB = float(os.getenv("PHOTO_CACHE_MAX_MB", "256"))
+PHOTO_DOWNLOAD_CONCURRENCY = int(os.getenv("PHOTO_DOWNLOAD_CONCURRENCY", "4"))
+PHOTO_DOWNLOAD_TIMEOUT = float(os.getenv("PHOTO_DOWNLOAD_TIMEOUT", "5"))
+PHOTO_MAX_BYTES = int(os.getenv("PHOTO_MAX_BYTES", str(5 * 1024 * 1024)))
+PHOTO_SCORE_MEMO_SIZE = int(os.getenv("PHOTO_SCORE_MEMO_SIZE", "50000"))
+TARGET_SIZE = (224, 224)
+
+
+def photo_key(photo_reference):
+    return hashlib.sha256(photo_reference.encode("utf-8")).hexdigest()
+
+
+def decode_photo(data, target_size=TARGET_SIZE):
+    """Decode image bytes into a uint8 RGB array resized to `target_size` (nearest, as load_img does)."""
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB").resize((target_size[1], target_size[0]), Image.NEAREST)
+        return np.asarray(img, dtype=np.uint8)
+
+
+class PhotoCache:
+    """
+    On-disk cache of decoded, resized photos keyed by the hash of their photo_reference.
+
+    Entries are stored as .npy arrays so a cached photo never needs decoding or resizing again.
+    When the total size exceeds `max_bytes` the least recently used entries are evicted. The
+    directory is scanned on first use, so importing the module touches no files.
+    """
+
+    def __init__(self, root=PHOTO_CACHE_DIR, max_bytes=int(PHOTO_CACHE_MAX_MB * 1024 * 1024)):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._scanned = False
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.npy")
+
+    def _scan(self):
+        """Index the entries already on disk; called with the lock held."""
+        if self._scanned:
+            return
+        self._scanned = True
+        found = []
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.endswith(".npy"):
+                        stat = os.stat(os.path.join(dirpath, filename))
+                        found.append((stat.st_mtime, filename[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+
+    def get(self, photo_reference):
+        key = photo_key(photo_reference)
+        with self._lock:
+            self._scan()
+            hit = key in self._entries
+            if hit:
+                self._entries.move_to_end(key)
+        record_cache("photo_pixels", hit)
+        if not hit:
+            return None
+        path = self._path(key)
+        try:
+            pixels = np.load(path, allow_pickle=False)
+            os.utime(path)
+            return pixels
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cached photo {path}: {e}")
+            self._forget(key)
+            return None
+
+    def put(self, photo_reference, pixels):
+        key = photo_key(photo_reference)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, pixels, allow_pickle=False)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._scan()
+            self.total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evicted = []
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+        if evicted:
+            logger.debug("Evicted %d cached photos (cache now %d bytes)", len(evicted), self.total_bytes)
+
+    def _forget(self, key):
+        with self._lock:
+            self.total_bytes -= self._entries.pop(key, 0)
+
+    def __len__(self):
+        with self._lock:
+            self._scan()
+            return len(self._entries)
+
+
+class PhotoDownloader:
+    """
+    Fetches place photos with bounded concurrency, timeouts and a size cap.
+
+    Photos are decoded and resized once and stored in `cache`; identical concurrent downloads
+    are coalesced. Each real download is charged against the Google Places quota.
+    """
+
+    def __init__(self, cache, max_concurrent=PHOTO_DOWNLOAD_CONCURRENCY, timeout=PHOTO_DOWNLOAD_TIMEOUT,
+                 max_bytes=PHOTO_MAX_BYTES, session=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._flights = SingleFlight("photo")
+
+    def download(self, url):
+        """Return the raw bytes at `url`, refusing bodies larger than `max_bytes`."""
+        with self._slots, track_call("google_places", "photo_download"):
+            quota_accountant.acquire("google_places")
+            timeout = remaining_timeout(self.timeout)
+            with self.session.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                chunks, size = [], 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f"Photo larger than {self.max_bytes} bytes: {url}")
+                    chunks.append(chunk)
+        return b"".join(chunks)
+
+    def pixels(self, url, photo_reference=None):
+        """Decoded, resized pixels for a photo; served from the cache when `photo_reference` was seen before."""
+        if photo_reference is None:
+            return decode_photo(self.download(url))
+        pixels = self.cache.get(photo_reference)
+        if pixels is not None:
+            return pixels
+        return self._flights.do(photo_reference, self._fetch_and_store, url, photo_reference)
+
+    def _fetch_and_store(self, url, photo_reference):
+        pixels = decode_photo(self.download(url))
+        self.cache.put(photo_reference, pixels)
+        return pixels
+
+
+class ScoreStore:
+    """
+    Memoized photo scores keyed by (photo_reference, scorer), kept in memory and in SQLite.
+
+    A remembered score lets a photo skip both the download and model inference. The database is
+    opened on first use; at most `memo_size` scores stay in memory, least recently used first out.
+    """
+
+    def __init__(self, path=None, memo_size=PHOTO_SCORE_MEMO_SIZE):
+        self.path = path or os.path.join(PHOTO_CACHE_DIR, "scores.sqlite3")
+        self.memo_size = memo_size
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        """The SQLite connection, opened (and the table created) on first use; called with the lock held."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scores (photo_reference TEXT, scorer TEXT, score REAL, "
+                    "PRIMARY KEY (photo_reference, scorer))")
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key, score):
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.memo_size:
+            self._scores.popitem(last=False)
+
+    def get(self, photo_reference, scorer):
+        key = (photo_reference, scorer)
+        with self._lock:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            else:
+                row = self._connection().execute(
+                    "SELECT score FROM scores WHERE photo_reference = ? AND scorer = ?", key).fetchone()
+                if row is not None:
+                    score = row[0]
+                    self._remember(key, score)
+        record_cache("photo_score", score is not None)
+        return score
+
+    def put(self, photo_reference, scorer, score):
+        with self._lock:
+            self._remember((photo_reference, scorer), score)
+            with self._connection():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO scores (photo_reference, scorer, score) VALUES (?, ?, ?)",
+                    (photo_reference, scorer, score))
+
+
+photo_cache = PhotoCache()
+photo_downloader = PhotoDownloader(photo_cache)
+score_store = ScoreStore()
@@ -0,0 +1,109 @@
+# vision/scorers.py
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SCORER = os.getenv("IMAGE_SCORER", "vgg16")
+
+
+class ImageScorer:
+    """
+    Turns decoded photos (uint8 RGB arrays, see vision.photo_cache.decode_photo) into a scalar score.
+
+    Backends only need `score_batch`; `name` identifies the backend in the score store, so scores
+    from different backends are never mixed.
+    """
+
+    name = "base"
+
+    def score_batch(self, images):
+        raise NotImplementedError
+
+    def score(self, pixels):
+        return self.score_batch([pixels])[0]
+
+
+class VGG16Scorer(ImageScorer):
+    """Mean activation of the VGG16 convolutional base (the original scorer), optionally on downsampled input."""
+
+    def __init__(self, input_size=224):
+        from tensorflow.keras.applications.vgg16 import VGG16, preprocess_input
+
+        self.input_size = input_size
+        self.name = "vgg16-mean" if input_size == 224 else f"vgg16-mean-{input_size}"
+        self._preprocess = preprocess_input
+        self.model = VGG16(weights="imagenet", include_top=False, input_shape=(input_size, input_size, 3))
+
+    def _prepare(self, pixels):
+        if pixels.shape[:2] != (self.input_size, self.input_size):
+            from PIL import Image
+            pixels = np.asarray(Image.fromarray(pixels).resize((self.input_size, self.input_size), Image.BILINEAR))
+        return pixels.astype("float32")
+
+    def score_batch(self, images):
+        batch = self._preprocess(np.stack([self._prepare(pixels) for pixels in images]))
+        features = self.model.predict(batch, verbose=0)
+        return [float(np.mean(f)) for f in features]
+
+
+class ImageStatsScorer(ImageScorer):
+    """
+    Classic image statistics: sharpness, contrast, colorfulness and exposure, NumPy only.
+
+    Orders of magnitude cheaper than a CNN and needs no model weights; each term is
+    normalised to roughly [0, 1] before weighting.
+    """
+
+    name = "image-stats-v1"
+
+    def __init__(self, weights=(0.35, 0.25, 0.25, 0.15)):
+        self.weights = weights
+
+    def score_batch(self, images):
+        return [self._score(pixels) for pixels in images]
+
+    def _score(self, pixels):
+        rgb = pixels.astype(np.float32) / 255.0
+        gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        # Sharpness: variance of the 4-neighbour Laplacian
+        laplacian = (gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1] - 4 * gray[1:-1, 1:-1])
+        sharpness = min(1.0, float(laplacian.var()) * 50)
+        contrast = min(1.0, float(gray.std()) * 4)
+        # Hasler & Suesstrunk colorfulness
+        rg = rgb[..., 0] - rgb[..., 1]
+        yb = 0.5 * (rgb[..., 0] + rgb[..., 1]) - rgb[..., 2]
+        colorfulness = min(1.0, float(np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean())) * 2)
+        exposure = 1.0 - min(1.0, abs(float(gray.mean()) - 0.5) * 2)
+        w_sharp, w_contrast, w_color, w_exposure = self.weights
+        return w_sharp * sharpness + w_contrast * contrast + w_color * colorfulness + w_exposure * exposure
+
+
+def _remote_scorer():
+    from vision.model_server import RemoteScorer
+    return RemoteScorer()
+
+
+# Score-store names of the built-in backends, known without loading their models
+SCORER_NAMES = {"vgg16": "vgg16-mean", "vgg16_112": "vgg16-mean-112", "stats": ImageStatsScorer.name}
+
+SCORERS = {
+    "vgg16": VGG16Scorer,
+    "vgg16_112": lambda: VGG16Scorer(input_size=112),
+    "stats": ImageStatsScorer,
+    # Client for the shared out-of-process model server (python -m vision.model_server)
+    "remote": _remote_scorer,
+}
+
+
+def get_scorer(name=None):
+    """Instantiate the scorer backend `name` (defaults to the IMAGE_SCORER setting)."""
+    name = name or IMAGE_SCORER
+    try:
+        factory = SCORERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown image scorer {name!r}; choose one of {', '.join(SCORERS)}")
+    logger.info(f"Using image scorer backend {name}")
+    return factory()